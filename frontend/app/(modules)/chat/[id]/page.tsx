@@ -38,6 +38,13 @@ function groupMessagesByDate(messages: Message[]): { date: string; messages: Mes
   }));
 }
 
+// Append messages not already shown (a sent message also comes back on the stream)
+function mergeMessages(current: Message[], incoming: Message[]): Message[] {
+  const seen = new Set(current.map((msg) => msg.id));
+  const fresh = incoming.filter((msg) => !seen.has(msg.id));
+  return fresh.length ? [...current, ...fresh] : current;
+}
+
 export default function ChatPage() {
   const router = useRouter();
   const params = useParams();
@@ -49,6 +56,11 @@ export default function ChatPage() {
   const [newMessage, setNewMessage] = useState('');
   const [isLoading, setIsLoading] = useState(true);
   const [isSending, setIsSending] = useState(false);
+  const [olderCursor, setOlderCursor] = useState<string | null>(null);
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
+
+  // Position of the newest message we have; the stream resumes after it
+  const latestCursorRef = useRef<string | null>(null);
 
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const inputRef = useRef<HTMLInputElement>(null);
@@ -71,6 +83,8 @@ export default function ChatPage() {
         const data = await chatService.getMessages(conversationId);
         setConversation(data.conversation);
         setMessages(data.messages);
+        setOlderCursor(data.older_cursor);
+        latestCursorRef.current = data.latest_cursor;
       } catch (error) {
         console.error('Failed to load conversation:', error);
         router.push('/chat');
@@ -79,24 +93,65 @@ export default function ChatPage() {
       }
     };
 
-    loadConversation();
+    let source: EventSource | null = null;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+    let closed = false;
+
+    const reopenLater = () => {
+      retry = setTimeout(openStream, 3000);
+    };
 
-    // Poll for new messages every 5 seconds
-    const interval = setInterval(async () => {
+    // New messages are pushed by the server. Each connection needs a fresh ticket, so a
+    // dropped stream is reopened here rather than by the browser; it replays anything missed
+    const openStream = async () => {
+      if (closed) return;
       try {
-        const data = await chatService.getMessages(conversationId);
-        setMessages(data.messages);
+        const opened = await chatService.openMessageStream(conversationId, latestCursorRef.current, (message) => {
+          setMessages((prev) => mergeMessages(prev, [message]));
+          latestCursorRef.current = message.cursor;
+        });
+        if (closed) {
+          opened.close();
+          return;
+        }
+        opened.onerror = () => {
+          opened.close();
+          reopenLater();
+        };
+        source = opened;
       } catch (error) {
-        // Ignore polling errors
+        reopenLater();
       }
-    }, 5000);
+    };
+
+    loadConversation().then(openStream);
 
-    return () => clearInterval(interval);
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      source?.close();
+    };
   }, [conversationId, isAuthenticated, _hasHydrated, router]);
 
+  // Scroll only when a newer message arrives, not when earlier history is prepended
+  const newestMessageId = messages.length ? messages[messages.length - 1].id : null;
   useEffect(() => {
     scrollToBottom();
-  }, [messages]);
+  }, [newestMessageId]);
+
+  const loadOlder = async () => {
+    if (!olderCursor || isLoadingOlder) return;
+    setIsLoadingOlder(true);
+    try {
+      const data = await chatService.getMessages(conversationId, { before: olderCursor });
+      setMessages((prev) => [...data.messages, ...prev]);
+      setOlderCursor(data.older_cursor);
+    } catch (error) {
+      console.error('Failed to load earlier messages:', error);
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
 
   const handleSend = async (e: React.FormEvent) => {
     e.preventDefault();
@@ -106,7 +161,7 @@ export default function ChatPage() {
     setIsSending(true);
     try {
       const message = await chatService.sendMessage(conversationId, newMessage.trim());
-      setMessages((prev) => [...prev, message]);
+      setMessages((prev) => mergeMessages(prev, [message]));
       setNewMessage('');
       inputRef.current?.focus();
     } catch (error) {
@@ -163,6 +218,17 @@ export default function ChatPage() {
 
         {/* Messages */}
         <div className="flex-1 overflow-y-auto p-4 space-y-4 bg-gray-50 -mx-4 sm:mx-0">
+          {olderCursor && (
+            <div className="flex justify-center">
+              <button
+                onClick={loadOlder}
+                disabled={isLoadingOlder}
+                className="px-3 py-1 bg-white text-gray-600 text-xs rounded-full shadow-sm hover:bg-gray-100 transition-colors disabled:opacity-50"
+              >
+                {isLoadingOlder ? 'Loading...' : 'Load earlier messages'}
+              </button>
+            </div>
+          )}
           {messages.length === 0 ? (
             <div className="text-center py-8">
               <p className="text-gray-500">No messages yet. Start the conversation!</p>
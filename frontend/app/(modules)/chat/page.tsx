@@ -3,7 +3,7 @@
 import { useState, useEffect } from 'react';
 import { useRouter, useSearchParams } from 'next/navigation';
 import { useAuthStore } from '@/lib/viewmodels/auth.viewmodel';
-import { chatService, Conversation } from '@/lib/services/chat.service';
+import { chatService, Conversation, MessageSearchResult } from '@/lib/services/chat.service';
 import Layout from '@/components/layout/Layout';
 
 function formatTimeAgo(dateString: string): string {
@@ -22,6 +22,17 @@ function formatTimeAgo(dateString: string): string {
   return date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
 }
 
+// Render a search headline's <mark> spans as React elements; the rest stays plain text
+function Headline({ text }: { text: string }) {
+  return (
+    <>
+      {text.split(/<mark>|<\/mark>/).map((part, i) =>
+        i % 2 ? <mark key={i} className="bg-yellow-100 text-gray-900 rounded px-0.5">{part}</mark> : part
+      )}
+    </>
+  );
+}
+
 export default function ChatListPage() {
   const router = useRouter();
   const searchParams = useSearchParams();
@@ -29,6 +40,12 @@ export default function ChatListPage() {
   const [conversations, setConversations] = useState<Conversation[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [chatError, setChatError] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [query, setQuery] = useState('');
+  const [searchResults, setSearchResults] = useState<MessageSearchResult[] | null>(null);
+  const [searchCursor, setSearchCursor] = useState<string | null>(null);
+  const [isSearching, setIsSearching] = useState(false);
 
   // Handle redirect from job page with ?job=<id>
   useEffect(() => {
@@ -56,8 +73,9 @@ export default function ChatListPage() {
     const loadConversations = async () => {
       setIsLoading(true);
       try {
-        const data = await chatService.getConversations();
-        setConversations(data);
+        const page = await chatService.getConversations();
+        setConversations(page.conversations);
+        setNextCursor(page.nextCursor);
       } catch (error) {
         console.error('Failed to load conversations:', error);
       } finally {
@@ -68,6 +86,47 @@ export default function ChatListPage() {
     loadConversations();
   }, [isAuthenticated, _hasHydrated, router]);
 
+  const loadMore = async () => {
+    if (!nextCursor || isLoadingMore) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await chatService.getConversations(nextCursor);
+      // A conversation that got a new message meanwhile can show up again; keep its first position
+      setConversations((prev) => {
+        const seen = new Set(prev.map((conv) => conv.id));
+        return [...prev, ...page.conversations.filter((conv) => !seen.has(conv.id))];
+      });
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Failed to load more conversations:', error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
+  const runSearch = async (cursor?: string) => {
+    const q = query.trim();
+    if (!q) {
+      setSearchResults(null);
+      return;
+    }
+    setIsSearching(true);
+    try {
+      const data = await chatService.searchMessages(q, cursor);
+      setSearchResults((prev) => (cursor && prev ? [...prev, ...data.results] : data.results));
+      setSearchCursor(data.next_cursor);
+    } catch (error) {
+      console.error('Failed to search messages:', error);
+    } finally {
+      setIsSearching(false);
+    }
+  };
+
+  const handleSearch = (e: React.FormEvent) => {
+    e.preventDefault();
+    runSearch();
+  };
+
   const getOtherParticipant = (conv: Conversation) => {
     if (user && conv.volunteer_id === Number(user.id)) {
       return { name: conv.poster_username, role: 'Poster' };
@@ -91,7 +150,61 @@ export default function ChatListPage() {
           </div>
         )}
 
-        {isLoading ? (
+        <form onSubmit={handleSearch} className="flex gap-2 mb-6">
+          <input
+            type="search"
+            value={query}
+            onChange={(e) => {
+              setQuery(e.target.value);
+              if (!e.target.value) setSearchResults(null);
+            }}
+            placeholder="Search messages"
+            className="flex-1 px-4 py-2 border border-gray-200 rounded-xl focus:outline-none focus:border-primary"
+          />
+          <button
+            type="submit"
+            disabled={isSearching || !query.trim()}
+            className="px-4 py-2 bg-primary text-white rounded-xl font-medium disabled:opacity-50"
+          >
+            Search
+          </button>
+        </form>
+
+        {searchResults ? (
+          searchResults.length === 0 ? (
+            <div className="bg-white rounded-xl border border-gray-200 p-8 text-center">
+              <p className="text-gray-500">No messages match your search.</p>
+            </div>
+          ) : (
+            <div className="space-y-2">
+              {searchResults.map((result) => (
+                <button
+                  key={result.id}
+                  onClick={() => router.push(`/chat/${result.conversation}`)}
+                  className="w-full bg-white rounded-xl border border-gray-200 p-4 hover:shadow-md hover:border-gray-300 transition-all text-left"
+                >
+                  <div className="flex items-center justify-between gap-2">
+                    <h3 className="font-semibold text-gray-900 truncate">{result.job_title}</h3>
+                    <span className="text-xs text-gray-400 flex-shrink-0">{formatTimeAgo(result.created_at)}</span>
+                  </div>
+                  <p className="text-sm text-gray-600 mt-1">
+                    {result.sender_username === user?.username ? 'You' : result.sender_username}:{' '}
+                    <Headline text={result.headline} />
+                  </p>
+                </button>
+              ))}
+              {searchCursor && (
+                <button
+                  onClick={() => runSearch(searchCursor)}
+                  disabled={isSearching}
+                  className="w-full py-2 text-sm text-primary font-medium disabled:opacity-50"
+                >
+                  {isSearching ? 'Loading...' : 'Show more results'}
+                </button>
+              )}
+            </div>
+          )
+        ) : isLoading ? (
           <div className="space-y-3">
             {[1, 2, 3].map((i) => (
               <div key={i} className="bg-white rounded-xl border border-gray-200 p-4 animate-pulse">
@@ -157,6 +270,15 @@ export default function ChatListPage() {
                 </button>
               );
             })}
+            {nextCursor && (
+              <button
+                onClick={loadMore}
+                disabled={isLoadingMore}
+                className="w-full py-2 text-sm text-primary font-medium disabled:opacity-50"
+              >
+                {isLoadingMore ? 'Loading...' : 'Load more conversations'}
+              </button>
+            )}
           </div>
         )}
       </div>
@@ -4,6 +4,9 @@ import { useState, useEffect } from 'react';
 import Link from 'next/link';
 import { usePathname } from 'next/navigation';
 import { useAuthStore } from '@/lib/viewmodels/auth.viewmodel';
+import { chatService } from '@/lib/services/chat.service';
+
+const UNREAD_REFRESH_MS = 30000;
 
 const NAV_ITEMS = [
   {
@@ -71,6 +74,21 @@ export default function Navigation() {
     setHasMounted(true);
   }, []);
 
+  // Unread total for the Messages badge; a single cheap query over conversation rows.
+  // Refetched on navigation too, so it drops as soon as a chat is opened
+  const [unread, setUnread] = useState(0);
+  useEffect(() => {
+    if (!_hasHydrated || !isAuthenticated) return;
+    const refresh = () => {
+      chatService.getUnreadCount().then(setUnread).catch(() => {
+        // Keep the last known count
+      });
+    };
+    refresh();
+    const interval = setInterval(refresh, UNREAD_REFRESH_MS);
+    return () => clearInterval(interval);
+  }, [_hasHydrated, isAuthenticated, pathname]);
+
   // Don't render until hydration is complete to prevent SSR mismatch
   if (!hasMounted || !_hasHydrated || !isAuthenticated) return null;
 
@@ -91,6 +109,15 @@ export default function Navigation() {
               >
                 {item.icon}
                 {item.label}
+                {item.href === '/chat' && unread > 0 && (
+                  <span
+                    className={`ml-auto min-w-5 h-5 px-1.5 rounded-full text-xs font-medium flex items-center justify-center ${
+                      isActive ? 'bg-white text-primary' : 'bg-primary text-white'
+                    }`}
+                  >
+                    {unread > 99 ? '99+' : unread}
+                  </span>
+                )}
               </Link>
             </li>
           );
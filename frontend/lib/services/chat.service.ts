@@ -29,27 +29,85 @@ export interface Conversation {
   updated_at: string;
 }
 
+export interface ConversationPage {
+  conversations: Conversation[];
+  nextCursor: string | null;
+}
+
 export interface ConversationWithMessages {
   conversation: Conversation;
   messages: Message[];
+  older_cursor: string | null; // pass as `before` to load earlier messages
+  latest_cursor: string | null; // pass as `after` to fetch only newer messages
+  has_more: boolean;
+}
+
+export interface MessageSearchResult extends Message {
+  job_title: string;
+  headline: string; // excerpt with matched terms wrapped in <mark></mark>
+  rank: number;
+}
+
+export interface MessageSearchPage {
+  results: MessageSearchResult[];
+  next_cursor: string | null;
+}
+
+export interface MessagePageParams {
+  before?: string;
+  after?: string;
+  limit?: number;
+}
+
+// A message pushed by the conversation stream, with its position for resuming
+export interface StreamedMessage extends Message {
+  cursor: string;
 }
 
 export const chatService = {
-  async getConversations(): Promise<Conversation[]> {
-    const response = await api.get<Conversation[]>('/chat/conversations');
-    return response.data;
+  // Most recently active first; pass nextCursor back to load the next page
+  async getConversations(cursor?: string): Promise<ConversationPage> {
+    const response = await api.get<Conversation[]>('/chat/conversations', { params: { cursor } });
+    return { conversations: response.data, nextCursor: response.headers['x-next-cursor'] ?? null };
   },
 
-  async getMessages(conversationId: string): Promise<ConversationWithMessages> {
-    const response = await api.get<ConversationWithMessages>(`/chat/conversations/${conversationId}/messages`);
+  async getMessages(conversationId: string, params?: MessagePageParams): Promise<ConversationWithMessages> {
+    const response = await api.get<ConversationWithMessages>(`/chat/conversations/${conversationId}/messages`, {
+      params,
+    });
     return response.data;
   },
 
+  // Server-sent events for new messages after `after`. EventSource cannot set headers, so the stream is
+  // opened with a short-lived, single-use ticket rather than the access token.
+  async openMessageStream(
+    conversationId: string,
+    after: string | null,
+    onMessage: (message: StreamedMessage) => void,
+  ): Promise<EventSource> {
+    const response = await api.post<{ ticket: string }>(`/chat/conversations/${conversationId}/stream-ticket`);
+    const params = new URLSearchParams({ ticket: response.data.ticket });
+    if (after) params.set('after', after);
+    const source = new EventSource(`${api.defaults.baseURL}/chat/conversations/${conversationId}/stream?${params}`);
+    source.addEventListener('message', (event) => onMessage(JSON.parse((event as MessageEvent).data)));
+    return source;
+  },
+
   async sendMessage(conversationId: string, content: string): Promise<Message> {
     const response = await api.post<Message>(`/chat/conversations/${conversationId}/send`, { content });
     return response.data;
   },
 
+  async searchMessages(q: string, cursor?: string): Promise<MessageSearchPage> {
+    const response = await api.get<MessageSearchPage>('/chat/search', { params: { q, cursor } });
+    return response.data;
+  },
+
+  async getUnreadCount(): Promise<number> {
+    const response = await api.get<{ unread: number }>('/chat/unread');
+    return response.data.unread;
+  },
+
   async getConversationByJob(jobId: string): Promise<Conversation> {
     const response = await api.get<Conversation>(`/chat/job/${jobId}/conversation`);
     return response.data;
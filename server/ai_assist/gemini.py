@@ -5,6 +5,8 @@ import logging
 from django.conf import settings
 from django.core.cache import cache
 
+from matching.tags import clean_tags
+
 try:
     from google import genai
 except ImportError:
@@ -76,6 +78,9 @@ def enhance_job_description(user_input: str) -> dict:
     if not required.issubset(result.keys()):
         raise ValueError(f"Gemini response missing keys: {required - result.keys()}")
 
+    # Same tag normalization as the job form and profile edits
+    result['skill_tags'] = clean_tags(result['skill_tags'])
+
     # Cache for 1 hour
     cache.set(key, result, timeout=3600)
 
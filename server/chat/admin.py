@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.contrib.postgres.search import SearchQuery
 
+from . import search
 from .models import Conversation, Message
 
 
@@ -14,7 +16,15 @@ class ConversationAdmin(admin.ModelAdmin):
 class MessageAdmin(admin.ModelAdmin):
     list_display = ['id', 'conversation', 'sender', 'content_preview', 'created_at']
     list_filter = ['created_at']
-    search_fields = ['content', 'sender__username']
+    search_fields = ['sender__username']
+
+    def get_search_results(self, request, queryset, search_term):
+        # Content is matched through the full-text index rather than ILIKE over every message
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            query = SearchQuery(search_term, config=search.CONFIG, search_type='websearch')
+            results |= queryset.filter(search_vector=query)
+        return results, may_have_duplicates
 
     def content_preview(self, obj):
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
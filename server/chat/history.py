@@ -0,0 +1,61 @@
+"""
+Keyset pagination over a conversation's messages.
+
+Messages are ordered by (created_at, id), which message_conversation_time_idx
+serves. A cursor names one message's position: the history page before it,
+or the messages after it for an incremental fetch, each cost O(page) however
+long the conversation is.
+"""
+from django.core import signing
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+CURSOR_SALT = 'chat.messages.cursor'
+
+
+def encode_cursor(message):
+    """Opaque, signed cursor at a message's position."""
+    return signing.dumps({'t': message.created_at.isoformat(), 'i': str(message.id)}, salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor):
+    """Return (created_at, message_id) for a cursor. Raises ValueError if it was tampered with."""
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT)
+        created_at = parse_datetime(data['t'])
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if created_at is None:
+        raise ValueError('Invalid cursor')
+    return created_at, data['i']
+
+
+def _messages(conversation):
+    return conversation.messages.select_related('sender')
+
+
+def history_page(conversation, limit, before=None):
+    """
+    The `limit` messages before the `before` cursor (the newest ones without it), oldest first.
+    Returns (messages, has_older).
+    """
+    messages = _messages(conversation).order_by('-created_at', '-id')
+    if before:
+        created_at, message_id = decode_cursor(before)
+        messages = messages.filter(created_at__lte=created_at).filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=message_id)
+        )
+    page = list(messages[:limit + 1])
+    return page[:limit][::-1], len(page) > limit
+
+
+def messages_after(conversation, after, limit):
+    """Up to `limit` messages after the `after` cursor, oldest first. Returns (messages, has_more)."""
+    created_at, message_id = decode_cursor(after)
+    messages = _messages(conversation).order_by('created_at', 'id').filter(created_at__gte=created_at).filter(
+        Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=message_id)
+    )
+    page = list(messages[:limit + 1])
+    return page[:limit], len(page) > limit
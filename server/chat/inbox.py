@@ -0,0 +1,179 @@
+"""
+Inbox state kept on Conversation rows.
+
+Each conversation carries a preview of its last message and an unread
+counter per participant. record_message() bumps them in a single UPDATE when
+a message is sent and mark_read() clears the reader's counter, so the inbox
+and the unread total are read from conversation rows alone. recount()
+rebuilds the fields from Message rows for data written behind their back
+(fixtures, bulk loads).
+
+inbox_page() serves the inbox newest first with a keyset cursor on
+(updated_at, id). A user appears on either side of a conversation, and an
+OR across the two foreign keys cannot walk an index in order, so each role
+is its own ordered, limited branch over conv_volunteer_inbox_idx or
+conv_poster_inbox_idx, combined with UNION ALL.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.core import signing
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Left
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Conversation, Message
+
+PREVIEW_LENGTH = 100
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+CURSOR_SALT = 'chat.inbox.cursor'
+ROLES = ('volunteer', 'poster')
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _unread_field(conversation, user):
+    """The counter `user` reads in this conversation, or None if they are not part of it."""
+    if user.id == conversation.volunteer_id:
+        return 'volunteer_unread'
+    if user.id == conversation.poster_id:
+        return 'poster_unread'
+    return None
+
+
+def unread_count(conversation, user):
+    field = _unread_field(conversation, user)
+    return getattr(conversation, field) if field else 0
+
+
+def record_message(conversation, message):
+    """Update the last-message preview and the other participant's unread counter for a new message."""
+    other = 'poster_unread' if message.sender_id == conversation.volunteer_id else 'volunteer_unread'
+    # Concurrent sends may commit out of order; only a newer message replaces the preview
+    newer = Q(last_message_at__isnull=True) | Q(last_message_at__lte=message.created_at)
+
+    def if_newer(value, field):
+        output_field = Conversation._meta.get_field(field)
+        return Case(When(newer, then=Value(value)), default=F(field), output_field=output_field)
+
+    Conversation.objects.filter(pk=conversation.pk).update(
+        last_message_content=if_newer(message.content[:PREVIEW_LENGTH], 'last_message_content'),
+        last_message_sender_id=if_newer(message.sender_id, 'last_message_sender_id'),
+        last_message_at=if_newer(message.created_at, 'last_message_at'),
+        **{other: F(other) + 1},
+        updated_at=timezone.now(),  # Inbox sorts by most recent activity
+    )
+
+
+def mark_read(conversation, user):
+    """Record that `user` has read the conversation up to now and clear their unread counter."""
+    field = _unread_field(conversation, user)
+    if field is None:
+        return
+    last_read = field.replace('_unread', '_last_read')
+    now = timezone.now()
+    Conversation.objects.filter(pk=conversation.pk).update(**{field: 0, last_read: now})
+    setattr(conversation, field, 0)
+    setattr(conversation, last_read, now)
+
+
+def unread_total(user):
+    """Unread messages across all of the user's active conversations, for the navbar badge."""
+    totals = Conversation.objects.filter(Q(volunteer=user) | Q(poster=user), is_active=True).aggregate(
+        volunteer=Sum('volunteer_unread', filter=Q(volunteer=user)),
+        poster=Sum('poster_unread', filter=Q(poster=user)),
+    )
+    return (totals['volunteer'] or 0) + (totals['poster'] or 0)
+
+
+def inbox(user):
+    """The user's active conversations, as volunteer or poster, ready for ConversationSerializer."""
+    return Conversation.objects.filter(
+        Q(volunteer=user) | Q(poster=user),
+        is_active=True,
+    ).select_related('job', 'job__poster', 'volunteer', 'poster')
+
+
+def encode_cursor(updated_at, conversation_id):
+    """Opaque, signed cursor after a position in the inbox."""
+    return signing.dumps({'t': updated_at.isoformat(), 'i': str(conversation_id)}, salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor):
+    """Return (updated_at, conversation_id) for a cursor. Raises ValueError if it was tampered with."""
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT)
+        updated_at = parse_datetime(data['t'])
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if updated_at is None:
+        raise ValueError('Invalid cursor')
+    return updated_at, data['i']
+
+
+def _branch(user, role, limit, after):
+    """Positions of the next `limit` conversations where `user` plays `role`, newest first."""
+    conversations = Conversation.objects.filter(**{role: user}, is_active=True)
+    if after:
+        updated_at, conversation_id = after
+        conversations = conversations.filter(updated_at__lte=updated_at).filter(
+            Q(updated_at__lt=updated_at) | Q(updated_at=updated_at, id__lt=conversation_id)
+        )
+    return conversations.order_by('-updated_at', '-id').values_list('updated_at', 'id')[:limit]
+
+
+def inbox_positions(user, limit, after=None):
+    """(updated_at, id) of the user's next `limit` conversations after the `after` position, newest first."""
+    volunteer, poster = (_branch(user, role, limit, after) for role in ROLES)
+    return volunteer.union(poster, all=True).order_by('-updated_at', '-id')[:limit]
+
+
+def inbox_page(user, limit, cursor=None):
+    """
+    One page of the user's inbox, most recently active first, ready for
+    ConversationSerializer. Returns (conversations, next_cursor).
+    """
+    after = decode_cursor(cursor) if cursor else None
+    positions = list(inbox_positions(user, limit + 1, after))
+
+    # The positions, not the reloaded rows, order the page and place the cursor,
+    # so a conversation bumped by a new message in between cannot reshuffle it
+    ids = list(dict.fromkeys(conversation_id for _, conversation_id in positions[:limit]))
+    rows = Conversation.objects.select_related('job', 'job__poster', 'volunteer', 'poster').in_bulk(ids)
+    page = [rows[conversation_id] for conversation_id in ids if conversation_id in rows]
+    next_cursor = encode_cursor(*positions[limit - 1]) if len(positions) > limit else None
+    return page, next_cursor
+
+
+def _unread_from(sender_field, last_read_field):
+    """Messages from the other party newer than the reader's last_read (all of them if never read)."""
+    unread = (
+        Message.objects
+        .filter(
+            conversation=OuterRef('pk'),
+            sender_id=OuterRef(sender_field),
+            created_at__gt=Coalesce(OuterRef(last_read_field), Value(_EPOCH)),
+        )
+        .order_by()
+        .values('conversation')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    return Coalesce(Subquery(unread, output_field=IntegerField()), 0)
+
+
+def recount(conversations):
+    """Recompute the inbox fields of `conversations` from their messages in one UPDATE."""
+    def last(expression):
+        return Subquery(
+            Message.objects.filter(conversation=OuterRef('pk'))
+            .order_by('-created_at').values(value=expression)[:1]
+        )
+
+    return conversations.update(
+        last_message_content=Coalesce(last(Left('content', PREVIEW_LENGTH)), Value('')),
+        last_message_sender_id=last(F('sender_id')),
+        last_message_at=last(F('created_at')),
+        volunteer_unread=_unread_from('poster_id', 'volunteer_last_read'),
+        poster_unread=_unread_from('volunteer_id', 'poster_last_read'),
+    )
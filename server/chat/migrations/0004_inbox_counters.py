@@ -0,0 +1,90 @@
+# Generated by Django 5.2 on 2026-10-17 02:45
+
+from datetime import datetime, timezone
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Left
+
+# Frozen copy of chat.inbox.recount as of this migration
+PREVIEW_LENGTH = 100
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def backfill_inbox(apps, schema_editor):
+    Conversation = apps.get_model("chat", "Conversation")
+    Message = apps.get_model("chat", "Message")
+
+    def last(expression):
+        return Subquery(
+            Message.objects.filter(conversation=OuterRef("pk"))
+            .order_by("-created_at").values(value=expression)[:1]
+        )
+
+    def unread_from(sender_field, last_read_field):
+        unread = (
+            Message.objects
+            .filter(
+                conversation=OuterRef("pk"),
+                sender_id=OuterRef(sender_field),
+                created_at__gt=Coalesce(OuterRef(last_read_field), Value(EPOCH)),
+            )
+            .order_by()
+            .values("conversation")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        return Coalesce(Subquery(unread, output_field=IntegerField()), 0)
+
+    Conversation.objects.update(
+        last_message_content=Coalesce(last(Left("content", PREVIEW_LENGTH)), Value("")),
+        last_message_sender_id=last(F("sender_id")),
+        last_message_at=last(F("created_at")),
+        volunteer_unread=unread_from("poster_id", "volunteer_last_read"),
+        poster_unread=unread_from("volunteer_id", "poster_last_read"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0003_message_conversation_time_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message_content",
+            field=models.CharField(blank=True, default="", max_length=100),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message_sender",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="poster_unread",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="volunteer_unread",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_inbox, migrations.RunPython.noop),
+    ]
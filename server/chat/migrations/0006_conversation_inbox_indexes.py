@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-17 03:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0005_message_search"),
+        ("matching", "0014_leaderboard"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="conversation",
+            index=models.Index(
+                fields=["volunteer", "is_active", "-updated_at", "-id"],
+                name="conv_volunteer_inbox_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="conversation",
+            index=models.Index(
+                fields=["poster", "is_active", "-updated_at", "-id"],
+                name="conv_poster_inbox_idx",
+            ),
+        ),
+    ]
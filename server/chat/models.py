@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 
 from core.models import BaseModel
@@ -13,10 +15,21 @@ class Conversation(BaseModel):
     # Track when each participant last read the conversation
     volunteer_last_read = models.DateTimeField(null=True, blank=True)
     poster_last_read = models.DateTimeField(null=True, blank=True)
+    # Inbox state, maintained by chat.inbox.record_message() and mark_read()
+    last_message_content = models.CharField(max_length=100, blank=True, default='')
+    last_message_sender = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    volunteer_unread = models.IntegerField(default=0)
+    poster_unread = models.IntegerField(default=0)
 
     class Meta:
         unique_together = ('job', 'volunteer')
         ordering = ['-updated_at']
+        indexes = [
+            # One per role, for the branches of chat.inbox.inbox_page
+            models.Index(fields=['volunteer', 'is_active', '-updated_at', '-id'], name='conv_volunteer_inbox_idx'),
+            models.Index(fields=['poster', 'is_active', '-updated_at', '-id'], name='conv_poster_inbox_idx'),
+        ]
 
     def __str__(self):
         return f"Chat: {self.volunteer.username} <-> {self.poster.username} for {self.job.title}"
@@ -27,9 +40,19 @@ class Message(BaseModel):
     conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages')
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
     content = models.TextField()
+    # Kept in step with content by Postgres; queried by chat.search
+    search_vector = models.GeneratedField(
+        expression=SearchVector('content', config='english'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['conversation', 'created_at'], name='message_conversation_time_idx'),
+            GinIndex(fields=['search_vector'], name='message_search_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sender.username}: {self.content[:50]}"
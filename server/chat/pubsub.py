@@ -0,0 +1,103 @@
+"""
+Pub/sub for live chat delivery.
+
+send_message publishes each new message on its conversation's channel once
+the transaction commits, and the chat stream view relays a channel to the
+client as server-sent events. The backend is chosen by the
+CHAT_PUBSUB_BACKEND setting. InProcessPubSub only reaches subscribers in the
+same process, which suits a single ASGI worker and tests; deployments with
+several workers need a backend over a shared broker implementing the same
+three methods.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def conversation_channel(conversation_id):
+    return f'conversation:{conversation_id}'
+
+
+class Subscription:
+    """A subscriber's queue, read on the event loop that created it."""
+    MAX_PENDING = 1000
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.MAX_PENDING)
+        # Set when events had to be dropped; the stream should end so the client
+        # reconnects and catches up from the database
+        self.overflowed = False
+
+    def deliver(self, event):
+        """Thread-safe: hand an event to the subscriber's loop."""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        """Next event, or None if none arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class PubSub:
+    """Interface for pub/sub backends."""
+
+    def subscribe(self, channel):
+        """Return a Subscription receiving events published on `channel`. Call from the event loop."""
+        raise NotImplementedError
+
+    def unsubscribe(self, channel, subscription):
+        raise NotImplementedError
+
+    def publish(self, channel, event):
+        """Send a JSON-serializable event to every subscriber of `channel`. Callable from any thread."""
+        raise NotImplementedError
+
+
+class InProcessPubSub(PubSub):
+    """Fan-out to subscribers in this process only."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channel):
+        subscription = Subscription()
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, channel, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                # Its event loop has closed; the stream is gone
+                self.unsubscribe(channel, subscription)
+
+
+@lru_cache(maxsize=None)
+def get_pubsub():
+    return import_string(settings.CHAT_PUBSUB_BACKEND)()
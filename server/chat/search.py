@@ -0,0 +1,87 @@
+"""
+Full-text search over the messages of a user's conversations.
+
+Message.search_vector is a stored tsvector generated from the content and
+indexed by message_search_idx (GIN), so a search reads only the matching
+rows instead of scanning every message. Results are ranked with ts_rank and
+paged with a keyset cursor on (rank, created_at, id).
+"""
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.core import signing
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+from django.utils.dateparse import parse_datetime
+
+from .models import Conversation, Message
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+CONFIG = 'english'  # Must match the config Message.search_vector is generated with
+CURSOR_SALT = 'chat.search.cursor'
+
+
+def encode_cursor(message):
+    """Opaque, signed cursor after a ranked result."""
+    return signing.dumps(
+        {'r': message.rank, 't': message.created_at.isoformat(), 'i': str(message.id)},
+        salt=CURSOR_SALT,
+    )
+
+
+def decode_cursor(cursor):
+    """Return (rank, created_at, message_id) for a cursor. Raises ValueError if it was tampered with."""
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT)
+        rank, created_at = float(data['r']), parse_datetime(data['t'])
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if created_at is None:
+        raise ValueError('Invalid cursor')
+    return rank, created_at, data['i']
+
+
+def _query(text):
+    return SearchQuery(text, config=CONFIG, search_type='websearch')
+
+
+def matches(user, text):
+    """Messages in the user's active conversations matching `text`, annotated with `rank`, best first."""
+    query = _query(text)
+    conversations = Conversation.objects.filter(Q(volunteer=user) | Q(poster=user), is_active=True)
+    return (
+        Message.objects
+        .filter(search_vector=query, conversation__in=conversations.values('id'))
+        # Double precision, so the rank carried in the cursor compares exactly
+        .annotate(rank=Cast(SearchRank(F('search_vector'), query), FloatField()))
+        .order_by('-rank', '-created_at', '-id')
+    )
+
+
+def search_messages(user, text, limit, cursor=None):
+    """
+    Messages in the user's active conversations matching `text` (web search
+    syntax: words, "quoted phrases", -excluded), best match first. Each result
+    is annotated with `rank` and a highlighted `headline`. Returns (results, has_more).
+    """
+    results = matches(user, text)
+    if cursor:
+        rank, created_at, message_id = decode_cursor(cursor)
+        results = results.filter(
+            Q(rank__lt=rank)
+            | Q(rank=rank, created_at__lt=created_at)
+            | Q(rank=rank, created_at=created_at, id__lt=message_id)
+        )
+    page = list(results.values_list('id', 'rank')[:limit + 1])
+    ranks = dict(page[:limit])
+
+    # ts_headline re-parses the content, so it runs only for the page's rows
+    headline = SearchHeadline('content', _query(text), config=CONFIG, start_sel='<mark>', stop_sel='</mark>')
+    messages = (
+        Message.objects.filter(id__in=ranks)
+        .select_related('sender', 'conversation__job')
+        .annotate(headline=headline)
+        .in_bulk()
+    )
+    for message_id, rank in ranks.items():
+        messages[message_id].rank = rank
+    return [messages[message_id] for message_id in ranks], len(page) > limit
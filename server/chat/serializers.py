@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from .inbox import unread_count
 from .models import Conversation, Message
 from matching.serializers import JobMatchSerializer
 
@@ -14,6 +15,15 @@ class MessageSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'conversation', 'sender_id', 'sender_username', 'created_at']
 
 
+class MessageSearchResultSerializer(MessageSerializer):
+    job_title = serializers.CharField(source='conversation.job.title', read_only=True)
+    headline = serializers.CharField(read_only=True)  # Matched terms wrapped in <mark></mark>
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(MessageSerializer.Meta):
+        fields = MessageSerializer.Meta.fields + ['job_title', 'headline', 'rank']
+
+
 class ConversationSerializer(serializers.ModelSerializer):
     job = JobMatchSerializer(read_only=True)
     volunteer_username = serializers.CharField(source='volunteer.username', read_only=True)
@@ -32,38 +42,21 @@ class ConversationSerializer(serializers.ModelSerializer):
         ]
 
     def get_last_message(self, obj):
-        last = obj.messages.order_by('-created_at').first()
-        if last:
-            return {
-                'content': last.content[:100],
-                'sender_username': last.sender.username,
-                'created_at': last.created_at,
-            }
-        return None
+        if obj.last_message_at is None:
+            return None
+        # The sender is always one of the two participants, which are already loaded
+        sender = obj.volunteer if obj.last_message_sender_id == obj.volunteer_id else obj.poster
+        return {
+            'content': obj.last_message_content,
+            'sender_username': sender.username,
+            'created_at': obj.last_message_at,
+        }
 
     def get_unread_count(self, obj):
         request = self.context.get('request')
         if not request or not request.user:
             return 0
-
-        user = request.user
-        # Determine which last_read timestamp to use based on user role
-        if user.id == obj.volunteer_id:
-            last_read = obj.volunteer_last_read
-            # Count messages from the poster (the other party)
-            other_party_id = obj.poster_id
-        elif user.id == obj.poster_id:
-            last_read = obj.poster_last_read
-            # Count messages from the volunteer (the other party)
-            other_party_id = obj.volunteer_id
-        else:
-            return 0
-
-        # Count messages from the other party that are newer than last_read
-        messages = obj.messages.filter(sender_id=other_party_id)
-        if last_read:
-            messages = messages.filter(created_at__gt=last_read)
-        return messages.count()
+        return unread_count(obj, request.user)
 
 
 class SendMessageSerializer(serializers.Serializer):
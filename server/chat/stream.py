@@ -0,0 +1,175 @@
+"""
+Server-sent event stream of a conversation's new messages.
+
+    POST chat/conversations/<id>/stream-ticket            -> {"ticket": ...}
+    GET  chat/conversations/<id>/stream?ticket=<ticket>[&after=<cursor>]
+
+EventSource cannot send an Authorization header, and a bearer token in the
+URL would end up in access logs and browser history. So the client first
+trades its JWT for a ticket: random, valid for TICKET_SECONDS, for one
+conversation and redeemable once. The stream first replays messages after
+the cursor (or the Last-Event-ID the browser sends on reconnect), then
+relays messages published by send_message. Each event's id is the
+message's history cursor, so a new stream resumes exactly where the last
+one stopped.
+
+Held connections need an ASGI server. Under WSGI the stream ends after the
+replay and the client's reconnect degrades it to polling.
+"""
+import json
+import secrets
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from . import history
+from .inbox import mark_read
+from .models import Conversation
+from .pubsub import conversation_channel, get_pubsub
+from .serializers import MessageSerializer
+
+KEEPALIVE_SECONDS = 15
+# Connections are recycled so proxies and load balancers never see them idle forever
+MAX_STREAM_SECONDS = 300
+RETRY_MILLISECONDS = 3000
+TICKET_SECONDS = 30
+
+
+def message_event(message):
+    """Payload published for a new message: the serialized message plus its cursor."""
+    return {**MessageSerializer(message).data, 'cursor': history.encode_cursor(message)}
+
+
+def _format(event):
+    data = json.dumps(event, default=str)
+    return f"id: {event['cursor']}\nevent: message\ndata: {data}\n\n"
+
+
+def _ticket_key(ticket):
+    return f'chat:stream-ticket:{ticket}'
+
+
+def issue_ticket(user, conversation):
+    """A single-use ticket that opens `conversation`'s stream as `user` within TICKET_SECONDS."""
+    ticket = secrets.token_urlsafe(32)
+    cache.set(_ticket_key(ticket), {'user': user.id, 'conversation': str(conversation.id)}, timeout=TICKET_SECONDS)
+    return ticket
+
+
+def _redeem_ticket(ticket, conversation_id):
+    """Return the user a ticket was issued to for this conversation, or None. A ticket works once."""
+    grant = cache.get(_ticket_key(ticket))
+    # Only the request whose delete succeeds may use it, so concurrent redeems cannot both win
+    if grant is None or not cache.delete(_ticket_key(ticket)):
+        return None
+    if grant['conversation'] != str(conversation_id):
+        return None
+    return get_user_model().objects.filter(id=grant['user'], is_active=True).first()
+
+
+def _authenticate(request, conversation_id):
+    """Return the user for the request's stream ticket (or Authorization header), or None."""
+    ticket = request.GET.get('ticket')
+    if ticket:
+        return _redeem_ticket(ticket, conversation_id)
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        return None
+    auth = JWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(header[len('Bearer '):]))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def _load(request, conversation_id):
+    """Return (user, conversation, error response)."""
+    user = _authenticate(request, conversation_id)
+    if user is None:
+        return None, None, JsonResponse({'error': 'Authentication required'}, status=401)
+    try:
+        conversation = Conversation.objects.get(id=conversation_id, is_active=True)
+    except Conversation.DoesNotExist:
+        return None, None, JsonResponse({'error': 'Conversation not found'}, status=404)
+    if user.id not in (conversation.volunteer_id, conversation.poster_id):
+        return None, None, JsonResponse({'error': 'Access denied'}, status=403)
+    return user, conversation, None
+
+
+def _missed(conversation, after):
+    """Events for every message after the cursor, oldest first."""
+    events, has_more = [], True
+    while has_more:
+        messages, has_more = history.messages_after(conversation, after, history.MAX_PAGE_SIZE)
+        events.extend(message_event(message) for message in messages)
+        if messages:
+            after = events[-1]['cursor']
+    return events
+
+
+async def _events(request, user, conversation, after):
+    pubsub = get_pubsub()
+    channel = conversation_channel(conversation.id)
+    subscription = None
+    try:
+        # Subscribed on first read, so a response dropped before it is iterated holds
+        # nothing; and before the replay, so nothing published in between is missed
+        subscription = pubsub.subscribe(channel)
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'
+        replayed = await sync_to_async(_missed)(conversation, after) if after else []
+        if any(event['sender_id'] != user.id for event in replayed):
+            await sync_to_async(mark_read)(conversation, user)
+        for event in replayed:
+            yield _format(event)
+        # Messages sent during the replay arrive on the subscription as well
+        replayed = {event['id'] for event in replayed}
+        if not isinstance(request, ASGIRequest):
+            return  # WSGI: no held connections, let the browser reconnect
+
+        loop = subscription.loop
+        deadline = loop.time() + MAX_STREAM_SECONDS
+        while not subscription.overflowed:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            event = await subscription.get(timeout=min(KEEPALIVE_SECONDS, remaining))
+            if event is None:
+                yield ': keepalive\n\n'
+                continue
+            if event['id'] in replayed:
+                continue
+            if event['sender_id'] != user.id:
+                # Delivered to an open chat window counts as read
+                await sync_to_async(mark_read)(conversation, user)
+            yield _format(event)
+    finally:
+        if subscription is not None:
+            pubsub.unsubscribe(channel, subscription)
+
+
+async def conversation_stream(request, conversation_id):
+    user, conversation, error = await sync_to_async(_load)(request, conversation_id)
+    if error:
+        return error
+
+    # A browser reconnect repeats the original URL, so its Last-Event-ID is the newer position
+    after = request.headers.get('Last-Event-ID') or request.GET.get('after')
+    if after:
+        try:
+            history.decode_cursor(after)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+    response = StreamingHttpResponse(
+        _events(request, user, conversation, after),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Keep nginx from buffering the stream
+    return response
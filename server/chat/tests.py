@@ -0,0 +1,420 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.models import User
+from chat import history
+from chat.inbox import mark_read, recount, record_message
+from chat.models import Conversation, Message
+from chat.pubsub import InProcessPubSub, conversation_channel, get_pubsub
+from matching.models import Job
+
+
+class InboxTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.poster = User.objects.create_user(email='poster@example.com', username='poster', password='pass123')
+        self.client.force_authenticate(user=self.poster)
+
+    def _conversation(self, i, messages=0):
+        volunteer = User.objects.create_user(email=f'v{i}@example.com', username=f'v{i}', password='pass123')
+        job = Job.objects.create(
+            title=f'Job {i}',
+            description='Desc',
+            short_description='Short',
+            poster=self.poster,
+            latitude=42.73,
+            longitude=-84.55,
+            shift_start=timezone.now() + timezone.timedelta(hours=2),
+            shift_end=timezone.now() + timezone.timedelta(hours=4),
+        )
+        conversation = Conversation.objects.create(job=job, volunteer=volunteer, poster=self.poster)
+        for n in range(messages):
+            self._send(conversation, volunteer, f'Message {n} ' + 'x' * 150)
+        return conversation, volunteer
+
+    def _send(self, conversation, sender, content):
+        message = Message.objects.create(conversation=conversation, sender=sender, content=content)
+        record_message(conversation, message)
+
+    def _inbox_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/chat/conversations')
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries.captured_queries)
+
+    def test_query_count_is_constant(self):
+        self._conversation(0, messages=2)
+        _, few = self._inbox_queries()
+        for i in range(1, 6):
+            self._conversation(i, messages=3)
+        response, many = self._inbox_queries()
+        self.assertEqual(len(response.data), 6)
+        self.assertEqual(few, many)
+
+    def test_last_message_and_unread_count(self):
+        conversation, volunteer = self._conversation(0, messages=3)
+        self._send(conversation, self.poster, 'Reply')
+        self._conversation(1)
+
+        response, _ = self._inbox_queries()
+        by_id = {row['id']: row for row in response.data}
+        row = by_id[str(conversation.id)]
+        self.assertEqual(row['last_message']['content'], 'Reply')
+        self.assertEqual(row['last_message']['sender_username'], 'poster')
+        self.assertEqual(row['unread_count'], 3)  # The poster's own reply is not unread
+
+        mark_read(conversation, self.poster)
+        self._send(conversation, volunteer, 'y' * 300)
+        response, _ = self._inbox_queries()
+        row = {row['id']: row for row in response.data}[str(conversation.id)]
+        self.assertEqual(row['unread_count'], 1)
+        self.assertEqual(len(row['last_message']['content']), 100)
+
+        empty = [row for row in response.data if row['id'] != str(conversation.id)][0]
+        self.assertIsNone(empty['last_message'])
+        self.assertEqual(empty['unread_count'], 0)
+
+        # The volunteer sees the poster's reply as unread
+        self.client.force_authenticate(user=volunteer)
+        response, _ = self._inbox_queries()
+        self.assertEqual(response.data[0]['unread_count'], 1)
+
+    def test_send_and_read_maintain_counters(self):
+        conversation, volunteer = self._conversation(0)
+        self.client.force_authenticate(user=volunteer)
+        for text in ('Hi', 'Are you there?'):
+            response = self.client.post(f'/api/chat/conversations/{conversation.id}/send', {'content': text})
+            self.assertEqual(response.status_code, 201)
+
+        conversation.refresh_from_db()
+        self.assertEqual((conversation.poster_unread, conversation.volunteer_unread), (2, 0))
+        self.assertEqual(conversation.last_message_content, 'Are you there?')
+
+        self.client.force_authenticate(user=self.poster)
+        self.assertEqual(self.client.get('/api/chat/unread').data['unread'], 2)
+        response = self.client.get(f'/api/chat/conversations/{conversation.id}/messages')
+        self.assertEqual(response.data['conversation']['unread_count'], 0)
+        self.assertEqual(len(response.data['messages']), 2)
+        self.assertEqual(self.client.get('/api/chat/unread').data['unread'], 0)
+
+    def test_pages_across_both_roles_newest_first(self):
+        conversations = [self._conversation(i)[0] for i in range(4)]
+        # The poster also volunteers on someone else's job
+        other_poster = User.objects.create_user(email='other@example.com', username='other', password='pass123')
+        job = Job.objects.create(
+            title='Other job', description='Desc', short_description='Short', poster=other_poster,
+            latitude=42.73, longitude=-84.55,
+            shift_start=timezone.now() + timezone.timedelta(hours=2),
+            shift_end=timezone.now() + timezone.timedelta(hours=4),
+        )
+        conversations.append(Conversation.objects.create(job=job, volunteer=self.poster, poster=other_poster))
+        self._send(conversations[1], self.poster, 'Bump')  # Moves it to the top
+        Conversation.objects.filter(pk=conversations[2].pk).update(is_active=False)
+
+        seen, cursor = [], None
+        while True:
+            response = self.client.get('/api/chat/conversations', {'limit': 2, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            seen += [row['id'] for row in response.data]
+            cursor = response.get('X-Next-Cursor')
+            if not cursor:
+                break
+
+        expected = [conversations[1]] + [c for c in reversed(conversations) if c not in (conversations[1], conversations[2])]
+        self.assertEqual(seen, [str(c.id) for c in expected])
+        self.assertEqual(self.client.get('/api/chat/conversations', {'cursor': 'forged'}).status_code, 400)
+
+    def test_recount_matches_counters(self):
+        conversation, volunteer = self._conversation(0, messages=3)
+        self._send(conversation, self.poster, 'Reply')
+        conversation.refresh_from_db()
+        expected = (conversation.last_message_content, conversation.last_message_at,
+                    conversation.volunteer_unread, conversation.poster_unread)
+
+        Conversation.objects.filter(pk=conversation.pk).update(
+            last_message_content='', last_message_at=None, volunteer_unread=0, poster_unread=0,
+        )
+        recount(Conversation.objects.filter(pk=conversation.pk))
+        conversation.refresh_from_db()
+        self.assertEqual(
+            (conversation.last_message_content, conversation.last_message_at,
+             conversation.volunteer_unread, conversation.poster_unread),
+            expected,
+        )
+
+
+class MessageHistoryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.poster = User.objects.create_user(email='poster@example.com', username='poster', password='pass123')
+        self.volunteer = User.objects.create_user(email='vol@example.com', username='vol', password='pass123')
+        job = Job.objects.create(
+            title='Job',
+            description='Desc',
+            short_description='Short',
+            poster=self.poster,
+            latitude=42.73,
+            longitude=-84.55,
+            shift_start=timezone.now() + timezone.timedelta(hours=2),
+            shift_end=timezone.now() + timezone.timedelta(hours=4),
+        )
+        self.conversation = Conversation.objects.create(job=job, volunteer=self.volunteer, poster=self.poster)
+        for n in range(7):
+            self._send(self.volunteer, f'Message {n}')
+        self.url = f'/api/chat/conversations/{self.conversation.id}/messages'
+        self.client.force_authenticate(user=self.poster)
+
+    def _send(self, sender, content):
+        message = Message.objects.create(conversation=self.conversation, sender=sender, content=content)
+        record_message(self.conversation, message)
+
+    def _contents(self, response):
+        return [message['content'] for message in response.data['messages']]
+
+    def test_pages_back_through_history(self):
+        response = self.client.get(self.url, {'limit': 3})
+        self.assertEqual(self._contents(response), ['Message 4', 'Message 5', 'Message 6'])
+
+        response = self.client.get(self.url, {'limit': 3, 'before': response.data['older_cursor']})
+        self.assertEqual(self._contents(response), ['Message 1', 'Message 2', 'Message 3'])
+
+        response = self.client.get(self.url, {'limit': 3, 'before': response.data['older_cursor']})
+        self.assertEqual(self._contents(response), ['Message 0'])
+        self.assertIsNone(response.data['older_cursor'])
+
+    def test_after_returns_only_new_messages(self):
+        cursor = self.client.get(self.url).data['latest_cursor']
+
+        response = self.client.get(self.url, {'after': cursor})
+        self.assertEqual(self._contents(response), [])
+        self.assertEqual(response.data['latest_cursor'], cursor)
+
+        self._send(self.volunteer, 'New 1')
+        self._send(self.volunteer, 'New 2')
+        response = self.client.get(self.url, {'after': cursor, 'limit': 1})
+        self.assertEqual(self._contents(response), ['New 1'])
+        self.assertTrue(response.data['has_more'])
+        response = self.client.get(self.url, {'after': response.data['latest_cursor']})
+        self.assertEqual(self._contents(response), ['New 2'])
+        self.assertFalse(response.data['has_more'])
+
+    def test_idle_poll_writes_nothing(self):
+        cursor = self.client.get(self.url).data['latest_cursor']
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.poster_unread, 0)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'after': cursor})
+        self.assertFalse([q for q in queries.captured_queries if q['sql'].startswith('UPDATE')])
+
+        self._send(self.volunteer, 'New')
+        self.client.get(self.url, {'after': cursor})
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.poster_unread, 0)
+
+    def test_rejects_forged_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'after': 'forged'}).status_code, 400)
+
+
+class PubSubTests(SimpleTestCase):
+    async def test_publish_reaches_subscribers_of_the_channel(self):
+        pubsub = InProcessPubSub()
+        subscription = pubsub.subscribe('conversation:a')
+        other = pubsub.subscribe('conversation:b')
+
+        # Publishing happens on request threads, off the subscriber's loop
+        await sync_to_async(pubsub.publish, thread_sensitive=False)('conversation:a', {'n': 1})
+        self.assertEqual(await subscription.get(timeout=1), {'n': 1})
+        self.assertIsNone(await other.get(timeout=0.01))
+
+        pubsub.unsubscribe('conversation:a', subscription)
+        pubsub.publish('conversation:a', {'n': 2})
+        self.assertIsNone(await subscription.get(timeout=0.01))
+
+
+class MessageStreamTests(TestCase):
+    def setUp(self):
+        self.poster = User.objects.create_user(email='poster@example.com', username='poster', password='pass123')
+        self.volunteer = User.objects.create_user(email='vol@example.com', username='vol', password='pass123')
+        job = Job.objects.create(
+            title='Job',
+            description='Desc',
+            short_description='Short',
+            poster=self.poster,
+            latitude=42.73,
+            longitude=-84.55,
+            shift_start=timezone.now() + timezone.timedelta(hours=2),
+            shift_end=timezone.now() + timezone.timedelta(hours=4),
+        )
+        self.conversation = Conversation.objects.create(job=job, volunteer=self.volunteer, poster=self.poster)
+        self.first = Message.objects.create(conversation=self.conversation, sender=self.volunteer, content='First')
+        record_message(self.conversation, self.first)
+        self.url = f'/api/chat/conversations/{self.conversation.id}/stream'
+        cache.clear()
+
+    def _ticket(self, user, conversation=None):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        conversation = conversation or self.conversation
+        return client.post(f'/api/chat/conversations/{conversation.id}/stream-ticket')
+
+    def _send(self, content):
+        client = APIClient()
+        client.force_authenticate(user=self.volunteer)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(f'/api/chat/conversations/{self.conversation.id}/send', {'content': content})
+        self.assertEqual(response.status_code, 201)
+
+    async def _next_event(self, chunks):
+        async for chunk in chunks:
+            chunk = chunk.decode()
+            if 'event: message' in chunk:
+                return json.loads(chunk.split('data: ', 1)[1])
+
+    async def test_replays_missed_messages_then_pushes_new_ones(self):
+        ticket = (await sync_to_async(self._ticket)(self.poster)).data['ticket']
+        response = await self.async_client.get(self.url, {
+            'ticket': ticket, 'after': history.encode_cursor(self.first),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        await sync_to_async(self._send)('Missed')
+
+        chunks = aiter(response.streaming_content)
+        event = await self._next_event(chunks)
+        self.assertEqual(event['content'], 'Missed')
+
+        await sync_to_async(self._send)('Live')
+        event = await self._next_event(chunks)
+        self.assertEqual(event['content'], 'Live')
+        self.assertEqual(event['sender_id'], self.volunteer.id)
+        await chunks.aclose()
+
+        # Delivered to the open stream, so the poster has read it
+        await self.conversation.arefresh_from_db()
+        self.assertEqual(self.conversation.poster_unread, 0)
+
+    async def test_ticket_is_single_use_and_scoped(self):
+        ticket = (await sync_to_async(self._ticket)(self.poster)).data['ticket']
+        response = await self.async_client.get(self.url, {'ticket': ticket})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((await self.async_client.get(self.url, {'ticket': ticket})).status_code, 401)
+
+        # A ticket for another of the poster's conversations does not open this one
+        volunteer = await User.objects.acreate_user(email='v2@example.com', username='v2', password='pass123')
+        other = await Conversation.objects.acreate(job_id=self.conversation.job_id, volunteer=volunteer, poster=self.poster)
+        ticket = (await sync_to_async(self._ticket)(self.poster, other)).data['ticket']
+        self.assertEqual((await self.async_client.get(self.url, {'ticket': ticket})).status_code, 401)
+
+    async def test_rejects_access_tokens_in_url_and_outsiders(self):
+        response = await self.async_client.get(self.url, {'token': str(AccessToken.for_user(self.poster))})
+        self.assertEqual(response.status_code, 401)
+
+        outsider = await User.objects.acreate_user(email='x@example.com', username='x', password='pass123')
+        self.assertEqual((await sync_to_async(self._ticket)(outsider)).status_code, 403)
+
+    async def test_unread_response_holds_no_subscription(self):
+        ticket = (await sync_to_async(self._ticket)(self.poster)).data['ticket']
+        response = await self.async_client.get(self.url, {'ticket': ticket})
+        self.assertEqual(response.status_code, 200)
+        del response  # The client went away before the first read
+        self.assertNotIn(conversation_channel(self.conversation.id), get_pubsub()._subscribers)
+
+
+class MessageSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.poster = User.objects.create_user(email='poster@example.com', username='poster', password='pass123')
+        self.volunteer = User.objects.create_user(email='vol@example.com', username='vol', password='pass123')
+        self.conversation = self._conversation('Food bank', self.volunteer, self.poster)
+        self.client.force_authenticate(user=self.poster)
+
+    def _conversation(self, title, volunteer, poster):
+        job = Job.objects.create(
+            title=title,
+            description='Desc',
+            short_description='Short',
+            poster=poster,
+            latitude=42.73,
+            longitude=-84.55,
+            shift_start=timezone.now() + timezone.timedelta(hours=2),
+            shift_end=timezone.now() + timezone.timedelta(hours=4),
+        )
+        return Conversation.objects.create(job=job, volunteer=volunteer, poster=poster)
+
+    def _send(self, conversation, sender, content):
+        return Message.objects.create(conversation=conversation, sender=sender, content=content)
+
+    def _search(self, **params):
+        response = self.client.get('/api/chat/search', params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_ranks_matches_and_highlights_terms(self):
+        self._send(self.conversation, self.volunteer, 'Can we meet at the loading dock?')
+        self._send(self.conversation, self.volunteer, 'Parking is behind the building, near the dock. The dock closes at 5.')
+        self._send(self.conversation, self.poster, 'See you Saturday')
+
+        results = self._search(q='docks').data['results']
+        self.assertEqual(len(results), 2)
+        self.assertTrue(results[0]['content'].startswith('Parking'))  # Mentions the dock twice
+        self.assertIn('<mark>dock</mark>', results[0]['headline'])
+        self.assertEqual(results[0]['job_title'], 'Food bank')
+
+        results = self._search(q='dock -parking').data['results']
+        self.assertEqual([r['content'] for r in results], ['Can we meet at the loading dock?'])
+
+    def test_scoped_to_the_users_conversations(self):
+        outsider = User.objects.create_user(email='x@example.com', username='x', password='pass123')
+        other = self._conversation('Park cleanup', outsider, self.volunteer)
+        self._send(other, outsider, 'The gate code is 1234')
+        self._send(self.conversation, self.volunteer, 'What is the gate code?')
+
+        results = self._search(q='gate code').data['results']
+        self.assertEqual([r['content'] for r in results], ['What is the gate code?'])
+
+        other.is_active = False
+        other.save()
+        self.client.force_authenticate(user=self.volunteer)
+        self.assertEqual(len(self._search(q='gate').data['results']), 1)
+
+    def test_pages_through_results(self):
+        for n in range(5):
+            self._send(self.conversation, self.volunteer, f'Shift reminder {n}')
+
+        seen, cursor = [], None
+        while True:
+            params = {'q': 'shift', 'limit': 2, **({'cursor': cursor} if cursor else {})}
+            data = self._search(**params).data
+            seen += [r['content'] for r in data['results']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        # Equal ranks fall back to newest first
+        self.assertEqual(seen, [f'Shift reminder {n}' for n in reversed(range(5))])
+
+    def test_admin_search_matches_content_and_sender(self):
+        self._send(self.conversation, self.volunteer, 'Bring gloves to the loading dock')
+        self._send(self.conversation, self.poster, 'Thanks for coming')
+        admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='pass123')
+        self.client.force_login(admin)
+
+        def found(term):
+            response = self.client.get('/admin/chat/message/', {'q': term})
+            self.assertEqual(response.status_code, 200)
+            return sorted(message.content for message in response.context['cl'].result_list)
+
+        self.assertEqual(found('gloves'), ['Bring gloves to the loading dock'])
+        self.assertEqual(found('poster'), ['Thanks for coming'])
+
+    def test_rejects_missing_query_and_forged_cursor(self):
+        self.assertEqual(self.client.get('/api/chat/search').status_code, 400)
+        self.assertEqual(self.client.get('/api/chat/search', {'q': 'dock', 'cursor': 'forged'}).status_code, 400)
@@ -1,10 +1,14 @@
 from django.urls import path
 
-from . import views
+from . import stream, views
 
 urlpatterns = [
     path('conversations', views.list_conversations, name='list-conversations'),
+    path('unread', views.unread_messages, name='unread-messages'),
+    path('search', views.search_messages, name='search-messages'),
     path('conversations/<uuid:conversation_id>/messages', views.get_messages, name='get-messages'),
+    path('conversations/<uuid:conversation_id>/stream-ticket', views.stream_ticket, name='stream-ticket'),
+    path('conversations/<uuid:conversation_id>/stream', stream.conversation_stream, name='conversation-stream'),
     path('conversations/<uuid:conversation_id>/send', views.send_message, name='send-message'),
     path('job/<uuid:job_id>/conversation', views.get_conversation_by_job, name='job-conversation'),
 ]
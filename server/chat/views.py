@@ -3,32 +3,53 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from django.db.models import Q
-from django.utils import timezone
+from django.db import transaction
 
+from . import history, search
+from .inbox import inbox, inbox_page, mark_read, record_message, unread_count, unread_total
+from .inbox import MAX_PAGE_SIZE as INBOX_MAX_PAGE_SIZE, PAGE_SIZE as INBOX_PAGE_SIZE
 from .models import Conversation, Message
-from .serializers import ConversationSerializer, MessageSerializer, SendMessageSerializer
+from .pubsub import conversation_channel, get_pubsub
+from .serializers import (
+    ConversationSerializer, MessageSearchResultSerializer, MessageSerializer, SendMessageSerializer,
+)
+from .stream import issue_ticket, message_event
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def list_conversations(request):
-    """List all conversations for the current user (as volunteer or poster)."""
-    conversations = Conversation.objects.filter(
-        Q(volunteer=request.user) | Q(poster=request.user),
-        is_active=True,
-    ).select_related('job', 'volunteer', 'poster').prefetch_related('messages')
+    """
+    The current user's conversations (as volunteer or poster), most recently
+    active first. Paged: pass the X-Next-Cursor response header as ?cursor=.
+    """
+    try:
+        limit = min(max(int(request.query_params.get('limit', INBOX_PAGE_SIZE)), 1), INBOX_MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        conversations, next_cursor = inbox_page(request.user, limit, request.query_params.get('cursor'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    data = ConversationSerializer(conversations, many=True, context={'request': request}).data
-    return Response(data)
+    response = Response(ConversationSerializer(conversations, many=True, context={'request': request}).data)
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+    return response
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_messages(request, conversation_id):
-    """Get all messages for a conversation."""
+    """
+    Message history for a conversation, oldest first.
+
+    Without parameters returns the newest page. ?before=<older_cursor> pages
+    back through history; ?after=<latest_cursor> returns only messages newer
+    than a previous response, for polling.
+    """
     try:
-        conversation = Conversation.objects.get(
+        conversation = Conversation.objects.select_related('job', 'job__poster', 'volunteer', 'poster').get(
             id=conversation_id,
             is_active=True,
         )
@@ -39,20 +60,65 @@ def get_messages(request, conversation_id):
     if request.user != conversation.volunteer and request.user != conversation.poster:
         return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
 
-    messages = conversation.messages.select_related('sender').all()
-    data = MessageSerializer(messages, many=True).data
+    try:
+        limit = min(max(int(request.query_params.get('limit', history.PAGE_SIZE)), 1), history.MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+    before = request.query_params.get('before')
+    after = request.query_params.get('after')
+
+    # Mark messages as read for this user. Done before loading them, so a message
+    # arriving in between is counted as unread rather than lost. Skipped when
+    # nothing is unread, so polling an idle conversation writes nothing
+    if not before and unread_count(conversation, request.user):
+        mark_read(conversation, request.user)
+
+    has_older = has_more = False
+    try:
+        if after:
+            messages, has_more = history.messages_after(conversation, after, limit)
+        else:
+            messages, has_older = history.history_page(conversation, limit, before)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    latest_cursor = None
+    if not before:
+        latest_cursor = history.encode_cursor(messages[-1]) if messages else after
+    return Response({
+        'conversation': ConversationSerializer(conversation, context={'request': request}).data,
+        'messages': MessageSerializer(messages, many=True).data,
+        'older_cursor': history.encode_cursor(messages[0]) if has_older else None,
+        'latest_cursor': latest_cursor,  # Pass as ?after= on the next poll
+        'has_more': has_more,  # More new messages than `limit`: poll again right away
+    })
 
-    # Mark messages as read for this user
-    now = timezone.now()
-    if request.user == conversation.volunteer:
-        conversation.volunteer_last_read = now
-    elif request.user == conversation.poster:
-        conversation.poster_last_read = now
-    conversation.save(update_fields=['volunteer_last_read' if request.user == conversation.volunteer else 'poster_last_read'])
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_messages(request):
+    """
+    Search the messages of the user's conversations, best match first.
+
+    ?q= takes web search syntax ("exact phrase", -exclude). Pass the
+    response's next_cursor as ?cursor= for the next page.
+    """
+    text = request.query_params.get('q', '').strip()
+    if not text:
+        return Response({'error': 'Search query is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(max(int(request.query_params.get('limit', search.PAGE_SIZE)), 1), search.MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        results, has_more = search.search_messages(request.user, text, limit, request.query_params.get('cursor'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     return Response({
-        'conversation': ConversationSerializer(conversation, context={'request': request}).data,
-        'messages': data,
+        'results': MessageSearchResultSerializer(results, many=True).data,
+        'next_cursor': search.encode_cursor(results[-1]) if has_more else None,
     })
 
 
@@ -61,7 +127,7 @@ def get_messages(request, conversation_id):
 def send_message(request, conversation_id):
     """Send a message to a conversation."""
     try:
-        conversation = Conversation.objects.get(
+        conversation = Conversation.objects.select_related('volunteer', 'poster').get(
             id=conversation_id,
             is_active=True,
         )
@@ -75,28 +141,49 @@ def send_message(request, conversation_id):
     serializer = SendMessageSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
 
-    message = Message.objects.create(
-        conversation=conversation,
-        sender=request.user,
-        content=serializer.validated_data['content'],
-    )
-
-    # Update conversation's updated_at to sort by most recent activity
-    conversation.save()
+    with transaction.atomic():
+        message = Message.objects.create(
+            conversation=conversation,
+            sender=request.user,
+            content=serializer.validated_data['content'],
+        )
+        record_message(conversation, message)
+        event = message_event(message)
+        # Open chat streams only hear about the message once it is visible to their queries
+        transaction.on_commit(lambda: get_pubsub().publish(conversation_channel(conversation.id), event))
 
     return Response(MessageSerializer(message).data, status=status.HTTP_201_CREATED)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def stream_ticket(request, conversation_id):
+    """Issue a short-lived, single-use ticket for opening the conversation's message stream."""
+    try:
+        conversation = Conversation.objects.get(id=conversation_id, is_active=True)
+    except Conversation.DoesNotExist:
+        return Response({'error': 'Conversation not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    # Ensure user is part of the conversation
+    if request.user.id not in (conversation.volunteer_id, conversation.poster_id):
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    return Response({'ticket': issue_ticket(request.user, conversation)}, status=status.HTTP_201_CREATED)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_conversation_by_job(request, job_id):
     """Get or return info about a conversation for a specific job."""
     try:
-        conversation = Conversation.objects.get(
-            Q(volunteer=request.user) | Q(poster=request.user),
-            job_id=job_id,
-            is_active=True,
-        )
+        conversation = inbox(request.user).get(job_id=job_id)
         return Response(ConversationSerializer(conversation, context={'request': request}).data)
     except Conversation.DoesNotExist:
         return Response({'error': 'No conversation found for this job'}, status=status.HTTP_404_NOT_FOUND)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def unread_messages(request):
+    """Total unread messages across the user's conversations (navbar badge)."""
+    return Response({'unread': unread_total(request.user)})
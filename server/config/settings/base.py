@@ -73,6 +73,15 @@ DATABASES = {
     }
 }
 
+# Shared cache (geocoding, AI results, rate limits, matching feeds). Point this
+# at Redis or Memcached when running more than one worker process.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -123,6 +132,9 @@ CORS_ALLOWED_ORIGINS = config(
     default='http://localhost:3000',
 ).split(',')
 
+# Feed paging cursor for the matching swipe deck
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor']
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
@@ -131,3 +143,10 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 
 GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
+
+# Rank the matching feed with a SQL score annotation instead of in Python
+MATCHING_SCORE_IN_DATABASE = config('MATCHING_SCORE_IN_DATABASE', default=False, cast=bool)
+
+# Live chat delivery. The in-process backend only reaches streams served by the
+# same process; use a shared-broker backend when running several ASGI workers.
+CHAT_PUBSUB_BACKEND = config('CHAT_PUBSUB_BACKEND', default='chat.pubsub.InProcessPubSub')
@@ -0,0 +1,25 @@
+import hashlib
+import json
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def conditional_response(request, data, last_modified=None):
+    """
+    Response for a read-only GET carrying an ETag of the payload (and
+    Last-Modified when given), or a 304 when the client's copy is current.
+
+    The ETag hashes the serialized data, so it covers every field in the
+    payload; pass last_modified only when that moment bounds all of them.
+    """
+    payload = json.dumps(data, sort_keys=True, default=str).encode()
+    response = Response(data)
+    response['ETag'] = quote_etag(hashlib.md5(payload, usedforsecurity=False).hexdigest())
+    response['Cache-Control'] = 'private, no-cache'
+    timestamp = None
+    if last_modified is not None:
+        timestamp = int(last_modified.timestamp())
+        response['Last-Modified'] = http_date(timestamp)
+    return get_conditional_response(request, etag=response['ETag'], last_modified=timestamp, response=response)
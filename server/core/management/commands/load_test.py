@@ -0,0 +1,280 @@
+"""
+Management command to load-test the swipe flow end to end.
+
+Usage:
+    python manage.py load_test
+    python manage.py load_test --volunteers 200 --concurrency 50 --iterations 10 --json report.json
+
+Starts the real WSGI app on a local threaded server, with the geocoding and
+ai_assist upstreams stubbed, and drives it over HTTP from --concurrency
+client threads. Each virtual volunteer logs in and then repeats:
+
+    GET  matching/jobs                      fetch a feed page
+    POST matching/interest                  swipe on a few jobs
+    POST matching/jobs/<id>/confirm         the job's poster confirms a right swipe
+    GET  chat/job/<id>/conversation         find the chat the confirm opened
+    POST chat/conversations/<id>/send       send a message
+
+The report gives p50/p95/p99 latency, throughput and database queries per
+request for each endpoint. Test accounts and jobs are created up front with
+a unique prefix and deleted afterwards unless --keep-data is given.
+
+Clients and server share one process (and GIL), so absolute numbers are a
+conservative estimate of a single worker; compare runs with the same flags.
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import timedelta
+from unittest.mock import patch
+
+import requests
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+from django.db import connection
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+from authentication.models import User
+from matching.models import Job, UserProfile
+
+PASSWORD = 'loadtest1234'
+BASE_LAT = 42.7370
+BASE_LNG = -84.4839
+
+# Upstreams replaced for the whole run
+STUBS = {
+    'matching.views.reverse_geocode': lambda lat, lng: 'Load Test, MI',
+    'matching.views.forward_geocode': lambda query: (BASE_LAT, BASE_LNG, 'Load Test, MI'),
+    'ai_assist.views.enhance_job_description': lambda prompt: {
+        'title': 'Load test', 'short_description': 'Load test', 'description': 'Load test', 'skill_tags': [],
+    },
+    'ai_assist.views.generate_job_image': lambda prompt: '',
+}
+
+
+def _percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, round(percent / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class _QueryCounter:
+    """WSGI wrapper recording the number of DB queries per URL name."""
+
+    def __init__(self, app):
+        self.app = app
+        self.counts = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            response = self.app(environ, start_response)
+        try:
+            name = resolve(environ['PATH_INFO']).url_name
+        except Resolver404:
+            name = environ['PATH_INFO']
+        with self.lock:
+            self.counts[name].append(len(queries))
+        return response
+
+
+class Command(BaseCommand):
+    help = 'Drive the login/feed/swipe/confirm/chat flow under concurrency and report latency per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--volunteers', type=int, default=50, help='Virtual volunteers')
+        parser.add_argument('--posters', type=int, default=5)
+        parser.add_argument('--jobs', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20, help='Client threads')
+        parser.add_argument('--iterations', type=int, default=5, help='Feed/swipe rounds per volunteer')
+        parser.add_argument('--swipes', type=int, default=5, help='Swipes per feed page')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', help='Also write the report to this file')
+        parser.add_argument('--keep-data', action='store_true', help='Do not delete the generated accounts')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+        prefix = f'loadtest_{uuid.uuid4().hex[:8]}'
+
+        volunteers, posters, job_posters = self._create_data(prefix, options)
+        self.job_posters = job_posters
+        try:
+            with ExitStack() as stack:
+                for target, stub in STUBS.items():
+                    stack.enter_context(patch(target, stub))
+                counter = _QueryCounter(get_internal_wsgi_application())
+                server = ThreadedWSGIServer(('127.0.0.1', 0), _QuietHandler)
+                server.set_app(counter)
+                server.daemon_threads = True
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+                self.base_url = f'http://127.0.0.1:{server.server_port}/api'
+                try:
+                    started = time.monotonic()
+                    self.poster_tokens = {}
+                    with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                        for email, (token, _) in zip(posters, pool.map(self._login, posters)):
+                            self.poster_tokens[email] = token
+                        list(pool.map(lambda email: self._volunteer(email, options), volunteers))
+                    elapsed = time.monotonic() - started
+                finally:
+                    server.shutdown()
+                    server.server_close()
+        finally:
+            if not options['keep_data']:
+                User.objects.filter(username__startswith=prefix).delete()
+
+        self._report(elapsed, counter.counts, options)
+
+    # ── Setup ─────────────────────────────────────────────────────────────────
+
+    def _create_data(self, prefix, options):
+        password = make_password(PASSWORD)
+        users = User.objects.bulk_create([
+            User(username=f'{prefix}_{role}_{i}', email=f'{prefix}_{role}_{i}@loadtest.local', password=password)
+            for role, count in (('poster', options['posters']), ('volunteer', options['volunteers']))
+            for i in range(count)
+        ])
+        posters = [user for user in users if '_poster_' in user.username]
+        volunteers = [user for user in users if '_volunteer_' in user.username]
+        for user in volunteers:
+            UserProfile.objects.create(
+                user=user,
+                latitude=BASE_LAT + self.rng.uniform(-0.05, 0.05),
+                longitude=BASE_LNG + self.rng.uniform(-0.05, 0.05),
+                skill_tags=self.rng.sample(['Teaching', 'Driving', 'Cooking', 'Teamwork'], 2),
+            )
+
+        now = timezone.now()
+        job_posters = {}
+        for i in range(options['jobs']):
+            poster = posters[i % len(posters)]
+            job = Job.objects.create(
+                title=f'Load test job {i}',
+                description='Generated by load_test.',
+                short_description='Generated by load_test.',
+                poster=poster,
+                latitude=BASE_LAT + self.rng.uniform(-0.1, 0.1),
+                longitude=BASE_LNG + self.rng.uniform(-0.1, 0.1),
+                shift_start=now + timedelta(hours=self.rng.uniform(2, 150)),
+                shift_end=now + timedelta(hours=160),
+                skill_tags=self.rng.sample(['Teaching', 'Driving', 'Cooking', 'Teamwork'], 1),
+            )
+            job_posters[str(job.id)] = poster.email
+        return [user.email for user in volunteers], [user.email for user in posters], job_posters
+
+    # ── Client ────────────────────────────────────────────────────────────────
+
+    def _call(self, name, method, path, token=None, **kwargs):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        start = time.perf_counter()
+        try:
+            response = requests.request(method, self.base_url + path, headers=headers, timeout=30, **kwargs)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.latencies[name].append(elapsed)
+            if not ok:
+                self.errors[name] += 1
+        return response if ok else None
+
+    def _login(self, email):
+        """Return (access token, user id), or (None, None) if login failed."""
+        response = self._call('auth-login', 'post', '/auth/login/', json={'email': email, 'password': PASSWORD})
+        if not response:
+            return None, None
+        data = response.json()
+        return data['access'], data['user']['id']
+
+    def _volunteer(self, email, options):
+        token, user_id = self._login(email)
+        if not token:
+            return
+        rng = random.Random(f"{options['seed']}:{email}")
+        for _ in range(options['iterations']):
+            response = self._call('matching-jobs', 'get', '/matching/jobs', token, params={'limit': 10})
+            if not response:
+                continue
+            for job in response.json()[:options['swipes']]:
+                interested = rng.random() < 0.5
+                self._call('matching-interest', 'post', '/matching/interest', token,
+                           json={'job_id': job['id'], 'interested': interested})
+                if interested:
+                    self._confirm_and_chat(job['id'], user_id, token)
+
+    def _confirm_and_chat(self, job_id, user_id, token):
+        poster_email = self.job_posters.get(job_id)
+        if poster_email is None:
+            return  # Not one of ours (the database may hold other jobs nearby)
+        confirmed = self._call('confirm-volunteer', 'post', f'/matching/jobs/{job_id}/confirm',
+                               self.poster_tokens.get(poster_email), json={'user_id': user_id})
+        if not confirmed:
+            return
+        conversation = self._call('job-conversation', 'get', f'/chat/job/{job_id}/conversation', token)
+        if conversation:
+            self._call('send-message', 'post', f"/chat/conversations/{conversation.json()['id']}/send", token,
+                       json={'content': 'Hi! I can help with this.'})
+
+    # ── Report ────────────────────────────────────────────────────────────────
+
+    def _report(self, elapsed, query_counts, options):
+        rows = []
+        for name, samples in sorted(self.latencies.items()):
+            queries = query_counts.get(name, [])
+            rows.append({
+                'endpoint': name,
+                'requests': len(samples),
+                'errors': self.errors[name],
+                'p50_ms': round(_percentile(samples, 50) * 1000, 1),
+                'p95_ms': round(_percentile(samples, 95) * 1000, 1),
+                'p99_ms': round(_percentile(samples, 99) * 1000, 1),
+                'req_per_sec': round(len(samples) / elapsed, 1),
+                'avg_queries': round(sum(queries) / len(queries), 1) if queries else None,
+                'max_queries': max(queries) if queries else None,
+            })
+        total = sum(row['requests'] for row in rows)
+
+        self.stdout.write(
+            f"\n{options['volunteers']} volunteers, concurrency {options['concurrency']}: "
+            f'{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)\n'
+        )
+        self.stdout.write(
+            f"{'endpoint':<20}{'reqs':>7}{'errs':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'req/s':>8}{'queries':>9}{'max q':>7}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['endpoint']:<20}{row['requests']:>7}{row['errors']:>6}{row['p50_ms']:>9}"
+                f"{row['p95_ms']:>9}{row['p99_ms']:>9}{row['req_per_sec']:>8}"
+                f"{row['avg_queries'] if row['avg_queries'] is not None else '-':>9}"
+                f"{row['max_queries'] if row['max_queries'] is not None else '-':>7}"
+            )
+
+        if options['json']:
+            with open(options['json'], 'w') as f:
+                json.dump({'elapsed_sec': round(elapsed, 2), 'requests': total, 'endpoints': rows}, f, indent=2)
+                f.write('\n')
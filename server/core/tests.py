@@ -0,0 +1,30 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from authentication.models import User
+
+
+class LoadTestCommandTests(TransactionTestCase):
+    def test_reports_every_endpoint_and_cleans_up(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            report_path = os.path.join(tmp, 'report.json')
+            call_command(
+                'load_test', '--volunteers', '2', '--posters', '1', '--jobs', '4',
+                '--concurrency', '2', '--iterations', '1', '--swipes', '4', '--json', report_path,
+                stdout=StringIO(),
+            )
+            with open(report_path) as f:
+                report = json.load(f)
+
+        endpoints = {row['endpoint']: row for row in report['endpoints']}
+        self.assertEqual(endpoints['auth-login']['requests'], 3)
+        self.assertEqual(endpoints['matching-jobs']['requests'], 2)
+        self.assertEqual(endpoints['matching-interest']['requests'], 8)
+        self.assertTrue(all(row['errors'] == 0 for row in report['endpoints']))
+        self.assertGreater(endpoints['matching-jobs']['avg_queries'], 0)
+        self.assertFalse(User.objects.exists())
@@ -0,0 +1,29 @@
+"""
+Accessibility flags as bitmasks.
+
+Job.accessibility_requirements and UserProfile.limitations are lists of flag
+names. The known flags are mirrored into integer mask columns so candidate
+queries can drop excluded pairs in SQL (requirements & limitations = 0)
+instead of loading them first. Unknown names get no bit, so the SQL filter
+never drops on them; calculate_score() still applies the exact list check.
+"""
+from django.db.models import F
+
+# Produced by _accessibility_flags_to_requirements() from the job form / Gemini
+ACCESSIBILITY_FLAGS = ('heavy_lifting', 'standing_long', 'driving_required', 'outdoor_work')
+FLAG_BITS = {flag: 1 << bit for bit, flag in enumerate(ACCESSIBILITY_FLAGS)}
+
+
+def accessibility_mask(flags):
+    """Bitmask of the known flags in a list."""
+    mask = 0
+    for flag in flags or []:
+        mask |= FLAG_BITS.get(flag, 0)
+    return mask
+
+
+def without_conflicts(queryset, mask, field):
+    """Rows whose `field` mask shares no bit with `mask`."""
+    if not mask:
+        return queryset
+    return queryset.alias(accessibility_conflict=F(field).bitand(mask)).filter(accessibility_conflict=0)
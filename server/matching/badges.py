@@ -1,5 +1,16 @@
+"""
+Badge tracks, computed from counters kept on UserProfile.
+
+record_completion() maintains the counters transactionally as completions
+are recorded or flipped between completed and dropped, so reading badges is
+a single profile fetch. recount() rebuilds the counters from JobCompletion
+rows; the reconcile_badges command compares the two.
+"""
+from django.db import transaction
+from django.db.models import Count, Q
 from django.utils import timezone
 
+from . import leaderboard
 from .models import Badge, JobCompletion, UserProfile
 
 # Thresholds: list of (count_needed, level)
@@ -23,6 +34,23 @@ TRACKS = {
     },
 }
 
+# Counter fields on UserProfile and what a JobCompletion row adds to each
+COUNTERS = {
+    'jobs_completed': Q(completed=True),
+    'jobs_dropped': Q(completed=False),
+    # Specialist: completed jobs that had skill tags
+    'specialist_count': Q(completed=True, skill_tags_snapshot__isnull=False) & ~Q(skill_tags_snapshot=[]),
+    # Firefighter: completed urgent jobs
+    'firefighter_count': Q(completed=True, was_urgent=True),
+    # Inclusionist: completed jobs with accessibility requirements
+    'inclusionist_count': Q(completed=True, had_accessibility=True),
+}
+TRACK_COUNTERS = {
+    'specialist': 'specialist_count',
+    'firefighter': 'firefighter_count',
+    'inclusionist': 'inclusionist_count',
+}
+
 
 def _level_from_count(count, thresholds):
     """Return (level, progress_count) based on thresholds."""
@@ -41,30 +69,33 @@ def _months_active(user):
     return delta.days / 30.0
 
 
-def compute_badges(user):
-    """Recompute all 4 badge tracks for a user. Returns list of badge dicts."""
-    completions = JobCompletion.objects.filter(user=user, completed=True)
-
-    # Specialist: completed jobs that had skill tags
-    specialist_count = completions.filter(
-        skill_tags_snapshot__isnull=False,
-    ).exclude(skill_tags_snapshot=[]).count()
+def counter_contribution(completion):
+    """What one completion row adds to each counter (mirrors COUNTERS)."""
+    if completion is None:
+        return dict.fromkeys(COUNTERS, 0)
+    completed = completion.completed
+    return {
+        'jobs_completed': int(completed),
+        'jobs_dropped': int(not completed),
+        'specialist_count': int(completed and bool(completion.skill_tags_snapshot)),
+        'firefighter_count': int(completed and completion.was_urgent),
+        'inclusionist_count': int(completed and completion.had_accessibility),
+    }
 
-    # Firefighter: completed urgent jobs
-    firefighter_count = completions.filter(was_urgent=True).count()
 
+def _track_counts(user, profile):
+    counts = {track: getattr(profile, field) for track, field in TRACK_COUNTERS.items()}
     # Anchor: months active
-    anchor_count = _months_active(user)
+    counts['anchor'] = _months_active(user)
+    return counts
 
-    # Inclusionist: completed jobs with accessibility requirements
-    inclusionist_count = completions.filter(had_accessibility=True).count()
 
-    counts = {
-        'specialist': specialist_count,
-        'firefighter': firefighter_count,
-        'anchor': anchor_count,
-        'inclusionist': inclusionist_count,
-    }
+def compute_badges(user, profile=None):
+    """Return the 4 badge tracks for a user from their profile counters. Returns list of badge dicts."""
+    if profile is None:
+        # Read-only: a user without a profile simply has zero counters
+        profile = UserProfile.objects.filter(user=user).first() or UserProfile(user=user)
+    counts = _track_counts(user, profile)
 
     results = []
     for track, config in TRACKS.items():
@@ -81,50 +112,71 @@ def compute_badges(user):
         else:
             next_threshold = config['thresholds'][-1]
 
-        badge, _ = Badge.objects.update_or_create(
-            user=user,
-            track=track,
-            defaults={
-                'level': level,
-                'progress': int(count),
-                'title': title,
-            },
-        )
-
         results.append({
             'track': track,
             'level': level,
-            'level_name': badge.get_level_display(),
+            'level_name': dict(Badge.LEVEL_CHOICES)[level],
             'progress': int(count),
             'next_threshold': next_threshold if level < 3 else None,
             'title': title,
             'description': config['description'],
         })
 
-    # Update UserProfile reliability stats
-    total_completed = completions.count()
-    total_dropped = JobCompletion.objects.filter(user=user, completed=False).count()
-    UserProfile.objects.update_or_create(
-        user=user,
-        defaults={
-            'jobs_completed': total_completed,
-            'jobs_dropped': total_dropped,
-        },
-    )
-
     return results
 
 
+def save_badges(user, profile):
+    """Persist the current badge levels as Badge rows and refresh the user's leaderboard rows."""
+    for badge in compute_badges(user, profile):
+        Badge.objects.update_or_create(
+            user=user,
+            track=badge['track'],
+            defaults={
+                'level': badge['level'],
+                'progress': badge['progress'],
+                'title': badge['title'],
+            },
+        )
+    leaderboard.sync_user(user.id, profile.geohash)
+
+
 def record_completion(user, job, completed=True):
-    """Record a job completion/drop and recompute badges."""
-    JobCompletion.objects.update_or_create(
-        user=user,
-        job=job,
-        defaults={
-            'completed': completed,
-            'was_urgent': job.urgency_hours <= 24,
-            'had_accessibility': bool(job.accessibility_requirements),
-            'skill_tags_snapshot': job.skill_tags or [],
-        },
+    """Record a job completion/drop, update the badge counters and return the badges."""
+    with transaction.atomic():
+        # The profile row lock serializes completions per user, so deltas stay exact
+        UserProfile.objects.get_or_create(user=user)
+        profile = UserProfile.objects.select_for_update().get(user=user)
+        previous = JobCompletion.objects.filter(user=user, job=job).first()
+
+        completion, _ = JobCompletion.objects.update_or_create(
+            user=user,
+            job=job,
+            defaults={
+                'completed': completed,
+                'was_urgent': job.urgency_hours <= 24,
+                'had_accessibility': bool(job.accessibility_requirements),
+                'skill_tags_snapshot': job.skill_tags or [],
+            },
+        )
+
+        before = counter_contribution(previous)
+        after = counter_contribution(completion)
+        changed = [field for field in COUNTERS if after[field] != before[field]]
+        for field in changed:
+            setattr(profile, field, getattr(profile, field) + after[field] - before[field])
+        if changed:
+            profile.save(update_fields=[*changed, 'updated_at'])
+            save_badges(user, profile)
+
+    return compute_badges(user, profile)
+
+
+def recount(user_ids=None):
+    """Full recount of every counter from JobCompletion rows: {user_id: {field: count}}."""
+    completions = JobCompletion.objects.all()
+    if user_ids is not None:
+        completions = completions.filter(user_id__in=user_ids)
+    rows = completions.values('user_id').annotate(
+        **{field: Count('id', filter=condition) for field, condition in COUNTERS.items()}
     )
-    return compute_badges(user)
+    return {row.pop('user_id'): row for row in rows}
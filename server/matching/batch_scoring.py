@@ -0,0 +1,191 @@
+"""
+Vectorized scoring for a block of candidate jobs.
+
+Mirrors calculate_score() term by term, but works on columnar NumPy arrays so a
+feed can score thousands of candidates in a handful of array operations instead
+of one Python call per job.
+"""
+import numpy as np
+from django.utils import timezone
+
+from .scoring import EARTH_RADIUS_MILES
+
+# Columns needed to build a block; no description or other wide fields.
+BLOCK_FIELDS = ('id', 'latitude', 'longitude', 'shift_start', 'skill_tag_ids', 'accessibility_requirements')
+
+
+class _Vocabulary:
+    """Interns values (SkillTag ids, requirement names) to consecutive bit positions."""
+
+    def __init__(self):
+        self.index = {}
+
+    def bits(self, values):
+        return [self.index.setdefault(value, len(self.index)) for value in values]
+
+    def lookup(self, values):
+        return [self.index[value] for value in values if value in self.index]
+
+
+def _bitset_matrix(rows_of_bits, width):
+    """Pack per-row bit positions into an (n, words) uint64 matrix."""
+    words = max(1, (width + 63) // 64)
+    matrix = np.zeros((len(rows_of_bits), words), dtype=np.uint64)
+    for row, bits in enumerate(rows_of_bits):
+        for bit in bits:
+            matrix[row, bit >> 6] |= np.uint64(1) << np.uint64(bit & 63)
+    return matrix
+
+
+def _bitset_row(bits, words):
+    row = np.zeros(words, dtype=np.uint64)
+    for bit in bits:
+        row[bit >> 6] |= np.uint64(1) << np.uint64(bit & 63)
+    return row
+
+
+class CandidateBlock:
+    """Columnar view of candidate jobs: one array per scoring input."""
+
+    def __init__(self, ids, latitudes, longitudes, shift_starts, tag_bits, tag_counts,
+                 requirement_bits, tag_vocabulary, requirement_vocabulary):
+        self.ids = ids
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.shift_starts = shift_starts  # epoch seconds
+        self.tag_bits = tag_bits
+        self.tag_counts = tag_counts
+        self.requirement_bits = requirement_bits
+        self.tag_vocabulary = tag_vocabulary
+        self.requirement_vocabulary = requirement_vocabulary
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a block from (id, lat, lng, shift_start, skill_tag_ids, accessibility_requirements) rows."""
+        rows = list(rows)
+        tag_vocabulary = _Vocabulary()
+        requirement_vocabulary = _Vocabulary()
+
+        tag_rows = []
+        requirement_rows = []
+        for row in rows:
+            tag_rows.append(tag_vocabulary.bits(set(row[4] or [])))
+            requirement_rows.append(requirement_vocabulary.bits(set(row[5] or [])))
+
+        return cls(
+            ids=np.array([row[0] for row in rows], dtype=object),
+            latitudes=np.array([row[1] for row in rows], dtype=np.float64),
+            longitudes=np.array([row[2] for row in rows], dtype=np.float64),
+            shift_starts=np.array([row[3].timestamp() for row in rows], dtype=np.float64),
+            tag_bits=_bitset_matrix(tag_rows, len(tag_vocabulary.index)),
+            tag_counts=np.array([len(bits) for bits in tag_rows], dtype=np.float64),
+            requirement_bits=_bitset_matrix(requirement_rows, len(requirement_vocabulary.index)),
+            tag_vocabulary=tag_vocabulary,
+            requirement_vocabulary=requirement_vocabulary,
+        )
+
+    @classmethod
+    def from_jobs(cls, jobs):
+        return cls.from_rows(
+            (job.id, job.latitude, job.longitude, job.shift_start, job.skill_tag_ids, job.accessibility_requirements)
+            for job in jobs
+        )
+
+
+def haversine_block(lat, lng, latitudes, longitudes):
+    """Distance in miles from one point to every point in the arrays."""
+    lat1, lon1 = np.radians(lat), np.radians(lng)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arcsin(np.sqrt(a))
+    return EARTH_RADIUS_MILES * c
+
+
+def distance_term(user_profile, latitudes, longitudes, radius):
+    """D_35 for every point: returns (distances, d_score, out_of_range) arrays."""
+    n = len(latitudes)
+    if user_profile.latitude is None or user_profile.longitude is None:
+        return np.zeros(n), np.full(n, 17.5), np.zeros(n, dtype=bool)  # Half score if no location
+    distances = haversine_block(user_profile.latitude, user_profile.longitude, latitudes, longitudes)
+    # NaN coordinates can never be in range
+    out_of_range = ~(distances <= radius)
+    d_score = 35 * np.maximum(0, 1 - distances / radius)
+    return distances, d_score, out_of_range
+
+
+def urgency_term(shift_starts, now):
+    """U_20 for every shift start (epoch seconds)."""
+    hours = np.maximum(0, (shift_starts - now) / 3600)
+    return np.where(hours <= 24, 20, 20 * np.maximum(0, 1 - hours / 168))
+
+
+def reliability_term(user_profile):
+    """R_15 for the user; the same for every job."""
+    completed = user_profile.jobs_completed
+    dropped = user_profile.jobs_dropped
+    total = completed + dropped
+    if total == 0:
+        return 15 * 0.5
+    return 15 * (completed / total)
+
+
+def static_block(user_profile, block, radius=25):
+    """
+    The time-independent part of every job's score, D_35 + S_30.
+
+    Returns (static, distances, excluded, out_of_range) arrays. Adding
+    urgency_term() and reliability_term() in that order gives the same floats
+    score_block() rounds, so a cached static part can be finished at read time.
+    """
+    # A_bool: Accessibility filter
+    limitations = block.requirement_vocabulary.lookup(set(user_profile.limitations or []))
+    user_requirements = _bitset_row(limitations, block.requirement_bits.shape[1])
+    excluded = np.bitwise_count(block.requirement_bits & user_requirements).sum(axis=1) > 0
+
+    # D_35: Distance score (max 35)
+    distances, d_score, out_of_range = distance_term(user_profile, block.latitudes, block.longitudes, radius)
+
+    # S_30: Skill overlap (max 30)
+    user_tags = block.tag_vocabulary.lookup(set(user_profile.skill_tag_ids or []))
+    user_bits = _bitset_row(user_tags, block.tag_bits.shape[1])
+    overlap = np.bitwise_count(block.tag_bits & user_bits).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s_score = np.where(block.tag_counts == 0, 30, 30 * (overlap / block.tag_counts))
+
+    return d_score + s_score, distances, excluded, out_of_range
+
+
+def score_block(user_profile, block, radius=25, now=None):
+    """
+    Score every job in the block for one user.
+
+    Returns (scores, distances) arrays with the same values calculate_score()
+    would return per job. Jobs excluded by the accessibility filter get a
+    distance of NaN (calculate_score returns None for those).
+    """
+    now = (now or timezone.now()).timestamp()
+    static, distances, excluded, out_of_range = static_block(user_profile, block, radius=radius)
+
+    # U_20: Urgency (max 20)
+    u_score = urgency_term(block.shift_starts, now)
+
+    # R_15: Reliability (max 15)
+    r_score = reliability_term(user_profile)
+
+    scores = np.round(static + u_score + r_score, 2)
+    scores[out_of_range | excluded] = 0
+    distances = np.round(distances, 2)
+    distances[excluded] = np.nan
+    return scores, distances
+
+
+def top_indices(scores, limit):
+    """Indices of the best `limit` positive scores, highest first, ties in block order."""
+    candidates = np.flatnonzero(scores > 0)
+    order = np.argsort(-scores[candidates], kind='stable')
+    return candidates[order[:limit]]
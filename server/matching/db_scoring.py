@@ -0,0 +1,105 @@
+"""
+Scoring inside Postgres.
+
+Expresses calculate_score() as a SQL annotation on a Job queryset, so the
+database can apply ORDER BY score LIMIT k. Only the (id, score, distance) of
+the winners leave Postgres; descriptions and other wide columns are never
+read. The result is used in place of ranking.top_k() when
+MATCHING_SCORE_IN_DATABASE is enabled.
+"""
+from django.db.models import Case, ExpressionWrapper, F, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import ASin, Cast, Cos, Extract, Greatest, Power, Radians, Round, Sin, Sqrt
+from django.utils import timezone
+
+from .batch_scoring import reliability_term
+from .scoring import EARTH_RADIUS_MILES
+
+
+def _float(value):
+    return Value(float(value), output_field=FloatField())
+
+
+def _haversine(lat, lng):
+    lat1 = _float(lat)
+    lng1 = _float(lng)
+    a = (
+        Power(Sin((Radians(F('latitude')) - Radians(lat1)) / 2), 2)
+        + Cos(Radians(lat1)) * Cos(Radians(F('latitude'))) * Power(Sin((Radians(F('longitude')) - Radians(lng1)) / 2), 2)
+    )
+    return ExpressionWrapper(
+        _float(2 * EARTH_RADIUS_MILES) * ASin(Sqrt(a)), output_field=FloatField()
+    )
+
+
+def _skill_overlap(tag_ids):
+    # Job tag ids are stored unique, so counting matching elements is the overlap size
+    return RawSQL(
+        '(SELECT count(*) FROM jsonb_array_elements_text("matching_job"."skill_tag_ids") AS tag'
+        ' WHERE tag::integer = ANY(%s))',
+        (list(tag_ids),),
+        output_field=FloatField(),
+    )
+
+
+def annotate_scores(user_profile, jobs, radius=25, now=None):
+    """
+    Annotate `distance` and `score` on a Job queryset for one user.
+
+    Jobs the user cannot score (accessibility conflict, outside the radius)
+    are filtered out rather than annotated with 0.
+    """
+    now = now or timezone.now()
+
+    # A_bool: Accessibility filter
+    limitations = list(user_profile.limitations or [])
+    if limitations:
+        jobs = jobs.exclude(accessibility_requirements__has_any_keys=limitations)
+
+    # D_35: Distance score (max 35)
+    if user_profile.latitude is None or user_profile.longitude is None:
+        jobs = jobs.annotate(distance=_float(0))
+        d_score = _float(17.5)  # Half score if no location
+    else:
+        jobs = jobs.annotate(distance=_haversine(user_profile.latitude, user_profile.longitude))
+        jobs = jobs.filter(distance__lte=radius)
+        d_score = 35 * Greatest(_float(0), 1 - F('distance') / _float(radius))
+
+    # S_30: Skill overlap (max 30)
+    tag_count = RawSQL('jsonb_array_length("matching_job"."skill_tag_ids")', (), output_field=FloatField())
+    s_score = Case(
+        When(Q(skill_tag_ids=[]), then=_float(30)),
+        default=30 * _skill_overlap(user_profile.skill_tag_ids or []) / tag_count,
+        output_field=FloatField(),
+    )
+
+    # U_20: Urgency (max 20)
+    seconds = Cast(Extract('shift_start', 'epoch'), FloatField()) - _float(now.timestamp())
+    hours = Greatest(_float(0), seconds / 3600)
+    u_score = Case(
+        When(Q(hours_until_shift__lte=24), then=_float(20)),
+        default=20 * Greatest(_float(0), 1 - F('hours_until_shift') / 168),
+        output_field=FloatField(),
+    )
+
+    # R_15: Reliability (max 15)
+    r_score = _float(reliability_term(user_profile))
+
+    return jobs.annotate(hours_until_shift=hours).annotate(
+        score=Round(ExpressionWrapper(d_score + s_score + u_score + r_score, output_field=FloatField()), 2),
+    ).filter(score__gt=0)
+
+
+def top_k_in_database(user_profile, jobs, k, radius=25, now=None):
+    """
+    Return the best k jobs in a queryset as [(job_id, score, distance), ...].
+
+    Same contract as ranking.top_k(); ties go to the newest job.
+    """
+    if k <= 0:
+        return []
+    ranked = annotate_scores(user_profile, jobs, radius=radius, now=now).order_by('-score', '-created_at', 'id')
+    return [
+        (job_id, score, round(distance, 2) or 0)
+        for job_id, score, distance in ranked.values_list('id', 'score', 'distance')[:k]
+    ]
@@ -0,0 +1,136 @@
+"""
+Ranked matching feed: candidate selection, scoring, page loading and cursors.
+"""
+from django.conf import settings
+from django.core import signing
+from django.db.models import Exists, OuterRef
+
+from . import feed_cache
+from .accessibility import without_conflicts
+from .db_scoring import top_k_in_database
+from .models import Job, MatchingInterest
+from .ranking import top_k
+from .spatial import near
+
+
+def _unswiped(jobs, user):
+    # Anti-join on MatchingInterest so seen jobs are never scored or served
+    return jobs.filter(~Exists(
+        MatchingInterest.objects.filter(user=user, job=OuterRef('pk'))
+    ))
+
+
+def candidate_jobs(profile, radius):
+    """Open, active, unswiped jobs inside the profile's search radius, minus accessibility conflicts."""
+    jobs = _unswiped(Job.objects.filter(status='open', is_active=True), profile.user)
+    jobs = without_conflicts(jobs, profile.limitations_mask, 'accessibility_mask')
+    if profile.latitude is not None and profile.longitude is not None:
+        jobs = near(jobs, profile.latitude, profile.longitude, radius)
+    return jobs
+
+
+def rank_jobs(profile, radius, limit=None, exclude=()):
+    """Return the best (job_id, score, distance) entries among the profile's candidates, minus `exclude`d job ids."""
+    limit = limit or feed_cache.FEED_CACHE_SIZE
+    jobs = candidate_jobs(profile, radius)
+    if exclude:
+        jobs = jobs.exclude(id__in=exclude)
+    if settings.MATCHING_SCORE_IN_DATABASE:
+        return top_k_in_database(profile, jobs, limit, radius=radius)
+    return top_k(profile, jobs, limit, radius=radius)
+
+
+CURSOR_SALT = 'matching.feed.cursor'
+FEED_PAGE_SIZE = 20
+FEED_MAX_PAGE_SIZE = 100
+
+
+def ranked_feed(profile, radius, refresh=False):
+    """Return (snapshot_id, snapshot) for the user's feed, from cache when still valid unless `refresh`."""
+    cached = None if refresh else feed_cache.get_feed(profile, radius)
+    if cached is not None:
+        return cached
+    return feed_cache.store_feed(profile, radius, rank_jobs(profile, radius))
+
+
+def continue_feed(profile, radius, snapshot):
+    """Rank the candidates past the end of a full snapshot into a continuation. Returns (snapshot_id, snapshot)."""
+    served = snapshot['served'] + [job_id for job_id, _, _ in snapshot['entries']]
+    entries = rank_jobs(profile, radius, exclude=served)
+    return feed_cache.store_snapshot(profile.user_id, entries, served)
+
+
+def encode_cursor(snapshot_id, offset):
+    """Opaque, signed cursor pointing at a position in a ranking snapshot."""
+    return signing.dumps({'s': snapshot_id, 'o': offset}, salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor):
+    """Return (snapshot_id, offset) for a cursor. Raises ValueError if it was tampered with."""
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT)
+        return str(data['s']), int(data['o'])
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+def feed_page(profile, radius, limit, cursor=None):
+    """
+    One page of the profile's feed. Returns ([(job, score, distance), ...], next_cursor).
+
+    A cursor pins the snapshot it was issued from, so deeper pages never
+    trigger a rescore until a full snapshot runs out. Raises ValueError for a
+    tampered cursor.
+    """
+    snapshot = None
+    if cursor:
+        snapshot_id, offset = decode_cursor(cursor)
+        snapshot = feed_cache.get_snapshot(profile.user_id, snapshot_id)
+    if snapshot is None:
+        # No cursor, or its snapshot expired: start from the current ranking
+        snapshot_id, snapshot = ranked_feed(profile, radius)
+        head = feed_cache.get_head(profile.user_id, snapshot_id)
+        page, first, offset = load_page(profile.user, snapshot['entries'], head, limit)
+        if not page and snapshot['entries']:
+            # Swipes do not invalidate the cache; once they have used up the cached
+            # ranking, rank again rather than serve an empty deck until it expires
+            snapshot_id, snapshot = ranked_feed(profile, radius, refresh=True)
+            head = 0
+            page, first, offset = load_page(profile.user, snapshot['entries'], 0, limit)
+        if first != head:
+            # Skip what is already gone next time instead of re-checking it on every open
+            feed_cache.set_head(profile.user_id, snapshot_id, first)
+    else:
+        page, _, offset = load_page(profile.user, snapshot['entries'], offset, limit)
+
+    while len(page) < limit and feed_cache.is_full(snapshot) and offset >= len(snapshot['entries']):
+        snapshot_id, snapshot = continue_feed(profile, radius, snapshot)
+        more, _, offset = load_page(profile.user, snapshot['entries'], 0, limit - len(page))
+        page.extend(more)
+
+    next_cursor = None
+    if offset < len(snapshot['entries']) or feed_cache.is_full(snapshot):
+        next_cursor = encode_cursor(snapshot_id, offset)
+    return page, next_cursor
+
+
+def load_page(user, entries, offset, limit):
+    """
+    Load up to `limit` servable jobs from entries, starting at `offset`.
+
+    Entries whose job was filled, removed or swiped since ranking are skipped.
+    Returns ([(job, score, distance), ...], first_offset, next_offset), where
+    first_offset is the position of the first job served (next_offset if none).
+    """
+    page, first = [], None
+    while len(page) < limit and offset < len(entries):
+        chunk = entries[offset:offset + limit - len(page)]
+        jobs = _unswiped(Job.objects.filter(status='open', is_active=True), user)
+        jobs_by_id = jobs.select_related('poster').in_bulk([job_id for job_id, _, _ in chunk])
+        for i, (job_id, score, distance) in enumerate(chunk):
+            if job_id in jobs_by_id:
+                if first is None:
+                    first = offset + i
+                page.append((jobs_by_id[job_id], score, distance))
+        offset += len(chunk)
+    return page, offset if first is None else first, offset
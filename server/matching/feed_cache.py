@@ -0,0 +1,135 @@
+"""
+Per-user cache of the ranked matching feed.
+
+The first matched_jobs call for a user stores the ranked (job_id, score,
+distance) list as an immutable snapshot; later calls and feed cursors page
+through it without rescoring. The user's current snapshot is invalidated
+selectively:
+
+- Job writes bump a token for the coarse geohash region the job sits in. A
+  cached feed remembers the tokens of the regions it covered and is treated as
+  stale as soon as any of them changes.
+- Profile changes (skills, limitations, location, radius, reliability) drop
+  the user's entry directly.
+
+A snapshot holds at most FEED_CACHE_SIZE entries. One that is full may not
+cover every candidate, so paging past its end continues with a continuation
+snapshot ranked from the remaining candidates; each snapshot records the job
+ids its predecessors already served so a continuation never repeats them.
+
+Requests without a cursor start from the top of the current snapshot. Swipes
+are permanent, so each snapshot also keeps a head: the position of the first
+entry that was still servable when last read. Starting there keeps the cost
+of opening the feed flat however many cached jobs the user has swiped.
+"""
+import uuid
+
+from django.core.cache import cache
+
+from .spatial import covering_cells, encode_geohash
+
+FEED_CACHE_TIMEOUT = 600  # 10 minutes; urgency drifts with wall-clock time
+SNAPSHOT_TIMEOUT = 3600  # outstanding cursors keep their snapshot this long
+FEED_CACHE_SIZE = 500  # ranked entries kept per user
+REGION_PRECISION = 3  # ~156km cells used for invalidation
+GLOBAL_REGION = '*'  # feeds without a location see every job
+
+
+def _feed_key(user_id):
+    return f"feed:{user_id}"
+
+
+def _snapshot_key(user_id, snapshot_id):
+    # v2: snapshots carry the jobs served before them
+    return f"feed:snapshot:v2:{user_id}:{snapshot_id}"
+
+
+def _head_key(user_id, snapshot_id):
+    return f"feed:head:{user_id}:{snapshot_id}"
+
+
+def _region_key(cell):
+    return f"feed:region:{cell}"
+
+
+def _feed_regions(profile, radius):
+    if profile.latitude is None or profile.longitude is None:
+        return [GLOBAL_REGION]
+    return covering_cells(profile.latitude, profile.longitude, radius, precision=REGION_PRECISION)
+
+
+def get_feed(profile, radius):
+    """Return (snapshot_id, snapshot) for a profile's current feed, or None if missing or stale."""
+    cached = cache.get(_feed_key(profile.user_id))
+    if cached is None or cached['radius'] != radius:
+        return None
+
+    regions = cached['regions']
+    current = cache.get_many([_region_key(cell) for cell in regions])
+    for cell, token in regions.items():
+        if current.get(_region_key(cell)) != token:
+            return None
+
+    snapshot = get_snapshot(profile.user_id, cached['snapshot'])
+    if snapshot is None:
+        return None
+    return cached['snapshot'], snapshot
+
+
+def get_snapshot(user_id, snapshot_id):
+    """
+    Return a stored snapshot, {'entries': [(job_id, score, distance), ...],
+    'served': [job_id, ...]}, or None once it has expired. `served` lists the
+    jobs of the snapshots it continues.
+    """
+    return cache.get(_snapshot_key(user_id, snapshot_id))
+
+
+def is_full(snapshot):
+    """Whether the ranking was cut off at FEED_CACHE_SIZE, so candidates may remain past its end."""
+    return len(snapshot['entries']) >= FEED_CACHE_SIZE
+
+
+def store_snapshot(user_id, entries, served=()):
+    """Store ranked (job_id, score, distance) entries as a snapshot and return its id."""
+    snapshot_id = uuid.uuid4().hex
+    snapshot = {'entries': entries[:FEED_CACHE_SIZE], 'served': list(served)}
+    cache.set(_snapshot_key(user_id, snapshot_id), snapshot, timeout=SNAPSHOT_TIMEOUT)
+    return snapshot_id, snapshot
+
+
+def get_head(user_id, snapshot_id):
+    """Position in a snapshot before which every entry was found swiped, filled or removed."""
+    return cache.get(_head_key(user_id, snapshot_id), 0)
+
+
+def set_head(user_id, snapshot_id, head):
+    cache.set(_head_key(user_id, snapshot_id), head, timeout=SNAPSHOT_TIMEOUT)
+
+
+def store_feed(profile, radius, entries):
+    """Store ranked entries as the profile's current feed. Returns (snapshot_id, snapshot)."""
+    regions = _feed_regions(profile, radius)
+    tokens = cache.get_many([_region_key(cell) for cell in regions])
+    snapshot_id, snapshot = store_snapshot(profile.user_id, entries)
+    cache.set(_feed_key(profile.user_id), {
+        'radius': radius,
+        'regions': {cell: tokens.get(_region_key(cell)) for cell in regions},
+        'snapshot': snapshot_id,
+    }, timeout=FEED_CACHE_TIMEOUT)
+    return snapshot_id, snapshot
+
+
+def invalidate_user(user_id):
+    """Drop a user's current feed after their profile changes; open cursors keep their snapshot."""
+    cache.delete(_feed_key(user_id))
+
+
+def invalidate_job(job, previous_geohash=None):
+    """Mark every feed covering the job's region (old and new) as stale."""
+    cells = {GLOBAL_REGION}
+    for geohash in (job.geohash or encode_geohash(job.latitude, job.longitude), previous_geohash):
+        if geohash:
+            cells.add(geohash[:REGION_PRECISION])
+    token = uuid.uuid4().hex
+    cache.set_many({_region_key(cell): token for cell in cells}, timeout=None)
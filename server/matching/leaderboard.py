@@ -0,0 +1,121 @@
+"""
+Badge leaderboards, materialized in LeaderboardEntry.
+
+Each user with a non-zero badge has one row per track on the global board
+(region '') and one on the board of their region, the first REGION_PRECISION
+characters of their profile geohash (cells of roughly 150 km). Rows are
+upserted whenever Badge rows change, so a board is read straight off the
+leaderboard_rank_idx index: pages by keyset on (level, progress, user), and
+a user's rank is a count of the rows ahead of theirs.
+"""
+from django.core import signing
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Badge, LeaderboardEntry
+
+REGION_PRECISION = 3
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+ORDERING = ('-level', '-progress', '-user_id')
+CURSOR_SALT = 'matching.leaderboard.cursor'
+
+
+def region_for(geohash):
+    """Regional board for a profile geohash; '' when the profile has no location."""
+    return (geohash or '')[:REGION_PRECISION]
+
+
+def _boards(region):
+    return ['', region] if region else ['']
+
+
+def upsert(badges):
+    """
+    Write leaderboard rows for changed badges.
+
+    `badges` holds dicts with user_id, region, track, level, progress and title.
+    A badge back at zero is removed from the boards.
+    """
+    rows, cleared = [], Q(pk__in=[])
+    for badge in badges:
+        if badge['level'] or badge['progress']:
+            rows.extend(
+                LeaderboardEntry(
+                    user_id=badge['user_id'], track=badge['track'], region=region,
+                    level=badge['level'], progress=badge['progress'], title=badge['title'],
+                )
+                for region in _boards(badge['region'])
+            )
+        else:
+            cleared |= Q(user_id=badge['user_id'], track=badge['track'])
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(cleared).delete()
+        LeaderboardEntry.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user', 'track', 'region'],
+            update_fields=['level', 'progress', 'title', 'updated_at'],
+        )
+
+
+def sync_user(user_id, geohash):
+    """Rebuild a user's rows from their Badge rows, e.g. after they moved region."""
+    region = region_for(geohash)
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(user_id=user_id).exclude(region__in=_boards(region)).delete()
+        upsert([
+            {**badge, 'user_id': user_id, 'region': region}
+            for badge in Badge.objects.filter(user_id=user_id).values('track', 'level', 'progress', 'title')
+        ])
+
+
+def _board(track, region):
+    return LeaderboardEntry.objects.filter(track=track, region=region)
+
+
+def encode_cursor(entry, rank):
+    """Opaque, signed cursor positioned after `entry`, which sits at `rank`."""
+    return signing.dumps({'l': entry.level, 'p': entry.progress, 'u': entry.user_id, 'r': rank}, salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor):
+    """Return (level, progress, user_id, rank) for a cursor. Raises ValueError if it was tampered with."""
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT)
+        return int(data['l']), int(data['p']), int(data['u']), int(data['r'])
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+def load_page(track, region, limit, cursor=None):
+    """Return ([(rank, entry), ...], next_cursor) for one page of a board."""
+    entries = _board(track, region).select_related('user').order_by(*ORDERING)
+    rank = 0
+    if cursor:
+        level, progress, user_id, rank = decode_cursor(cursor)
+        # level__lte bounds the index scan; the OR picks up where the last page stopped
+        entries = entries.filter(level__lte=level).filter(
+            Q(level__lt=level)
+            | Q(level=level, progress__lt=progress)
+            | Q(level=level, progress=progress, user_id__lt=user_id)
+        )
+    if limit < 1:
+        return [], None
+    page = list(entries[:limit + 1])
+    ranked = [(rank + i + 1, entry) for i, entry in enumerate(page[:limit])]
+    next_cursor = encode_cursor(page[:limit][-1], rank + limit) if len(page) > limit else None
+    return ranked, next_cursor
+
+
+def rank_of(user_id, track, region):
+    """Return (rank, entry) for a user on a board, or (None, None) when they are not on it."""
+    entry = _board(track, region).filter(user_id=user_id).first()
+    if entry is None:
+        return None, None
+    ahead = _board(track, region).filter(level__gte=entry.level).filter(
+        Q(level__gt=entry.level)
+        | Q(level=entry.level, progress__gt=entry.progress)
+        | Q(level=entry.level, progress=entry.progress, user_id__gt=user_id)
+    ).count()
+    return ahead + 1, entry
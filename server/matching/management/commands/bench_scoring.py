@@ -0,0 +1,197 @@
+"""
+Management command to benchmark the scoring engines.
+
+Usage:
+    python manage.py bench_scoring
+    python manage.py bench_scoring --sizes 1000,10000 --engines scalar,batch
+    python manage.py bench_scoring --save matching/benchmarks/scoring_baseline.json
+    python manage.py bench_scoring --compare matching/benchmarks/scoring_baseline.json
+
+Measures scoring throughput (pairs/sec) of calculate_score(), the NumPy
+block scorer and the SQL annotation across candidate-set sizes, tag-list
+lengths and accessibility mixes. The candidates are synthetic; the database
+engine inserts them inside a transaction that is rolled back afterwards.
+With --compare the command fails when any case is slower than the baseline
+by more than --tolerance. Throughput depends on the machine, so compare
+against a baseline recorded on the same hardware.
+"""
+
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import User
+from matching.batch_scoring import CandidateBlock, score_block
+from matching.db_scoring import annotate_scores
+from matching.models import Job, UserProfile
+from matching.scoring import calculate_score
+
+ENGINES = ('scalar', 'batch', 'database')
+REQUIREMENTS = ['heavy_lifting', 'standing_long', 'driving_required', 'outdoor_work']
+TAG_POOL = 40
+RADIUS = 25
+
+
+def _csv_ints(value):
+    return [int(part) for part in value.split(',') if part]
+
+
+def _csv_floats(value):
+    return [float(part) for part in value.split(',') if part]
+
+
+def _make_candidates(size, tag_length, accessibility_share, now, seed=0):
+    """Unsaved jobs around East Lansing; tag ids stand in for SkillTag ids."""
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(size):
+        tag_ids = sorted(rng.sample(range(TAG_POOL), tag_length))
+        jobs.append(Job(
+            title=f'Bench job {i}',
+            description='Benchmark',
+            short_description='Benchmark',
+            latitude=42.73 + rng.uniform(-0.4, 0.4),
+            longitude=-84.55 + rng.uniform(-0.4, 0.4),
+            shift_start=now + timezone.timedelta(hours=rng.uniform(-5, 200)),
+            shift_end=now + timezone.timedelta(hours=210),
+            skill_tags=[f'tag{tag_id}' for tag_id in tag_ids],
+            skill_tag_ids=tag_ids,
+            accessibility_requirements=(
+                rng.sample(REQUIREMENTS, 1) if rng.random() < accessibility_share else []
+            ),
+        ))
+    return jobs
+
+
+def _make_profile(tag_length, seed=1):
+    rng = random.Random(seed)
+    tag_ids = sorted(rng.sample(range(TAG_POOL), tag_length))
+    return UserProfile(
+        latitude=42.73,
+        longitude=-84.55,
+        skill_tags=[f'tag{tag_id}' for tag_id in tag_ids],
+        skill_tag_ids=tag_ids,
+        limitations=['heavy_lifting'],
+        jobs_completed=4,
+        jobs_dropped=1,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Benchmark scoring throughput of the scalar, batch and database engines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engines', default=','.join(ENGINES), help='Comma-separated engines to run')
+        parser.add_argument('--sizes', type=_csv_ints, default=[100, 1000, 10000], help='Candidate-set sizes')
+        parser.add_argument('--tag-lengths', type=_csv_ints, default=[0, 3, 8], help='Tags per job and profile')
+        parser.add_argument('--accessibility', type=_csv_floats, default=[0.0, 0.5],
+                            help='Share of jobs with an accessibility requirement')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per case; the best one counts')
+        parser.add_argument('--save', help='Write results to this JSON file as the new baseline')
+        parser.add_argument('--compare', help='Compare against a saved baseline JSON file')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed throughput drop versus the baseline (0.2 = 20%%)')
+
+    def handle(self, *args, **options):
+        engines = [engine for engine in options['engines'].split(',') if engine]
+        unknown = set(engines) - set(ENGINES)
+        if unknown:
+            raise CommandError(f"Unknown engines: {', '.join(sorted(unknown))}")
+
+        now = timezone.now()
+        results = []
+        for size in options['sizes']:
+            for tag_length in options['tag_lengths']:
+                for accessibility_share in options['accessibility']:
+                    jobs = _make_candidates(size, tag_length, accessibility_share, now)
+                    profile = _make_profile(tag_length)
+                    for engine in engines:
+                        seconds = self._time(engine, profile, jobs, now, options['repeat'])
+                        result = {
+                            'engine': engine,
+                            'size': size,
+                            'tag_length': tag_length,
+                            'accessibility': accessibility_share,
+                            'pairs_per_sec': round(size / seconds) if seconds else 0,
+                        }
+                        results.append(result)
+                        self.stdout.write(
+                            f"{engine:>9} size={size:<6} tags={tag_length:<2} "
+                            f"access={accessibility_share:<4} {result['pairs_per_sec']:>12,} pairs/sec"
+                        )
+
+        if options['save']:
+            with open(options['save'], 'w') as f:
+                json.dump({'created_at': now.isoformat(), 'results': results}, f, indent=2)
+                f.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save']}"))
+
+        if options['compare']:
+            self._compare(results, options['compare'], options['tolerance'])
+
+    def _time(self, engine, profile, jobs, now, repeat):
+        if engine == 'database':
+            return self._time_database(profile, jobs, now, repeat)
+
+        def run():
+            if engine == 'scalar':
+                for job in jobs:
+                    calculate_score(profile, job, radius=RADIUS)
+            else:
+                score_block(profile, CandidateBlock.from_jobs(jobs), radius=RADIUS, now=now)
+
+        return self._best_of(run, repeat)
+
+    def _time_database(self, profile, jobs, now, repeat):
+        with transaction.atomic():
+            poster = User.objects.create_user(
+                email='bench-poster@example.com', username='bench_poster', password=None,
+            )
+            for job in jobs:
+                job.poster = poster
+            # bulk_create skips Job.save(), so the derived columns are set above
+            Job.objects.bulk_create(jobs, batch_size=1000)
+            queryset = Job.objects.filter(poster=poster)
+            seconds = self._best_of(
+                lambda: list(annotate_scores(profile, queryset, radius=RADIUS, now=now).values_list('id', 'score')),
+                repeat,
+            )
+            transaction.set_rollback(True)
+        return seconds
+
+    def _best_of(self, run, repeat):
+        best = None
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def _compare(self, results, path, tolerance):
+        try:
+            with open(path) as f:
+                baseline = json.load(f)['results']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'Could not read baseline {path}: {e}')
+
+        def key(result):
+            return (result['engine'], result['size'], result['tag_length'], result['accessibility'])
+
+        previous = {key(result): result['pairs_per_sec'] for result in baseline}
+        regressions = []
+        for result in results:
+            before = previous.get(key(result))
+            if not before:
+                continue
+            change = result['pairs_per_sec'] / before - 1
+            if change < -tolerance:
+                regressions.append(f'{key(result)}: {before:,} -> {result["pairs_per_sec"]:,} pairs/sec ({change:+.0%})')
+
+        if regressions:
+            raise CommandError('Scoring throughput regressed:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
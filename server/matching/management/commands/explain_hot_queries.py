@@ -0,0 +1,88 @@
+"""
+Management command to print EXPLAIN plans for the hot query paths.
+
+Usage:
+    python manage.py explain_hot_queries
+    python manage.py explain_hot_queries --analyze --user volunteer@test.com
+
+Covers the matching feed, the poster's interested-users list, volunteer
+recommendations, the badge recount used by reconcile_badges, the chat inbox,
+chat message history and chat search. Run it against a database with
+realistic volumes to check that the planner actually uses the composite,
+partial and full-text indexes.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from authentication.models import User
+from chat.models import Conversation, Message
+from chat.inbox import PAGE_SIZE, inbox_positions
+from chat.search import matches
+from matching.badges import COUNTERS
+from matching.feed import candidate_jobs
+from matching.models import Job, UserProfile, MatchingInterest, JobCompletion
+from matching.recommend import candidate_profiles
+
+
+class Command(BaseCommand):
+    help = 'Print EXPLAIN plans for the hot matching and chat queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help='Run EXPLAIN ANALYZE (executes the queries)')
+        parser.add_argument('--user', help='Email of the volunteer to plan the feed and badge queries for')
+
+    def handle(self, *args, **options):
+        self.analyze = options['analyze']
+
+        if options['user']:
+            try:
+                user = User.objects.get(email=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['user']}")
+            profile = UserProfile.objects.filter(user=user).first()
+        else:
+            profile = UserProfile.objects.exclude(latitude=None).select_related('user').first()
+            user = profile.user if profile else User.objects.first()
+        if user is None:
+            raise CommandError('No users found; seed some data first.')
+
+        job = Job.objects.filter(status='open', is_active=True).first()
+        conversation = Conversation.objects.first()
+
+        if profile:
+            radius = profile.max_distance_miles or 25
+            feed = candidate_jobs(profile, radius).values_list('id', 'latitude', 'longitude', 'shift_start')
+            self._explain('Matching feed candidates', feed)
+        else:
+            self._skip('Matching feed candidates', 'user has no profile')
+
+        if job:
+            interests = MatchingInterest.objects.filter(job=job, interested=True).select_related('user')
+            self._explain('Interested users for a job', interests)
+            self._explain('Recommended volunteers for a job', candidate_profiles(job))
+        else:
+            self._skip('Interested users for a job', 'no open jobs')
+
+        recount = JobCompletion.objects.filter(user=user).values('user_id').annotate(
+            **{field: Count('id', filter=condition) for field, condition in COUNTERS.items()}
+        )
+        self._explain('Badge recount', recount)
+
+        self._explain('Chat inbox', inbox_positions(user, PAGE_SIZE + 1))
+
+        if conversation:
+            messages = Message.objects.filter(conversation=conversation).select_related('sender')
+            self._explain('Chat message history', messages)
+        else:
+            self._skip('Chat message history', 'no conversations')
+
+        self._explain('Chat message search', matches(user, 'shift').values_list('id', 'rank')[:21])
+
+    def _explain(self, title, queryset):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {title} =='))
+        self.stdout.write(str(queryset.query))
+        self.stdout.write(queryset.explain(analyze=True) if self.analyze else queryset.explain())
+
+    def _skip(self, title, reason):
+        self.stdout.write(self.style.WARNING(f'\n== {title} == skipped: {reason}'))
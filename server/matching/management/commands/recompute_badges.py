@@ -0,0 +1,175 @@
+"""
+Management command to bring every persisted Badge row up to date.
+
+Usage:
+    python manage.py recompute_badges
+    python manage.py recompute_badges --workers 8 --chunk-size 2000
+    python manage.py recompute_badges --checkpoint /var/tmp/badges.json
+
+The anchor track grows with account age, so Badge rows drift without any
+completion event to refresh them. This walks all profiles in user-id chunks;
+each chunk costs one query for the profile counters, one for the existing
+Badge rows and at most one bulk insert and one bulk update for the rows
+whose level, progress or title changed, plus the matching leaderboard
+upsert. Chunks run across --workers processes.
+
+Progress is written to --checkpoint after each contiguous run of finished
+chunks, so an interrupted run resumes after the last checkpointed user. The
+checkpoint is removed once a run completes; --restart ignores it.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from authentication.models import User
+from matching import leaderboard
+from matching.badges import COUNTERS, compute_badges
+from matching.models import Badge, UserProfile
+
+DEFAULT_CHECKPOINT = 'recompute_badges.checkpoint.json'
+
+
+def recompute_chunk(first_user_id, last_user_id):
+    """Recompute badges for profiles with user ids in [first, last]; returns (last, created, updated)."""
+    rows = (
+        UserProfile.objects
+        .filter(user_id__gte=first_user_id, user_id__lte=last_user_id)
+        .values('user_id', 'user__date_joined', 'geohash', *COUNTERS)
+    )
+    existing = {
+        (badge.user_id, badge.track): badge
+        for badge in Badge.objects.filter(user_id__gte=first_user_id, user_id__lte=last_user_id)
+    }
+
+    now = timezone.now()
+    to_create, to_update, changed = [], [], []
+    for row in rows:
+        user = User(id=row['user_id'], date_joined=row['user__date_joined'])
+        profile = UserProfile(user_id=user.id, **{field: row[field] for field in COUNTERS})
+        for badge in compute_badges(user, profile):
+            current = existing.get((user.id, badge['track']))
+            if current is None:
+                if not (badge['level'] or badge['progress']):
+                    continue
+                to_create.append(Badge(
+                    user_id=user.id, track=badge['track'], level=badge['level'],
+                    progress=badge['progress'], title=badge['title'],
+                ))
+            elif (current.level, current.progress, current.title) != (badge['level'], badge['progress'], badge['title']):
+                current.level = badge['level']
+                current.progress = badge['progress']
+                current.title = badge['title']
+                current.updated_at = now  # bulk_update skips auto_now
+                to_update.append(current)
+            else:
+                continue
+            changed.append({
+                'user_id': user.id, 'region': leaderboard.region_for(row['geohash']), 'track': badge['track'],
+                'level': badge['level'], 'progress': badge['progress'], 'title': badge['title'],
+            })
+
+    with transaction.atomic():
+        # ignore_conflicts: record_completion() may have created the row since it was read
+        Badge.objects.bulk_create(to_create, ignore_conflicts=True)
+        Badge.objects.bulk_update(to_update, ['level', 'progress', 'title', 'updated_at'])
+        leaderboard.upsert(changed)
+    return last_user_id, len(to_create), len(to_update)
+
+
+def _close_connections():
+    # Forked workers must not share the parent's database socket
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Recompute persisted Badge rows for all users in parallel chunks, writing only changed rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Profiles per chunk')
+        parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='Checkpoint file for resuming')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        checkpoint = options['checkpoint']
+        after = None if options['restart'] else self._read_checkpoint(checkpoint)
+        if after is not None:
+            self.stdout.write(f'Resuming after user {after}')
+
+        chunks = self._chunks(after, options['chunk_size'])
+        if not chunks:
+            self.stdout.write(self.style.SUCCESS('No profiles to recompute.'))
+            self._remove_checkpoint(checkpoint)
+            return
+
+        started = time.monotonic()
+        created = updated = 0
+        pending = {}  # finished chunks waiting for earlier ones, by index
+        next_index = 0
+        for index, (_, chunk_created, chunk_updated) in self._run(chunks, options['workers']):
+            created += chunk_created
+            updated += chunk_updated
+            pending[index] = chunks[index][1]
+            # Only checkpoint a contiguous prefix, so a resume never skips an unfinished chunk
+            if next_index in pending:
+                while next_index in pending:
+                    last = pending.pop(next_index)
+                    next_index += 1
+                self._write_checkpoint(checkpoint, last)
+
+        self._remove_checkpoint(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed {len(chunks)} chunks in {time.monotonic() - started:.1f}s: '
+            f'{created} badges created, {updated} updated.'
+        ))
+
+    def _chunks(self, after, size):
+        """(first, last) user-id ranges of at most `size` profiles, keyed on the user_id index."""
+        user_ids = UserProfile.objects.order_by('user_id').values_list('user_id', flat=True)
+        if after is not None:
+            user_ids = user_ids.filter(user_id__gt=after)
+        ids = list(user_ids)
+        return [(ids[i], ids[min(i + size, len(ids)) - 1]) for i in range(0, len(ids), size)]
+
+    def _run(self, chunks, workers):
+        """Yield (chunk index, result) as chunks finish."""
+        if workers <= 1:
+            for index, chunk in enumerate(chunks):
+                yield index, recompute_chunk(*chunk)
+            return
+
+        _close_connections()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_close_connections) as pool:
+            futures = {pool.submit(recompute_chunk, *chunk): index for index, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _read_checkpoint(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)['last_user_id']
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'Could not read checkpoint {path}: {e}')
+
+    def _write_checkpoint(self, path, last_user_id):
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'last_user_id': last_user_id}, f)
+        os.replace(tmp, path)  # Atomic, so a crash never leaves a torn checkpoint
+
+    def _remove_checkpoint(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
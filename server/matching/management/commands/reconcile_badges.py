@@ -0,0 +1,60 @@
+"""
+Management command to check the badge counters against a full recount.
+
+Usage:
+    python manage.py reconcile_badges
+    python manage.py reconcile_badges --fix
+
+record_completion() keeps the completion counters on UserProfile up to date
+incrementally. This recounts every counter from JobCompletion rows and
+reports each profile that disagrees; with --fix the counters are overwritten
+with the recount and the Badge rows are saved again. Exits non-zero when
+mismatches remain, so it can run as a scheduled check.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from matching.badges import COUNTERS, recount, save_badges
+from matching.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Compare the incremental badge counters with a full recount of JobCompletion'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Overwrite mismatched counters with the recount')
+
+    def handle(self, *args, **options):
+        counts = recount()
+        zero = dict.fromkeys(COUNTERS, 0)
+        mismatched = []
+        profiles = UserProfile.objects.select_related('user').only('user__date_joined', *COUNTERS)
+        for profile in profiles.iterator(chunk_size=2000):
+            expected = counts.get(profile.user_id, zero)
+            diff = {
+                field: (getattr(profile, field), expected[field])
+                for field in COUNTERS if getattr(profile, field) != expected[field]
+            }
+            if diff:
+                mismatched.append(profile)
+                detail = ', '.join(f'{field} {stored} != {actual}' for field, (stored, actual) in diff.items())
+                self.stdout.write(f'{profile.user_id}: {detail}')
+
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS('All badge counters match the recount.'))
+            return
+
+        if not options['fix']:
+            raise CommandError(f'{len(mismatched)} profiles have stale badge counters; rerun with --fix')
+
+        for profile in mismatched:
+            with transaction.atomic():
+                locked = UserProfile.objects.select_for_update().get(pk=profile.pk)
+                # Recount under the row lock so a concurrent completion is not overwritten
+                expected = recount([locked.user_id]).get(locked.user_id, zero)
+                for field, value in expected.items():
+                    setattr(locked, field, value)
+                locked.save(update_fields=[*COUNTERS, 'updated_at'])
+                save_badges(profile.user, locked)
+        self.stdout.write(self.style.SUCCESS(f'Fixed {len(mismatched)} profiles.'))
@@ -17,6 +17,7 @@ from datetime import timedelta
 
 from authentication.models import User
 from matching.models import Job, UserProfile, MatchingInterest, JobAcceptance
+from chat.inbox import recount
 from chat.models import Conversation, Message
 
 
@@ -165,6 +166,7 @@ class Command(BaseCommand):
                     'created_at': now - timedelta(hours=len(messages_data) - i)
                 }
             )
+        recount(Conversation.objects.filter(pk=conversation.pk))
 
         # Job 3: Completed
         job3, _ = Job.objects.get_or_create(
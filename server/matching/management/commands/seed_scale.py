@@ -0,0 +1,339 @@
+"""
+Management command to generate a large, realistic dataset for load testing.
+
+Usage:
+    python manage.py seed_scale
+    python manage.py seed_scale --users 100000 --jobs 500000 --interests-per-user 30
+
+Creates volunteers and jobs clustered around several metros, with a skewed
+skill-tag distribution, shift times from "starting now" to weeks out,
+swipes, completions and chat history. Users and profiles are loaded
+with chunked bulk_create; jobs and the high-volume tables (MatchingInterest,
+JobCompletion, Conversation, Message) are streamed with COPY on Postgres.
+
+All generated accounts share the prefix given by --prefix (default "scale")
+and the password "test1234". Re-running with the same prefix fails on the
+unique email constraint; use --prefix to load a second dataset.
+"""
+
+import csv
+import io
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from authentication.models import User
+from chat.inbox import recount
+from chat.models import Conversation, Message
+from matching.accessibility import accessibility_mask
+from matching.badges import COUNTERS, counter_contribution
+from matching.models import Job, JobCompletion, MatchingInterest, SkillTag, UserProfile
+from matching.spatial import encode_geohash
+from matching.tags import normalize_tag
+
+# (label, latitude, longitude, spread in degrees, share of rows)
+METROS = [
+    ('New York, NY', 40.7128, -74.0060, 0.25, 0.30),
+    ('Chicago, IL', 41.8781, -87.6298, 0.20, 0.20),
+    ('Detroit, MI', 42.3314, -83.0458, 0.18, 0.15),
+    ('Austin, TX', 30.2672, -97.7431, 0.15, 0.12),
+    ('Seattle, WA', 47.6062, -122.3321, 0.15, 0.10),
+    ('East Lansing, MI', 42.7370, -84.4839, 0.08, 0.08),
+    ('Ann Arbor, MI', 42.2808, -83.7430, 0.06, 0.05),
+]
+
+# Most popular first; picked with Zipf-like weights
+TAGS = [
+    'Teamwork', 'Physical Labor', 'Driving', 'Teaching', 'Organization', 'Cooking',
+    'Communication', 'Gardening', 'Animal Care', 'First Aid', 'Errands', 'Programming',
+    'Tutoring', 'Event Setup', 'Cleaning', 'Childcare', 'Elder Care', 'Photography',
+    'Graphic Design', 'Marketing', 'Web Development', 'Translation', 'Mechanical',
+    'Healthcare', 'Music', 'Writing', 'Carpentry', 'Painting', 'Fundraising', 'Math',
+]
+TAG_WEIGHTS = [1 / (rank + 1) for rank in range(len(TAGS))]
+
+NULL = r'\N'  # COPY null marker, so empty strings stay empty strings
+
+REQUIREMENTS = ['heavy_lifting', 'standing_long', 'driving_required', 'outdoor_work']
+
+MESSAGES = [
+    'Hi! Is this still available?',
+    'Yes, see you there.',
+    'What should I bring?',
+    'Running about 10 minutes late.',
+    'Thanks so much for helping out!',
+    'Where exactly should I park?',
+]
+
+
+class Command(BaseCommand):
+    help = 'Generate a large, geographically clustered dataset for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--jobs', type=int, default=50000)
+        parser.add_argument('--posters', type=float, default=0.1, help='Share of users who post jobs')
+        parser.add_argument('--interests-per-user', type=int, default=20)
+        parser.add_argument('--completions-per-user', type=int, default=5)
+        parser.add_argument('--conversations', type=int, default=5000)
+        parser.add_argument('--messages-per-conversation', type=int, default=20)
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='scale', help='Username/email prefix for generated accounts')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--no-copy', action='store_true', help='Use bulk_create instead of COPY everywhere')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.use_copy = connection.vendor == 'postgresql' and not options['no_copy']
+        self.now = timezone.now()
+        self.tag_ids = self._tag_ids()
+
+        users, metros = self._step('users', self._create_users, options)
+        posters = users[:max(1, int(len(users) * options['posters']))]
+        jobs = self._step('jobs', self._create_jobs, options['jobs'], posters)
+        jobs_by_metro = {}
+        for job_id, poster_id, metro in jobs:
+            jobs_by_metro.setdefault(metro, []).append((job_id, poster_id))
+
+        self._step('swipes', self._create_interests, users, metros, jobs_by_metro, options['interests_per_user'])
+        counts = self._step(
+            'completions', self._create_completions, users, metros, jobs_by_metro, options['completions_per_user'],
+        )
+        self._step('profiles', self._create_profiles, users, metros, counts)
+        self._step(
+            'chat', self._create_chat, users, metros, jobs_by_metro,
+            options['conversations'], options['messages_per_conversation'],
+        )
+        self.stdout.write(self.style.SUCCESS('Scale dataset loaded. Run ANALYZE before comparing query plans.'))
+
+    def _tag_ids(self):
+        SkillTag.ids_for(TAGS)
+        ids = dict(SkillTag.objects.filter(name__in=[normalize_tag(tag) for tag in TAGS]).values_list('name', 'id'))
+        return {tag: ids[normalize_tag(tag)] for tag in TAGS}
+
+    def _step(self, name, func, *args):
+        start = time.monotonic()
+        result = func(*args)
+        self.stdout.write(f'{name}: {time.monotonic() - start:.1f}s')
+        return result
+
+    # ── Generators ────────────────────────────────────────────────────────────
+
+    def _metro(self):
+        return self.rng.choices(range(len(METROS)), weights=[metro[4] for metro in METROS])[0]
+
+    def _point(self, metro):
+        _, lat, lng, spread, _ = METROS[metro]
+        return round(self.rng.gauss(lat, spread), 6), round(self.rng.gauss(lng, spread), 6)
+
+    def _tags(self, low, high):
+        count = self.rng.randint(low, high)
+        return list(dict.fromkeys(self.rng.choices(TAGS, weights=TAG_WEIGHTS, k=count)))
+
+    def _shift_start(self):
+        roll = self.rng.random()
+        if roll < 0.2:
+            return self.now + timedelta(hours=self.rng.uniform(0, 24))  # urgent
+        if roll < 0.3:
+            return self.now - timedelta(days=self.rng.uniform(0, 30))  # already started
+        return self.now + timedelta(hours=self.rng.expovariate(1 / 120))
+
+    def _stamp(self, when=None):
+        when = when or self.now
+        return {'id': uuid.uuid4(), 'created_at': when, 'updated_at': when, 'is_active': True}
+
+    # ── Tables ────────────────────────────────────────────────────────────────
+
+    def _create_users(self, options):
+        password = make_password('test1234')
+        prefix = options['prefix']
+        user_ids = []
+        metros = []
+        for start in range(0, options['users'], self.chunk_size):
+            batch = []
+            for i in range(start, min(start + self.chunk_size, options['users'])):
+                batch.append(User(
+                    username=f'{prefix}_{i}',
+                    email=f'{prefix}_{i}@scale.test',
+                    password=password,
+                    first_name='Scale',
+                    last_name=f'User {i}',
+                    date_joined=self.now - timedelta(days=self.rng.uniform(0, 730)),
+                ))
+                metros.append(self._metro())
+            user_ids.extend(user.id for user in User.objects.bulk_create(batch))
+        return user_ids, metros
+
+    def _create_jobs(self, total, posters):
+        jobs = []
+
+        def rows():
+            for i in range(total):
+                metro = self._metro()
+                latitude, longitude = self._point(metro)
+                tags = self._tags(0, 4)
+                shift_start = self._shift_start()
+                requirements = self.rng.sample(REQUIREMENTS, 1) if self.rng.random() < 0.25 else []
+                row = {
+                    **self._stamp(self.now - timedelta(days=self.rng.uniform(0, 60))),
+                    'title': f'Volunteer shift {i}',
+                    'short_description': 'Help needed for a community event.',
+                    'description': 'Generated by seed_scale. ' * self.rng.randint(5, 40),
+                    'poster_id': self.rng.choice(posters),
+                    'latitude': latitude,
+                    'longitude': longitude,
+                    # Rows skip Job.save(), so derived columns are set here
+                    'geohash': encode_geohash(latitude, longitude),
+                    'location_label': METROS[metro][0],
+                    'shift_start': shift_start,
+                    'shift_end': shift_start + timedelta(hours=self.rng.randint(2, 6)),
+                    'skill_tags': tags,
+                    'skill_tag_ids': sorted(self.tag_ids[tag] for tag in tags),
+                    'accessibility_requirements': requirements,
+                    'accessibility_mask': accessibility_mask(requirements),
+                    'image': '',
+                    'status': self.rng.choices(['open', 'filled', 'cancelled'], weights=[0.8, 0.15, 0.05])[0],
+                }
+                jobs.append((row['id'], row['poster_id'], metro))
+                yield row
+        self._load(Job, rows())
+        return jobs
+
+    def _local_jobs(self, metro, jobs_by_metro, count):
+        local = jobs_by_metro.get(metro, [])
+        return self.rng.sample(local, min(count, len(local)))
+
+    def _create_interests(self, users, metros, jobs_by_metro, per_user):
+        def rows():
+            for user_id, metro in zip(users, metros):
+                for job_id, poster_id in self._local_jobs(metro, jobs_by_metro, per_user):
+                    if poster_id != user_id:
+                        yield {**self._stamp(), 'user_id': user_id, 'job_id': job_id,
+                               'interested': self.rng.random() < 0.4}
+        self._load(MatchingInterest, rows())
+
+    def _create_completions(self, users, metros, jobs_by_metro, per_user):
+        counts = {}
+
+        def rows():
+            for user_id, metro in zip(users, metros):
+                for job_id, poster_id in self._local_jobs(metro, jobs_by_metro, self.rng.randint(0, per_user * 2)):
+                    if poster_id == user_id:
+                        continue
+                    flags = {
+                        'completed': self.rng.random() < 0.9,
+                        'was_urgent': self.rng.random() < 0.2,
+                        'had_accessibility': self.rng.random() < 0.25,
+                        'skill_tags_snapshot': self._tags(0, 3),
+                    }
+                    counts.setdefault(user_id, Counter()).update(counter_contribution(JobCompletion(**flags)))
+                    yield {
+                        **self._stamp(self.now - timedelta(days=self.rng.uniform(0, 365))),
+                        'user_id': user_id, 'job_id': job_id, **flags,
+                    }
+        self._load(JobCompletion, rows())
+        return counts
+
+    def _create_profiles(self, users, metros, counts):
+        def rows():
+            for user_id, metro in zip(users, metros):
+                located = self.rng.random() < 0.9
+                latitude, longitude = self._point(metro) if located else (None, None)
+                tags = self._tags(0, 6)
+                limitations = self.rng.sample(REQUIREMENTS, 1) if self.rng.random() < 0.1 else []
+                yield {
+                    **self._stamp(),
+                    'user_id': user_id,
+                    'latitude': latitude,
+                    'longitude': longitude,
+                    'geohash': encode_geohash(latitude, longitude),
+                    'location_source': 'manual',
+                    'location_label': METROS[metro][0] if located else '',
+                    'max_distance_miles': self.rng.choice([5, 10, 25, 25, 50]),
+                    'skill_tags': tags,
+                    'skill_tag_ids': sorted(self.tag_ids[tag] for tag in tags),
+                    'limitations': limitations,
+                    'limitations_mask': accessibility_mask(limitations),
+                    **{field: counts.get(user_id, {}).get(field, 0) for field in COUNTERS},
+                }
+        self._load(UserProfile, rows(), copy=False)
+
+    def _create_chat(self, users, metros, jobs_by_metro, total, per_conversation):
+        conversations = {}
+        for _ in range(total * 2):
+            if len(conversations) >= total:
+                break
+            index = self.rng.randrange(len(users))
+            picked = self._local_jobs(metros[index], jobs_by_metro, 1)
+            if picked and picked[0][1] != users[index]:
+                job_id, poster_id = picked[0]
+                conversations.setdefault((job_id, users[index]), (poster_id, self._stamp()))
+
+        self._load(Conversation, (
+            {**stamp, 'job_id': job_id, 'volunteer_id': volunteer_id, 'poster_id': poster_id,
+             'volunteer_last_read': None, 'poster_last_read': None,
+             'last_message_content': '', 'last_message_sender_id': None, 'last_message_at': None,
+             'volunteer_unread': 0, 'poster_unread': 0}
+            for (job_id, volunteer_id), (poster_id, stamp) in conversations.items()
+        ))
+
+        def rows():
+            for (_, volunteer_id), (poster_id, stamp) in conversations.items():
+                sent_at = self.now - timedelta(days=self.rng.uniform(0, 60))
+                for _ in range(self.rng.randint(1, per_conversation * 2)):
+                    sent_at += timedelta(minutes=self.rng.expovariate(1 / 30))
+                    yield {
+                        **self._stamp(sent_at),
+                        'conversation_id': stamp['id'],
+                        'sender_id': self.rng.choice([volunteer_id, poster_id]),
+                        'content': self.rng.choice(MESSAGES),
+                    }
+        self._load(Message, rows())
+
+        # Inbox previews and unread counters, filled from the loaded messages
+        ids = [stamp['id'] for _, stamp in conversations.values()]
+        for start in range(0, len(ids), 2000):
+            recount(Conversation.objects.filter(pk__in=ids[start:start + 2000]))
+
+    # ── Loading ───────────────────────────────────────────────────────────────
+
+    def _load(self, model, rows, copy=True):
+        """Insert dict rows in chunks, with COPY when available."""
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.chunk_size:
+                self._flush(model, batch, copy)
+                batch = []
+        if batch:
+            self._flush(model, batch, copy)
+
+    def _flush(self, model, batch, copy):
+        if not (copy and self.use_copy):
+            model.objects.bulk_create([model(**row) for row in batch])
+            return
+
+        fields = [model._meta.get_field(name) for name in batch[0]]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in batch:
+            writer.writerow([
+                json.dumps(value) if isinstance(value, (list, dict)) else (NULL if value is None else value)
+                for value in row.values()
+            ])
+        buffer.seek(0)
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')", buffer,
+            )
@@ -0,0 +1,73 @@
+# Generated by Django 5.2 on 2026-10-17 01:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copy of matching.spatial.encode_geohash as of this migration
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 7
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # geohash interleaves bits starting with longitude
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def backfill_geohash(apps, schema_editor):
+    Job = apps.get_model("matching", "Job")
+    jobs = Job.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    batch = []
+    for job in jobs.only("id", "latitude", "longitude").iterator(chunk_size=2000):
+        job.geohash = encode_geohash(job.latitude, job.longitude)
+        batch.append(job)
+        if len(batch) >= 2000:
+            Job.objects.bulk_update(batch, ["geohash"])
+            batch = []
+    if batch:
+        Job.objects.bulk_update(batch, ["geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matching", "0007_alter_job_latitude_alter_job_longitude"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="geohash",
+            field=models.CharField(blank=True, default="", max_length=12),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("is_active", True), ("status", "open")),
+                fields=["geohash"],
+                name="job_open_geohash_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+    ]
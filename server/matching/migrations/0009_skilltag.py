@@ -0,0 +1,72 @@
+# Generated by Django 5.2 on 2026-10-17 01:56
+
+from django.db import migrations, models
+
+
+def normalize_tag(tag):
+    # Frozen copy of matching.tags.normalize_tag as of this migration
+    return " ".join(str(tag).split()).lower()[:100]
+
+
+def backfill_skill_tag_ids(apps, schema_editor):
+    SkillTag = apps.get_model("matching", "SkillTag")
+    ids = {}
+
+    def tag_ids(tags):
+        result = set()
+        for tag in tags or []:
+            name = normalize_tag(tag)
+            if not name:
+                continue
+            if name not in ids:
+                ids[name] = SkillTag.objects.get_or_create(name=name)[0].id
+            result.add(ids[name])
+        return sorted(result)
+
+    for model_name in ("Job", "UserProfile"):
+        model = apps.get_model("matching", model_name)
+        batch = []
+        for row in model.objects.only("id", "skill_tags").iterator(chunk_size=2000):
+            row.skill_tag_ids = tag_ids(row.skill_tags)
+            batch.append(row)
+            if len(batch) >= 2000:
+                model.objects.bulk_update(batch, ["skill_tag_ids"])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ["skill_tag_ids"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matching", "0008_job_geohash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SkillTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="skill_tag_ids",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="skill_tag_ids",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(backfill_skill_tag_ids, migrations.RunPython.noop),
+    ]
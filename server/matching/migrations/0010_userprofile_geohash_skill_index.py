@@ -0,0 +1,81 @@
+# Generated by Django 5.2 on 2026-10-17 01:58
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copy of matching.spatial.encode_geohash as of this migration
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 7
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # geohash interleaves bits starting with longitude
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def backfill_geohash(apps, schema_editor):
+    UserProfile = apps.get_model("matching", "UserProfile")
+    profiles = UserProfile.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    batch = []
+    for profile in profiles.only("id", "latitude", "longitude").iterator(chunk_size=2000):
+        profile.geohash = encode_geohash(profile.latitude, profile.longitude)
+        batch.append(profile)
+        if len(batch) >= 2000:
+            UserProfile.objects.bulk_update(batch, ["geohash"])
+            batch = []
+    if batch:
+        UserProfile.objects.bulk_update(batch, ["geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matching", "0009_skilltag"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="geohash",
+            field=models.CharField(blank=True, default="", max_length=12),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="userprofile",
+            index=models.Index(
+                fields=["geohash"],
+                name="profile_geohash_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userprofile",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["skill_tag_ids"],
+                name="profile_skill_tag_ids_gin",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+    ]
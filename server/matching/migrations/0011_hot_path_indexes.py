@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-17 02:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matching", "0010_userprofile_geohash_skill_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("is_active", True), ("status", "open")),
+                fields=["-created_at"],
+                name="job_open_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobcompletion",
+            index=models.Index(
+                fields=["user", "completed", "was_urgent", "had_accessibility"],
+                name="completion_user_flags_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="matchinginterest",
+            index=models.Index(
+                condition=models.Q(("interested", True)),
+                fields=["job"],
+                name="interest_job_interested_idx",
+            ),
+        ),
+    ]
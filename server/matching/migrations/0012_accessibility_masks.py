@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-17 02:25
+
+from django.db import migrations, models
+
+# Frozen copy of matching.accessibility's bit layout as of this migration
+FLAG_BITS = {
+    "heavy_lifting": 1 << 0,
+    "standing_long": 1 << 1,
+    "driving_required": 1 << 2,
+    "outdoor_work": 1 << 3,
+}
+
+
+def accessibility_mask(flags):
+    mask = 0
+    for flag in flags or []:
+        mask |= FLAG_BITS.get(flag, 0)
+    return mask
+
+
+def _backfill(model, source, target):
+    rows = model.objects.exclude(**{source: []})
+    batch = []
+    for row in rows.only("id", source).iterator(chunk_size=2000):
+        setattr(row, target, accessibility_mask(getattr(row, source)))
+        batch.append(row)
+        if len(batch) >= 2000:
+            model.objects.bulk_update(batch, [target])
+            batch = []
+    if batch:
+        model.objects.bulk_update(batch, [target])
+
+
+def backfill_masks(apps, schema_editor):
+    _backfill(apps.get_model("matching", "Job"), "accessibility_requirements", "accessibility_mask")
+    _backfill(apps.get_model("matching", "UserProfile"), "limitations", "limitations_mask")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matching", "0011_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="accessibility_mask",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="limitations_mask",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_masks, migrations.RunPython.noop),
+    ]
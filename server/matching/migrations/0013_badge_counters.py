@@ -0,0 +1,58 @@
+# Generated by Django 5.2 on 2026-10-17 02:29
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+# Frozen copy of matching.badges.COUNTERS as of this migration
+COUNTERS = {
+    "jobs_completed": Q(completed=True),
+    "jobs_dropped": Q(completed=False),
+    "specialist_count": Q(completed=True, skill_tags_snapshot__isnull=False) & ~Q(skill_tags_snapshot=[]),
+    "firefighter_count": Q(completed=True, was_urgent=True),
+    "inclusionist_count": Q(completed=True, had_accessibility=True),
+}
+
+
+def backfill_counters(apps, schema_editor):
+    JobCompletion = apps.get_model("matching", "JobCompletion")
+    UserProfile = apps.get_model("matching", "UserProfile")
+    rows = JobCompletion.objects.values("user_id").annotate(
+        **{field: Count("id", filter=condition) for field, condition in COUNTERS.items()}
+    )
+    counts = {row.pop("user_id"): row for row in rows}
+    batch = []
+    for profile in UserProfile.objects.filter(user_id__in=counts).iterator(chunk_size=2000):
+        for field, value in counts[profile.user_id].items():
+            setattr(profile, field, value)
+        batch.append(profile)
+        if len(batch) >= 2000:
+            UserProfile.objects.bulk_update(batch, list(COUNTERS))
+            batch = []
+    if batch:
+        UserProfile.objects.bulk_update(batch, list(COUNTERS))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matching", "0012_accessibility_masks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="firefighter_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="inclusionist_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="specialist_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 5.2 on 2026-10-17 02:38
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+REGION_PRECISION = 3  # matching.leaderboard.REGION_PRECISION as of this migration
+
+
+def backfill_leaderboard(apps, schema_editor):
+    Badge = apps.get_model("matching", "Badge")
+    LeaderboardEntry = apps.get_model("matching", "LeaderboardEntry")
+    UserProfile = apps.get_model("matching", "UserProfile")
+    regions = {
+        user_id: (geohash or "")[:REGION_PRECISION]
+        for user_id, geohash in UserProfile.objects.values_list("user_id", "geohash").iterator(chunk_size=2000)
+    }
+    batch = []
+    badges = Badge.objects.exclude(level=0, progress=0).values("user_id", "track", "level", "progress", "title")
+    for badge in badges.iterator(chunk_size=2000):
+        region = regions.get(badge["user_id"], "")
+        for board in ["", region] if region else [""]:
+            batch.append(LeaderboardEntry(region=board, **badge))
+        if len(batch) >= 2000:
+            LeaderboardEntry.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        LeaderboardEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matching", "0013_badge_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaderboardEntry",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "track",
+                    models.CharField(
+                        choices=[
+                            ("specialist", "Specialist"),
+                            ("firefighter", "Firefighter"),
+                            ("anchor", "Anchor"),
+                            ("inclusionist", "Inclusionist"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("region", models.CharField(blank=True, default="", max_length=12)),
+                (
+                    "level",
+                    models.IntegerField(
+                        choices=[
+                            (0, "None"),
+                            (1, "Bronze"),
+                            (2, "Silver"),
+                            (3, "Gold"),
+                        ],
+                        default=0,
+                    ),
+                ),
+                ("progress", models.IntegerField(default=0)),
+                ("title", models.CharField(blank=True, max_length=100)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leaderboard_entries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["track", "region", "-level", "-progress", "-user"],
+                        name="leaderboard_rank_idx",
+                    )
+                ],
+                "unique_together": {("user", "track", "region")},
+            },
+        ),
+        migrations.RunPython(backfill_leaderboard, migrations.RunPython.noop),
+    ]
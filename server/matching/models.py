@@ -1,8 +1,52 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.utils import timezone
 
 from core.models import BaseModel
 from authentication.models import User
+from .accessibility import accessibility_mask
+from .spatial import encode_geohash
+from .tags import normalize_tag
+
+
+class SkillTag(models.Model):
+    """Canonical skill tag. Jobs and profiles store these integer ids next to their tag lists."""
+    name = models.CharField(max_length=100, unique=True)  # normalize_tag() form, at most MAX_TAG_LENGTH
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def ids_for(cls, tags):
+        """Return sorted ids for the given tags, creating missing SkillTag rows."""
+        names = {normalize_tag(tag) for tag in tags or []} - {''}
+        if not names:
+            return []
+        ids = dict(cls.objects.filter(name__in=names).values_list('name', 'id'))
+        missing = names - ids.keys()
+        if missing:
+            cls.objects.bulk_create([cls(name=name) for name in missing], ignore_conflicts=True)
+            ids.update(cls.objects.filter(name__in=missing).values_list('name', 'id'))
+        return sorted(ids.values())
+
+
+def _derive_fields(instance, kwargs, derived):
+    """
+    Recompute derived columns in save() when their source fields are written.
+
+    `derived` maps field name -> (source field names, function of the instance).
+    Derived fields are added to update_fields so partial saves stay consistent.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None:
+        update_fields = set(update_fields)
+    for field, (sources, compute) in derived.items():
+        if update_fields is None or update_fields & sources:
+            setattr(instance, field, compute(instance))
+            if update_fields is not None:
+                update_fields.add(field)
+    if update_fields is not None:
+        kwargs['update_fields'] = update_fields
 
 
 class Job(BaseModel):
@@ -18,11 +62,14 @@ class Job(BaseModel):
     poster = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posted_jobs')
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default='')  # derived from lat/lng on save
     location_label = models.CharField(max_length=255, blank=True, default='')  # e.g., "East Lansing, MI"
     shift_start = models.DateTimeField()
     shift_end = models.DateTimeField()
     skill_tags = models.JSONField(default=list, blank=True)
+    skill_tag_ids = models.JSONField(default=list, blank=True)  # sorted SkillTag ids, derived on save
     accessibility_requirements = models.JSONField(default=list, blank=True)
+    accessibility_mask = models.IntegerField(default=0)  # known requirement flags as bits, derived on save
     image = models.CharField(max_length=500, blank=True, default='')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
 
@@ -35,11 +82,36 @@ class Job(BaseModel):
     def is_urgent(self):
         return self.urgency_hours <= 24
 
+    def save(self, *args, **kwargs):
+        _derive_fields(self, kwargs, {
+            'geohash': ({'latitude', 'longitude'}, lambda job: encode_geohash(job.latitude, job.longitude)),
+            'skill_tag_ids': ({'skill_tags'}, lambda job: SkillTag.ids_for(job.skill_tags)),
+            'accessibility_mask': (
+                {'accessibility_requirements'}, lambda job: accessibility_mask(job.accessibility_requirements),
+            ),
+        })
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Prefix lookups from matching.spatial.near() over the open feed
+            models.Index(
+                fields=['geohash'],
+                name='job_open_geohash_idx',
+                opclasses=['varchar_pattern_ops'],
+                condition=models.Q(status='open', is_active=True),
+            ),
+            # Open feed without a location, in default ordering
+            models.Index(
+                fields=['-created_at'],
+                name='job_open_created_idx',
+                condition=models.Q(status='open', is_active=True),
+            ),
+        ]
 
 
 class UserProfile(BaseModel):
@@ -51,18 +123,40 @@ class UserProfile(BaseModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='matching_profile')
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default='')  # derived from lat/lng on save
     location_source = models.CharField(max_length=10, choices=LOCATION_SOURCE_CHOICES, default='manual')
     location_label = models.CharField(max_length=255, blank=True, default='')  # e.g., "Lansing, MI"
     max_distance_miles = models.IntegerField(default=25)  # 1-100 miles
     last_location_update = models.DateTimeField(null=True, blank=True)
     skill_tags = models.JSONField(default=list, blank=True)
+    skill_tag_ids = models.JSONField(default=list, blank=True)  # sorted SkillTag ids, derived on save
     limitations = models.JSONField(default=list, blank=True)
+    limitations_mask = models.IntegerField(default=0)  # known limitation flags as bits, derived on save
+    # Completion counters, maintained by badges.record_completion()
     jobs_completed = models.IntegerField(default=0)
     jobs_dropped = models.IntegerField(default=0)
+    specialist_count = models.IntegerField(default=0)
+    firefighter_count = models.IntegerField(default=0)
+    inclusionist_count = models.IntegerField(default=0)
+
+    def save(self, *args, **kwargs):
+        _derive_fields(self, kwargs, {
+            'geohash': ({'latitude', 'longitude'}, lambda profile: encode_geohash(profile.latitude, profile.longitude)),
+            'skill_tag_ids': ({'skill_tags'}, lambda profile: SkillTag.ids_for(profile.skill_tags)),
+            'limitations_mask': ({'limitations'}, lambda profile: accessibility_mask(profile.limitations)),
+        })
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Profile: {self.user.email}"
 
+    class Meta:
+        indexes = [
+            # Spatial pre-filter and skill inverted index for volunteer recommendations
+            models.Index(fields=['geohash'], name='profile_geohash_idx', opclasses=['varchar_pattern_ops']),
+            GinIndex(fields=['skill_tag_ids'], name='profile_skill_tag_ids_gin', opclasses=['jsonb_path_ops']),
+        ]
+
     @property
     def display_location(self):
         """Return privacy-safe location string."""
@@ -84,6 +178,13 @@ class JobCompletion(BaseModel):
 
     class Meta:
         unique_together = ('user', 'job')
+        indexes = [
+            # Per-track recount in badges.recount() and reconcile_badges
+            models.Index(
+                fields=['user', 'completed', 'was_urgent', 'had_accessibility'],
+                name='completion_user_flags_idx',
+            ),
+        ]
 
     def __str__(self):
         status = 'completed' if self.completed else 'dropped'
@@ -118,6 +219,29 @@ class Badge(BaseModel):
         return f"{self.user.email} — {self.get_track_display()} {self.get_level_display()}"
 
 
+class LeaderboardEntry(BaseModel):
+    """Materialized ranking row: a user's badge on one track, on the global board or a regional one."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    track = models.CharField(max_length=20, choices=Badge.TRACK_CHOICES)
+    region = models.CharField(max_length=12, blank=True, default='')  # geohash prefix; '' = global board
+    level = models.IntegerField(choices=Badge.LEVEL_CHOICES, default=0)
+    progress = models.IntegerField(default=0)
+    title = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        unique_together = ('user', 'track', 'region')
+        indexes = [
+            # Board order for keyset pages and rank counts in leaderboard.py
+            models.Index(
+                fields=['track', 'region', '-level', '-progress', '-user'],
+                name='leaderboard_rank_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} — {self.track} {self.region or 'global'}"
+
+
 class MatchingInterest(BaseModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='matching_interests')
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='interests')
@@ -125,6 +249,10 @@ class MatchingInterest(BaseModel):
 
     class Meta:
         unique_together = ('user', 'job')
+        indexes = [
+            # Right swipes on a job, for its poster
+            models.Index(fields=['job'], name='interest_job_interested_idx', condition=models.Q(interested=True)),
+        ]
 
     def __str__(self):
         action = 'interested in' if self.interested else 'passed on'
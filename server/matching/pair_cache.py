@@ -0,0 +1,34 @@
+"""
+Cache of the static part of each (profile, job) score.
+
+Of the score terms only U_20 moves with the clock. D_35 + S_30 (and whether
+the pair is excluded or out of range) change only when the profile or job
+row changes, and R_15 is a per-profile constant. ranking.top_k() stores the
+static part of every pair it scores and adds urgency and reliability at read
+time, so a rerank after the feed cache is invalidated skips the haversine and
+tag-overlap work for every job that did not change.
+
+A row's version is its updated_at. Entries are keyed by profile version, so
+saving the profile orphans them, and each job entry carries the job version
+it was computed from. Writes that bypass save() must bump updated_at.
+"""
+from django.core.cache import cache
+
+PAIR_CACHE_TIMEOUT = 3600
+
+
+def _pairs_key(profile, radius):
+    return f"pairs:{profile.id}:{profile.updated_at.timestamp()}:{radius}"
+
+
+def get_pairs(profile, radius):
+    """Return {job_id: (job_version, static, distance)} for the profile; static is None for zero-score pairs."""
+    if profile.updated_at is None:
+        return {}
+    return cache.get(_pairs_key(profile, radius)) or {}
+
+
+def store_pairs(profile, radius, pairs):
+    if profile.updated_at is None:
+        return  # Unsaved profile: no version to key on
+    cache.set(_pairs_key(profile, radius), pairs, timeout=PAIR_CACHE_TIMEOUT)
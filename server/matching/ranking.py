@@ -0,0 +1,118 @@
+"""
+Top-k ranking with score upper bounds.
+
+The score is additive (D_35 + S_30 + U_20 + R_15), and every term except the
+skill overlap can be computed from a job's coordinates and shift start alone.
+top_k() reads just those narrow columns for all candidates, bounds each job by
+its exact D + U + R plus the maximum S, and then scores candidates fully in
+bound order, one chunk at a time. It stops as soon as the best remaining bound
+cannot beat the current k-th score, so the tag/requirement columns are only
+read for roughly k jobs regardless of how many candidates there are.
+
+Pairs scored before are finished from their cached static part (see
+pair_cache), which is also their exact bound, so only new or changed jobs are
+fetched and scored.
+"""
+import numpy as np
+from django.utils import timezone
+
+from . import pair_cache
+from .batch_scoring import (
+    BLOCK_FIELDS, CandidateBlock, distance_term, reliability_term, static_block, urgency_term,
+)
+
+BOUND_FIELDS = ('id', 'latitude', 'longitude', 'shift_start', 'updated_at')
+S_MAX = 30
+MIN_CHUNK_SIZE = 256
+
+
+def top_k(user_profile, jobs, k, radius=25, now=None):
+    """
+    Return the best k jobs in a queryset as [(job_id, score, distance), ...].
+
+    Gives the same result as scoring every job and keeping the k highest
+    positive scores, ties broken by queryset order.
+    """
+    now = now or timezone.now()
+    rows = list(jobs.values_list(*BOUND_FIELDS))
+    if not rows or k <= 0:
+        return []
+
+    ids = np.array([row[0] for row in rows], dtype=object)
+    latitudes = np.array([row[1] for row in rows], dtype=np.float64)
+    longitudes = np.array([row[2] for row in rows], dtype=np.float64)
+    shift_starts = np.array([row[3].timestamp() for row in rows], dtype=np.float64)
+    versions = [row[4].timestamp() for row in rows]
+    u_score = urgency_term(shift_starts, now.timestamp())
+    r_score = reliability_term(user_profile)
+
+    # Static parts (D + S) of pairs whose profile and job are unchanged; NaN = scores 0
+    cached = pair_cache.get_pairs(user_profile, radius)
+    pairs = {}
+    static = np.full(len(rows), np.nan)
+    distances = np.zeros(len(rows))
+    known = np.zeros(len(rows), dtype=bool)
+    for position, (job_id, version) in enumerate(zip(ids, versions)):
+        entry = cached.get(job_id)
+        if entry is not None and entry[0] == version:
+            pairs[job_id] = entry
+            known[position] = True
+            static[position] = np.nan if entry[1] is None else entry[1]
+            distances[position] = entry[2]
+
+    bounds = np.full(len(rows), np.nan)
+    bounds[known] = static[known] + u_score[known] + r_score  # exact
+    unknown = np.flatnonzero(~known)
+    _, d_score, out_of_range = distance_term(user_profile, latitudes[unknown], longitudes[unknown], radius)
+    bounds[unknown[~out_of_range]] = (d_score + S_MAX + u_score[unknown] + r_score)[~out_of_range]
+
+    candidates = np.flatnonzero(~np.isnan(bounds))
+    order = candidates[np.argsort(-bounds[candidates], kind='stable')]
+    position_of = {job_id: position for position, job_id in enumerate(ids)}
+
+    best_positions = np.empty(0, dtype=np.int64)
+    best_scores = np.empty(0)
+    chunk_size = max(k, MIN_CHUNK_SIZE)
+    scored_new = False
+
+    for start in range(0, len(order), chunk_size):
+        chunk = order[start:start + chunk_size]
+        # A rounded score can never exceed its rounded bound
+        if len(best_scores) >= k and np.round(bounds[chunk[0]] + 1e-9, 2) < best_scores.min():
+            break
+
+        missing = chunk[~known[chunk]]
+        if len(missing):
+            scored_new = True
+            block = CandidateBlock.from_rows(
+                jobs.model.objects.filter(id__in=list(ids[missing])).values_list(*BLOCK_FIELDS)
+            )
+            block_static, block_distances, excluded, block_out = static_block(user_profile, block, radius=radius)
+            block_static[excluded | block_out] = np.nan
+            block_distances = np.round(block_distances, 2)
+            for job_id, value, distance in zip(block.ids, block_static, block_distances):
+                position = position_of[job_id]
+                static[position] = value
+                distances[position] = distance
+                known[position] = True
+                pairs[job_id] = (versions[position], None if np.isnan(value) else float(value), float(distance))
+
+        scores = np.round(static[chunk] + u_score[chunk] + r_score, 2)
+        keep = ~np.isnan(scores) & (scores > 0)
+
+        best_positions = np.concatenate([best_positions, chunk[keep]])
+        best_scores = np.concatenate([best_scores, scores[keep]])
+        if len(best_scores) > k:
+            winners = np.lexsort((best_positions, -best_scores))[:k]
+            best_positions = best_positions[winners]
+            best_scores = best_scores[winners]
+
+    if scored_new:
+        # Only current candidates are kept, so departed jobs fall out of the cache
+        pair_cache.store_pairs(user_profile, radius, pairs)
+
+    ranked = np.lexsort((best_positions, -best_scores))
+    return [
+        (ids[best_positions[i]], float(best_scores[i]), float(distances[best_positions[i]]) or 0)
+        for i in ranked
+    ]
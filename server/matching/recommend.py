@@ -0,0 +1,123 @@
+"""
+Reverse matching: rank volunteers for a job.
+
+Uses the same score as calculate_score(profile, job, radius=profile's
+max_distance_miles), vectorized over UserProfile rows. Candidates come from
+the geohash pre-filter around the job. When the job has skill tags, the
+volunteers sharing one are read first through the GIN index on
+skill_tag_ids. Everyone else is only scored if a volunteer with no
+matching tag could still reach the top N.
+"""
+import numpy as np
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .accessibility import without_conflicts
+from .batch_scoring import haversine_block, urgency_term
+from .models import MatchingInterest, UserProfile
+from .spatial import near
+
+MAX_VOLUNTEER_RADIUS = 100  # largest max_distance_miles a volunteer can pick
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+PROFILE_FIELDS = (
+    'user_id', 'latitude', 'longitude', 'max_distance_miles',
+    'skill_tag_ids', 'limitations', 'jobs_completed', 'jobs_dropped',
+)
+
+
+def candidate_profiles(job):
+    """Located volunteers around the job, minus the poster and anyone who already swiped on it."""
+    profiles = UserProfile.objects.filter(is_active=True).exclude(user_id=job.poster_id)
+    profiles = profiles.filter(~Exists(
+        MatchingInterest.objects.filter(job=job, user_id=OuterRef('user_id'))
+    ))
+    profiles = without_conflicts(profiles, job.accessibility_mask, 'limitations_mask')
+    return near(profiles, job.latitude, job.longitude, MAX_VOLUNTEER_RADIUS).order_by('user_id')
+
+
+def _overlap_counts(lists, values):
+    """Number of items of each list that are in `values`."""
+    lengths = [len(items or []) for items in lists]
+    flat = [item for items in lists for item in (items or [])]
+    if not flat or not values:
+        return np.zeros(len(lists))
+    hits = np.isin(np.array(flat, dtype=object), list(values))
+    return np.bincount(np.repeat(np.arange(len(lists)), lengths), weights=hits, minlength=len(lists))
+
+
+def score_profiles(job, rows, now=None):
+    """
+    Score PROFILE_FIELDS rows against one job.
+
+    Returns (user_ids, scores, distances) arrays; scores match
+    calculate_score() with each volunteer's own radius.
+    """
+    now = (now or timezone.now()).timestamp()
+    user_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    latitudes = np.array([row[1] for row in rows], dtype=np.float64)
+    longitudes = np.array([row[2] for row in rows], dtype=np.float64)
+    radii = np.array([row[3] or 25 for row in rows], dtype=np.float64)
+    completed = np.array([row[6] for row in rows], dtype=np.float64)
+    dropped = np.array([row[7] for row in rows], dtype=np.float64)
+
+    # A_bool: Accessibility filter
+    excluded = _overlap_counts([row[5] for row in rows], set(job.accessibility_requirements or [])) > 0
+
+    # D_35: Distance score (max 35), against each volunteer's own radius
+    distances = haversine_block(job.latitude, job.longitude, latitudes, longitudes)
+    out_of_range = ~(distances <= radii)
+    d_score = 35 * np.maximum(0, 1 - distances / radii)
+
+    # S_30: Skill overlap (max 30)
+    job_tags = set(job.skill_tag_ids or [])
+    if not job_tags:
+        s_score = 30
+    else:
+        s_score = 30 * (_overlap_counts([row[4] for row in rows], job_tags) / len(job_tags))
+
+    # U_20: Urgency (max 20)
+    u_score = urgency_term(job.shift_start.timestamp(), now)
+
+    # R_15: Reliability (max 15)
+    total = completed + dropped
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_score = np.where(total == 0, 15 * 0.5, 15 * (completed / total))
+
+    scores = np.round(d_score + s_score + u_score + r_score, 2)
+    scores[out_of_range | excluded] = 0
+    return user_ids, scores, np.round(distances, 2)
+
+
+def _rank(job, rows, limit, now):
+    user_ids, scores, distances = score_profiles(job, rows, now=now)
+    order = np.lexsort((user_ids, -scores))
+    order = order[scores[order] > 0][:limit]
+    return [(int(user_ids[i]), float(scores[i]), float(distances[i])) for i in order]
+
+
+def recommend_volunteers(job, limit=PAGE_SIZE, now=None):
+    """Return the best volunteers for a job as [(user_id, score, distance), ...], ties by user id."""
+    if job.latitude is None or job.longitude is None or limit < 1:
+        return []
+    now = now or timezone.now()
+    candidates = candidate_profiles(job)
+
+    tag_ids = job.skill_tag_ids or []
+    if not tag_ids:
+        return _rank(job, list(candidates.values_list(*PROFILE_FIELDS)), limit, now)
+
+    # Volunteers sharing at least one tag, straight from the inverted index
+    shares_tag = Q()
+    for tag_id in tag_ids:
+        shares_tag |= Q(skill_tag_ids__contains=[tag_id])
+    rows = list(candidates.filter(shares_tag).values_list(*PROFILE_FIELDS))
+    ranked = _rank(job, rows, limit, now)
+
+    # Without a shared tag a volunteer scores at most D_35 + U_20 + R_15
+    bound = 35 + urgency_term(job.shift_start.timestamp(), now.timestamp()) + 15
+    if ranked and len(ranked) >= limit and ranked[-1][1] > np.round(bound + 1e-9, 2):
+        return ranked
+
+    rows += candidates.exclude(shares_tag).values_list(*PROFILE_FIELDS)
+    return _rank(job, rows, limit, now)
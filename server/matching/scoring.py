@@ -1,9 +1,13 @@
 import math
 
+from .tags import normalize_tag
+
+EARTH_RADIUS_MILES = 3959
+
 
 def haversine_distance(lat1, lon1, lat2, lon2):
     """Calculate distance in miles between two lat/lng points."""
-    R = 3959  # Earth radius in miles
+    R = EARTH_RADIUS_MILES
     lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
     dlat = lat2 - lat1
     dlon = lon2 - lon1
@@ -39,11 +43,11 @@ def calculate_score(user_profile, job, radius=25):
         d_score = 35 * max(0, 1 - distance / radius)
 
     # S_30: Skill overlap (max 30)
-    job_tags = set(tag.lower() for tag in (job.skill_tags or []))
+    job_tags = set(normalize_tag(tag) for tag in (job.skill_tags or [])) - {''}
     if not job_tags:
         s_score = 30
     else:
-        user_tags = set(tag.lower() for tag in (user_profile.skill_tags or []))
+        user_tags = set(normalize_tag(tag) for tag in (user_profile.skill_tags or []))
         overlap = len(job_tags & user_tags)
         s_score = 30 * (overlap / len(job_tags))
 
@@ -2,6 +2,7 @@ from rest_framework import serializers
 
 from .models import Job, UserProfile, MatchingInterest, JobAcceptance
 from .geocoding import format_distance
+from .tags import clean_tags
 
 
 class JobMatchSerializer(serializers.ModelSerializer):
@@ -72,6 +73,9 @@ class UserProfileFullSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['display_location']
 
+    def validate_skill_tags(self, value):
+        return clean_tags(value)
+
 
 class LocationUpdateSerializer(serializers.Serializer):
     """Serializer for updating user location."""
@@ -120,6 +124,16 @@ class BadgeSerializer(serializers.Serializer):
     description = serializers.CharField()
 
 
+class LeaderboardEntrySerializer(serializers.Serializer):
+    """Row on a badge leaderboard; the view adds the rank."""
+    user_id = serializers.IntegerField(source='user.id')
+    username = serializers.CharField(source='user.username')
+    level = serializers.IntegerField()
+    level_name = serializers.CharField(source='get_level_display')
+    progress = serializers.IntegerField()
+    title = serializers.CharField(allow_blank=True)
+
+
 class JobCompletionSerializer(serializers.Serializer):
     job_id = serializers.UUIDField()
     completed = serializers.BooleanField(default=True)
@@ -142,6 +156,9 @@ class JobCreateSerializer(serializers.Serializer):
     shift_end = serializers.DateTimeField(required=False, allow_null=True, default=None)
     image = serializers.CharField(max_length=500, required=False, default='')
 
+    def validate_skill_tags(self, value):
+        return clean_tags(value)
+
     def validate(self, data):
         if data.get('shift_start') and data.get('shift_end'):
             if data['shift_end'] <= data['shift_start']:
@@ -169,3 +186,13 @@ class InterestedUserSerializer(serializers.Serializer):
     first_name = serializers.CharField(source='user.first_name')
     last_name = serializers.CharField(source='user.last_name')
     interested_at = serializers.DateTimeField(source='created_at')
+
+
+class RecommendedVolunteerSerializer(serializers.Serializer):
+    """Volunteer suggested for a job; coordinates stay hidden."""
+    user_id = serializers.IntegerField(source='user.id')
+    username = serializers.CharField(source='user.username')
+    first_name = serializers.CharField(source='user.first_name')
+    last_name = serializers.CharField(source='user.last_name')
+    display_location = serializers.CharField(read_only=True)
+    skill_tags = serializers.ListField(child=serializers.CharField())
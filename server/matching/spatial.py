@@ -0,0 +1,106 @@
+"""
+Geohash grid index for job locations.
+
+Every Job stores the geohash of its coordinates. A (lat, lng, radius) lookup
+is answered by covering the search box with a handful of geohash cells and
+filtering on their prefixes, which Postgres serves from a pattern-ops index
+instead of range-scanning latitude/longitude across every open job.
+"""
+import math
+
+from django.db.models import Q
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 7  # stored precision, ~150m cells
+MAX_COVER_CELLS = 32  # upper bound on prefixes per query
+MILES_PER_DEGREE_LAT = 69.0
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    """Encode coordinates as a geohash string. Returns '' without coordinates."""
+    if lat is None or lng is None:
+        return ''
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # geohash interleaves bits starting with longitude
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Return (lat_degrees, lng_degrees) spanned by one cell at this precision."""
+    lat_bits = (5 * precision) // 2
+    lng_bits = 5 * precision - lat_bits
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def bounding_box(lat, lng, radius):
+    """Return (min_lat, max_lat, min_lng, max_lng) around a point for a radius in miles."""
+    lat_delta = radius / MILES_PER_DEGREE_LAT
+    lng_delta = radius / (MILES_PER_DEGREE_LAT * max(0.1, abs(math.cos(math.radians(lat)))))
+    return lat - lat_delta, lat + lat_delta, lng - lng_delta, lng + lng_delta
+
+
+def _cell_range(low, high, size, offset):
+    return int((low + offset) // size), int((high + offset) // size)
+
+
+def covering_cells(lat, lng, radius, precision=None):
+    """
+    Return geohash prefixes whose cells cover the radius around a point.
+
+    Uses the given precision, or else the finest precision that needs at most
+    MAX_COVER_CELLS cells. The box is clamped to valid coordinates; searches
+    across the antimeridian only see the near side.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius)
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+    min_lng, max_lng = max(min_lng, -180.0), min(max_lng, 180.0)
+
+    for precision in ([precision] if precision else range(GEOHASH_PRECISION, 0, -1)):
+        lat_size, lng_size = cell_size(precision)
+        lat_lo, lat_hi = _cell_range(min_lat, max_lat, lat_size, 90.0)
+        lng_lo, lng_hi = _cell_range(min_lng, max_lng, lng_size, 180.0)
+        if (lat_hi - lat_lo + 1) * (lng_hi - lng_lo + 1) <= MAX_COVER_CELLS or precision == 1:
+            break
+
+    cells = set()
+    for i in range(lat_lo, lat_hi + 1):
+        center_lat = min(-90.0 + (i + 0.5) * lat_size, 90.0)
+        for j in range(lng_lo, lng_hi + 1):
+            center_lng = min(-180.0 + (j + 0.5) * lng_size, 180.0)
+            cells.add(encode_geohash(center_lat, center_lng, precision))
+    return sorted(cells)
+
+
+def near(queryset, lat, lng, radius, field='geohash'):
+    """Restrict a queryset of geohashed rows to the box around (lat, lng)."""
+    cells = Q()
+    for prefix in covering_cells(lat, lng, radius):
+        cells |= Q(**{f'{field}__startswith': prefix})
+
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius)
+    return queryset.filter(
+        cells,
+        latitude__gte=min_lat,
+        latitude__lte=max_lat,
+        longitude__gte=min_lng,
+        longitude__lte=max_lng,
+    )
@@ -0,0 +1,28 @@
+"""
+Skill tag normalization.
+
+Tags arrive from the job form, profile edits and Gemini suggestions. Every
+path cleans them with clean_tags() before storing, and matching compares them
+by normalize_tag(), which is also the canonical SkillTag name used for
+integer tag ids.
+"""
+
+MAX_TAG_LENGTH = 100
+
+
+def normalize_tag(tag):
+    """Canonical form of a tag: trimmed, inner whitespace collapsed, lowercase."""
+    return ' '.join(str(tag).split()).lower()[:MAX_TAG_LENGTH]
+
+
+def clean_tags(tags):
+    """Tidy a tag list for storage: drop blanks and case-insensitive duplicates, keep first spelling."""
+    cleaned = []
+    seen = set()
+    for tag in tags or []:
+        display = ' '.join(str(tag).split())
+        key = display.lower()
+        if display and key not in seen:
+            seen.add(key)
+            cleaned.append(display)
+    return cleaned
@@ -0,0 +1,57 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from authentication.models import User
+from matching.accessibility import FLAG_BITS, accessibility_mask
+from matching.feed import candidate_jobs, rank_jobs
+from matching.models import Job, UserProfile
+
+
+class AccessibilityMaskTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com', username='testuser', password='pass123'
+        )
+        self.profile = UserProfile.objects.create(
+            user=self.user, latitude=42.73, longitude=-84.55, limitations=['heavy_lifting'],
+        )
+
+    def _make_job(self, requirements):
+        return Job.objects.create(
+            title='Job',
+            description='Desc',
+            short_description='Short',
+            poster=self.user,
+            latitude=42.73,
+            longitude=-84.55,
+            shift_start=timezone.now() + timezone.timedelta(hours=2),
+            shift_end=timezone.now() + timezone.timedelta(hours=4),
+            accessibility_requirements=requirements,
+        )
+
+    def test_mask_ignores_unknown_flags(self):
+        self.assertEqual(accessibility_mask(['heavy_lifting', 'outdoor_work', 'juggling']),
+                         FLAG_BITS['heavy_lifting'] | FLAG_BITS['outdoor_work'])
+        self.assertEqual(accessibility_mask(None), 0)
+
+    def test_masks_are_derived_on_save(self):
+        job = self._make_job(['standing_long'])
+        self.assertEqual(job.accessibility_mask, FLAG_BITS['standing_long'])
+        self.assertEqual(self.profile.limitations_mask, FLAG_BITS['heavy_lifting'])
+
+        self.profile.limitations = []
+        self.profile.save(update_fields=['limitations'])
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.limitations_mask, 0)
+
+    def test_conflicting_jobs_are_dropped_in_sql(self):
+        allowed = self._make_job(['standing_long'])
+        self._make_job(['heavy_lifting', 'outdoor_work'])
+        self.assertEqual(list(candidate_jobs(self.profile, 25)), [allowed])
+
+    def test_unknown_flags_still_excluded_by_scoring(self):
+        self.profile.limitations = ['heavy_lifting', 'juggling']
+        self.profile.save()
+        unknown = self._make_job(['juggling'])
+        self.assertIn(unknown, candidate_jobs(self.profile, 25))
+        self.assertEqual(rank_jobs(self.profile, 25), [])
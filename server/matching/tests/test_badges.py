@@ -1,9 +1,16 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from rest_framework.test import APIClient
 
 from authentication.models import User
 from matching.models import Job, JobCompletion, Badge, UserProfile
-from matching.badges import compute_badges, record_completion
+from matching.badges import compute_badges, record_completion, recount
 
 
 class BadgeComputationTests(TestCase):
@@ -34,10 +41,7 @@ class BadgeComputationTests(TestCase):
 
     def test_specialist_bronze(self):
         job = self._make_job(skill_tags=['Teaching'])
-        JobCompletion.objects.create(
-            user=self.user, job=job, completed=True,
-            skill_tags_snapshot=['Teaching'],
-        )
+        record_completion(self.user, job, completed=True)
         badges = compute_badges(self.user)
         specialist = next(b for b in badges if b['track'] == 'specialist')
         self.assertEqual(specialist['level'], 1)  # Bronze
@@ -45,10 +49,7 @@ class BadgeComputationTests(TestCase):
     def test_firefighter_counts_urgent(self):
         for i in range(5):
             job = self._make_job(title=f'Urgent {i}')
-            JobCompletion.objects.create(
-                user=self.user, job=job, completed=True,
-                was_urgent=True,
-            )
+            record_completion(self.user, job, completed=True)  # Shift in 2h is urgent
         badges = compute_badges(self.user)
         firefighter = next(b for b in badges if b['track'] == 'firefighter')
         self.assertEqual(firefighter['level'], 2)  # Silver at 5
@@ -59,10 +60,7 @@ class BadgeComputationTests(TestCase):
                 title=f'Accessible {i}',
                 accessibility_requirements=['heavy_lifting'],
             )
-            JobCompletion.objects.create(
-                user=self.user, job=job, completed=True,
-                had_accessibility=True,
-            )
+            record_completion(self.user, job, completed=True)
         badges = compute_badges(self.user)
         inclusionist = next(b for b in badges if b['track'] == 'inclusionist')
         self.assertEqual(inclusionist['level'], 3)  # Gold
@@ -122,3 +120,145 @@ class RecordCompletionTests(TestCase):
         profile = UserProfile.objects.get(user=self.user)
         self.assertEqual(profile.jobs_dropped, 1)
         self.assertEqual(profile.jobs_completed, 0)
+
+    def test_flip_to_dropped_reverses_counters(self):
+        job = Job.objects.create(
+            title='Test',
+            description='Desc',
+            short_description='Short',
+            poster=self.user,
+            latitude=42.73,
+            longitude=-84.55,
+            shift_start=timezone.now() + timezone.timedelta(hours=2),
+            shift_end=timezone.now() + timezone.timedelta(hours=4),
+            skill_tags=['Teaching'],
+            accessibility_requirements=['heavy_lifting'],
+        )
+        record_completion(self.user, job, completed=True)
+        record_completion(self.user, job, completed=True)  # Repeat is a no-op
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual(
+            (profile.jobs_completed, profile.specialist_count, profile.firefighter_count, profile.inclusionist_count),
+            (1, 1, 1, 1),
+        )
+
+        badges = record_completion(self.user, job, completed=False)
+        profile.refresh_from_db()
+        self.assertEqual(profile.jobs_completed, 0)
+        self.assertEqual(profile.jobs_dropped, 1)
+        self.assertEqual(profile.specialist_count + profile.firefighter_count + profile.inclusionist_count, 0)
+        self.assertTrue(all(b['level'] == 0 for b in badges if b['track'] != 'anchor'))
+        self.assertEqual(Badge.objects.get(user=self.user, track='specialist').level, 0)
+
+    def test_read_is_single_query(self):
+        profile = UserProfile.objects.get(user=self.user)
+        with self.assertNumQueries(0):
+            compute_badges(self.user, profile)
+        with self.assertNumQueries(1):
+            compute_badges(self.user)
+
+
+class ReconcileBadgesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com', username='testuser', password='pass123'
+        )
+        UserProfile.objects.create(user=self.user)
+        for i in range(2):
+            job = Job.objects.create(
+                title=f'Test {i}',
+                description='Desc',
+                short_description='Short',
+                poster=self.user,
+                latitude=42.73,
+                longitude=-84.55,
+                shift_start=timezone.now() + timezone.timedelta(hours=2),
+                shift_end=timezone.now() + timezone.timedelta(hours=4),
+            )
+            record_completion(self.user, job, completed=i == 0)
+
+    def test_counters_match_recount(self):
+        counts = recount()[self.user.id]
+        self.assertEqual(counts['jobs_completed'], 1)
+        self.assertEqual(counts['jobs_dropped'], 1)
+        self.assertEqual(counts['firefighter_count'], 1)
+
+        out = StringIO()
+        call_command('reconcile_badges', stdout=out)
+        self.assertIn('match', out.getvalue())
+
+    def test_fix_repairs_drift(self):
+        UserProfile.objects.filter(user=self.user).update(jobs_completed=7, firefighter_count=0)
+
+        with self.assertRaises(CommandError):
+            call_command('reconcile_badges', stdout=StringIO())
+
+        call_command('reconcile_badges', '--fix', stdout=StringIO())
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual(profile.jobs_completed, 1)
+        self.assertEqual(profile.firefighter_count, 1)
+        self.assertEqual(Badge.objects.get(user=self.user, track='firefighter').level, 1)
+
+
+class BadgeReadPathTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com', username='testuser', password='pass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _writes(self, queries):
+        return [q['sql'] for q in queries if q['sql'].split()[0] in ('INSERT', 'UPDATE', 'DELETE')]
+
+    def test_profile_get_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/matching/profile')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._writes(queries.captured_queries), [])
+        self.assertFalse(UserProfile.objects.filter(user=self.user).exists())
+        self.assertTrue(all(b['level'] == 0 for b in response.data['badges'] if b['track'] != 'anchor'))
+
+    def test_profile_revalidates_with_etag(self):
+        UserProfile.objects.create(user=self.user)
+        response = self.client.get('/api/matching/profile')
+        etag = response['ETag']
+
+        response = self.client.get('/api/matching/profile', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.client.patch('/api/matching/profile', {'max_distance_miles': 10}, format='json')
+        response = self.client.get('/api/matching/profile', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_badges_conditional_get(self):
+        UserProfile.objects.create(user=self.user)
+        url = f'/api/matching/users/{self.user.id}/badges'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # A rename touches only the user row; the ETag still catches it
+        self.user.username = 'renamed'
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['username'], 'renamed')
+
+        etag = response['ETag']
+        job = Job.objects.create(
+            title='Test',
+            description='Desc',
+            short_description='Short',
+            poster=self.user,
+            latitude=42.73,
+            longitude=-84.55,
+            shift_start=timezone.now() + timezone.timedelta(hours=2),
+            shift_end=timezone.now() + timezone.timedelta(hours=4),
+        )
+        record_completion(self.user, job, completed=True)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
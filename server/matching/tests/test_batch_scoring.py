@@ -0,0 +1,98 @@
+import math
+
+from django.test import TestCase
+from django.utils import timezone
+
+from authentication.models import User
+from matching.models import Job, UserProfile
+from matching.scoring import calculate_score
+from matching.batch_scoring import CandidateBlock, score_block, top_indices
+
+
+class BatchScoringParityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com', username='testuser', password='pass123'
+        )
+        self.profile = UserProfile.objects.create(
+            user=self.user,
+            latitude=42.73,
+            longitude=-84.55,
+            skill_tags=['Teaching', 'cooking'],
+            limitations=['heavy_lifting'],
+            jobs_completed=3,
+            jobs_dropped=1,
+        )
+        now = timezone.now()
+        specs = [
+            {},
+            {'latitude': 42.80, 'longitude': -84.40, 'skill_tags': ['teaching', 'Programming']},
+            {'latitude': 42.60, 'longitude': -84.70, 'skill_tags': ['Cooking', 'COOKING']},
+            {'skill_tags': ['Gardening']},
+            {'accessibility_requirements': ['heavy_lifting']},
+            {'accessibility_requirements': ['driving_required']},
+            {'latitude': 30.0, 'longitude': -90.0},
+            {'shift_start': now + timezone.timedelta(hours=30)},
+            {'shift_start': now + timezone.timedelta(hours=200)},
+            {'shift_start': now - timezone.timedelta(hours=3)},
+        ]
+        self.jobs = [self._make_job(**spec) for spec in specs]
+
+    def _make_job(self, **kwargs):
+        defaults = {
+            'title': 'Test',
+            'description': 'Desc',
+            'short_description': 'Short',
+            'poster': self.user,
+            'latitude': 42.73,
+            'longitude': -84.55,
+            'shift_start': timezone.now() + timezone.timedelta(hours=2),
+            'shift_end': timezone.now() + timezone.timedelta(hours=4),
+        }
+        defaults.update(kwargs)
+        return Job.objects.create(**defaults)
+
+    def _assert_parity(self, radius=25):
+        block = CandidateBlock.from_jobs(self.jobs)
+        scores, distances = score_block(self.profile, block, radius=radius)
+        for i, job in enumerate(self.jobs):
+            expected_score, expected_distance = calculate_score(self.profile, job, radius=radius)
+            self.assertAlmostEqual(scores[i], expected_score, places=2)
+            if expected_distance is None:
+                self.assertTrue(math.isnan(distances[i]))
+            elif expected_score > 0:
+                self.assertAlmostEqual(distances[i], expected_distance, places=2)
+
+    def test_matches_scalar_scoring(self):
+        self._assert_parity()
+
+    def test_matches_scalar_scoring_small_radius(self):
+        self._assert_parity(radius=5)
+
+    def test_matches_scalar_scoring_without_location(self):
+        self.profile.latitude = None
+        self.profile.longitude = None
+        self._assert_parity()
+
+    def test_matches_scalar_scoring_without_history_or_tags(self):
+        self.profile.skill_tags = []
+        self.profile.limitations = []
+        self.profile.jobs_completed = 0
+        self.profile.jobs_dropped = 0
+        self.profile.save()
+        self._assert_parity()
+
+    def test_empty_block(self):
+        block = CandidateBlock.from_rows([])
+        scores, distances = score_block(self.profile, block)
+        self.assertEqual(len(scores), 0)
+        self.assertEqual(len(top_indices(scores, 10)), 0)
+
+    def test_top_indices_orders_by_score_and_drops_zero(self):
+        block = CandidateBlock.from_jobs(self.jobs)
+        scores, _ = score_block(self.profile, block)
+        top = top_indices(scores, 3)
+        self.assertEqual(len(top), 3)
+        self.assertTrue(all(scores[top[i]] >= scores[top[i + 1]] for i in range(len(top) - 1)))
+        self.assertTrue(all(scores[i] > 0 for i in top_indices(scores, 100)))
+
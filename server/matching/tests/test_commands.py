@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+
+from authentication.models import User
+from chat.models import Message
+from matching.models import Badge, Job, JobCompletion, MatchingInterest, SkillTag, UserProfile
+from matching.spatial import encode_geohash
+
+
+class ExplainHotQueriesTests(TestCase):
+    def test_prints_a_plan_per_query(self):
+        user = User.objects.create_user(email='test@example.com', username='testuser', password='pass123')
+        UserProfile.objects.create(user=user, latitude=42.73, longitude=-84.55)
+        Job.objects.create(
+            title='Job', description='Desc', short_description='Short', poster=user,
+            latitude=42.73, longitude=-84.55,
+            shift_start=timezone.now() + timezone.timedelta(hours=2),
+            shift_end=timezone.now() + timezone.timedelta(hours=4),
+        )
+        out = StringIO()
+        call_command('explain_hot_queries', stdout=out)
+        self.assertIn('== Matching feed candidates ==', out.getvalue())
+        self.assertIn('== Badge recount ==', out.getvalue())
+        self.assertIn('skipped: no conversations', out.getvalue())
+
+
+class BenchScoringTests(TestCase):
+    def test_saves_and_compares_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, 'baseline.json')
+            args = ['--sizes', '20', '--tag-lengths', '0,3', '--accessibility', '0.5', '--repeat', '1']
+            call_command('bench_scoring', *args, '--save', baseline, stdout=StringIO())
+            with open(baseline) as f:
+                results = json.load(f)['results']
+            self.assertEqual(len(results), 6)
+            self.assertTrue(all(result['pairs_per_sec'] > 0 for result in results))
+
+            out = StringIO()
+            call_command('bench_scoring', *args, '--compare', baseline, '--tolerance', '1', stdout=out)
+            self.assertIn('No regressions', out.getvalue())
+
+    def test_rejects_unknown_engine(self):
+        with self.assertRaises(CommandError):
+            call_command('bench_scoring', '--engines', 'gpu', stdout=StringIO())
+
+
+class SeedScaleTests(TestCase):
+    def test_loads_consistent_dataset(self):
+        call_command(
+            'seed_scale', '--users', '60', '--jobs', '300', '--conversations', '10',
+            '--chunk-size', '50', stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 60)
+        self.assertEqual(UserProfile.objects.count(), 60)
+        self.assertEqual(Job.objects.count(), 300)
+        self.assertTrue(MatchingInterest.objects.exists())
+        self.assertTrue(Message.objects.exists())
+
+        # Derived columns are filled even though Job.save() never ran
+        job = Job.objects.first()
+        self.assertEqual(job.geohash, encode_geohash(job.latitude, job.longitude))
+        self.assertEqual(job.skill_tag_ids, SkillTag.ids_for(job.skill_tags))
+
+        profile = UserProfile.objects.exclude(jobs_completed=0).first()
+        self.assertEqual(
+            profile.jobs_completed,
+            JobCompletion.objects.filter(user=profile.user, completed=True).count(),
+        )
+        # Every badge counter agrees with the full recount
+        call_command('reconcile_badges', stdout=StringIO())
+
+
+class RecomputeBadgesTests(TestCase):
+    def setUp(self):
+        self.users = []
+        for i in range(5):
+            user = User.objects.create_user(email=f'u{i}@example.com', username=f'u{i}', password=None)
+            user.date_joined = timezone.now() - timezone.timedelta(days=100)  # Anchor silver
+            user.save()
+            UserProfile.objects.create(user=user, firefighter_count=i)
+            self.users.append(user)
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), 'checkpoint.json')
+
+    def _run(self, *args):
+        call_command('recompute_badges', '--workers', '1', '--chunk-size', '2',
+                     '--checkpoint', self.checkpoint, *args, stdout=StringIO())
+
+    def test_writes_only_changed_rows(self):
+        self._run()
+        anchor = Badge.objects.get(user=self.users[0], track='anchor')
+        self.assertEqual((anchor.level, anchor.progress), (2, 3))
+        # No row for a track still at zero
+        self.assertFalse(Badge.objects.filter(user=self.users[0], track='firefighter').exists())
+        self.assertEqual(Badge.objects.get(user=self.users[4], track='firefighter').level, 1)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+        Badge.objects.filter(user=self.users[1], track='anchor').update(level=0, progress=0)
+        stamps = dict(Badge.objects.values_list('id', 'updated_at'))
+        self._run()
+        changed = [badge_id for badge_id, stamp in Badge.objects.values_list('id', 'updated_at') if stamps[badge_id] != stamp]
+        self.assertEqual(changed, [Badge.objects.get(user=self.users[1], track='anchor').id])
+
+    def test_resumes_from_checkpoint(self):
+        with open(self.checkpoint, 'w') as f:
+            json.dump({'last_user_id': self.users[2].id}, f)
+        self._run()
+        self.assertFalse(Badge.objects.filter(user__in=self.users[:3]).exists())
+        self.assertTrue(Badge.objects.filter(user=self.users[3]).exists())
+
+        self._run('--restart')
+        self.assertTrue(Badge.objects.filter(user=self.users[0]).exists())
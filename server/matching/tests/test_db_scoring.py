@@ -0,0 +1,123 @@
+import random
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from matching.db_scoring import annotate_scores, top_k_in_database
+from matching.models import Job, UserProfile
+from matching.ranking import top_k
+from matching.scoring import calculate_score
+
+TAGS = ['Teaching', 'Cooking', 'Driving', 'Gardening', 'First Aid', 'Programming']
+REQUIREMENTS = ['heavy_lifting', 'standing_long', 'driving_required', 'outdoor_work']
+
+
+class DatabaseScoringTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(5)
+        cls.now = timezone.now()
+        cls.user = User.objects.create_user(
+            email='test@example.com', username='testuser', password='pass123'
+        )
+        cls.profile = UserProfile.objects.create(
+            user=cls.user,
+            latitude=42.73,
+            longitude=-84.55,
+            skill_tags=['Teaching', 'Driving'],
+            limitations=['heavy_lifting'],
+            jobs_completed=4,
+            jobs_dropped=1,
+        )
+        for i in range(60):
+            Job.objects.create(
+                title=f'Job {i}',
+                description='Desc',
+                short_description='Short',
+                poster=cls.user,
+                latitude=42.73 + rng.uniform(-0.4, 0.4),
+                longitude=-84.55 + rng.uniform(-0.4, 0.4),
+                shift_start=cls.now + timezone.timedelta(hours=rng.uniform(-5, 200)),
+                shift_end=cls.now + timezone.timedelta(hours=210),
+                skill_tags=rng.sample(TAGS, rng.randint(0, 3)),
+                accessibility_requirements=rng.sample(REQUIREMENTS, rng.randint(0, 1)),
+            )
+
+    def _assert_parity(self, radius=25):
+        annotated = {
+            job.id: (job.score, job.distance)
+            for job in annotate_scores(self.profile, Job.objects.all(), radius=radius, now=self.now)
+        }
+        with patch('matching.models.timezone.now', return_value=self.now):
+            expected = {job.id: calculate_score(self.profile, job, radius=radius) for job in Job.objects.all()}
+        self.assertEqual(set(annotated), {job_id for job_id, (score, _) in expected.items() if score > 0})
+        for job_id, (score, distance) in annotated.items():
+            self.assertAlmostEqual(score, expected[job_id][0], places=2)
+            self.assertAlmostEqual(round(distance, 2), expected[job_id][1], places=2)
+
+    def test_matches_scalar_scoring(self):
+        self._assert_parity()
+
+    def test_matches_scalar_scoring_small_radius(self):
+        self._assert_parity(radius=5)
+
+    def test_matches_scalar_scoring_without_location(self):
+        self.profile.latitude = None
+        self.profile.longitude = None
+        self._assert_parity()
+
+    def test_matches_scalar_scoring_without_history_or_tags(self):
+        self.profile.skill_tags = []
+        self.profile.limitations = []
+        self.profile.jobs_completed = 0
+        self.profile.jobs_dropped = 0
+        self.profile.save()
+        self._assert_parity()
+
+    def test_top_k_matches_python_ranking(self):
+        for k in (1, 5, 20, 100):
+            self.assertEqual(
+                top_k_in_database(self.profile, Job.objects.all(), k, now=self.now),
+                top_k(self.profile, Job.objects.all(), k, now=self.now),
+            )
+
+    def test_reads_only_top_k_rows(self):
+        with self.assertNumQueries(1):
+            result = top_k_in_database(self.profile, Job.objects.all(), 3, now=self.now)
+        self.assertEqual(len(result), 3)
+
+
+@override_settings(MATCHING_SCORE_IN_DATABASE=True)
+class DatabaseScoredFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com', username='testuser', password='pass123'
+        )
+        UserProfile.objects.create(
+            user=self.user, latitude=42.73, longitude=-84.55, skill_tags=['Cooking'],
+        )
+        now = timezone.now()
+        for i, tags in enumerate([['Cooking'], ['Driving'], []]):
+            Job.objects.create(
+                title=f'Job {i}',
+                description='Desc',
+                short_description='Short',
+                poster=self.user,
+                latitude=42.74,
+                longitude=-84.55,
+                shift_start=now + timezone.timedelta(hours=30),
+                shift_end=now + timezone.timedelta(hours=34),
+                skill_tags=tags,
+            )
+        self.client.force_authenticate(user=self.user)
+
+    def test_feed_is_ranked_in_database(self):
+        response = self.client.get('/api/matching/jobs')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([job['title'] for job in response.data], ['Job 2', 'Job 0', 'Job 1'])
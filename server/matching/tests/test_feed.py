@@ -0,0 +1,266 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from matching.models import Job, UserProfile, MatchingInterest
+from matching.feed import rank_jobs
+
+
+class MatchedJobsViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='vol@example.com', username='vol', password='StrongPass123!'
+        )
+        UserProfile.objects.create(
+            user=self.user, latitude=42.73, longitude=-84.55, skill_tags=['Teaching'],
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _make_job(self, **kwargs):
+        defaults = {
+            'title': 'Test',
+            'description': 'Desc',
+            'short_description': 'Short',
+            'poster': self.user,
+            'latitude': 42.73,
+            'longitude': -84.55,
+            'shift_start': timezone.now() + timezone.timedelta(hours=48),
+            'shift_end': timezone.now() + timezone.timedelta(hours=50),
+            'skill_tags': ['Teaching'],
+        }
+        defaults.update(kwargs)
+        return Job.objects.create(**defaults)
+
+    def test_feed_is_ranked_and_limited(self):
+        best = self._make_job(title='Best')
+        self._make_job(title='Further', latitude=42.85)
+        self._make_job(title='Off skill', skill_tags=['Gardening'])
+        self._make_job(title='Too far', latitude=30.0, longitude=-90.0)
+
+        response = self.client.get('/api/matching/jobs', {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(response.data[0]['id'], str(best.id))
+        self.assertGreaterEqual(response.data[0]['score'], response.data[1]['score'])
+        self.assertNotIn('Too far', [job['title'] for job in response.data])
+
+    def test_swiped_jobs_are_excluded(self):
+        passed = self._make_job(title='Passed')
+        liked = self._make_job(title='Liked')
+        fresh = self._make_job(title='Fresh')
+        MatchingInterest.objects.create(user=self.user, job=passed, interested=False)
+        MatchingInterest.objects.create(user=self.user, job=liked, interested=True)
+
+        response = self.client.get('/api/matching/jobs')
+        self.assertEqual([job['id'] for job in response.data], [str(fresh.id)])
+
+    def test_other_users_swipes_do_not_hide_jobs(self):
+        job = self._make_job()
+        other = User.objects.create_user(
+            email='other@example.com', username='other', password='StrongPass123!'
+        )
+        MatchingInterest.objects.create(user=other, job=job, interested=False)
+
+        response = self.client.get('/api/matching/jobs')
+        self.assertEqual([j['id'] for j in response.data], [str(job.id)])
+
+
+@patch('matching.views.reverse_geocode', return_value='East Lansing, MI')
+class FeedCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='vol@example.com', username='vol', password='StrongPass123!'
+        )
+        self.profile = UserProfile.objects.create(
+            user=self.user, latitude=42.73, longitude=-84.55, skill_tags=['Teaching'],
+        )
+        self.client.force_authenticate(user=self.user)
+        self.job = self._make_job(title='Existing')
+
+    def _make_job(self, **kwargs):
+        defaults = {
+            'title': 'Test',
+            'description': 'Desc',
+            'short_description': 'Short',
+            'poster': self.user,
+            'latitude': 42.73,
+            'longitude': -84.55,
+            'shift_start': timezone.now() + timezone.timedelta(hours=48),
+            'shift_end': timezone.now() + timezone.timedelta(hours=50),
+        }
+        defaults.update(kwargs)
+        return Job.objects.create(**defaults)
+
+    def _fetch(self, **params):
+        with patch('matching.feed.rank_jobs', wraps=rank_jobs) as ranker:
+            response = self.client.get('/api/matching/jobs', params)
+        return [job['title'] for job in response.data], ranker.call_count
+
+    def test_repeat_request_served_from_cache(self, _geocode):
+        self.assertEqual(self._fetch(), (['Existing'], 1))
+        self.assertEqual(self._fetch(), (['Existing'], 0))
+
+    def test_nearby_job_created_invalidates(self, _geocode):
+        self._fetch()
+        self.client.post('/api/matching/jobs/create', {
+            'title': 'New nearby',
+            'description': 'Desc',
+            'short_description': 'Short',
+            'latitude': 42.74,
+            'longitude': -84.56,
+        }, format='json')
+        titles, rescored = self._fetch()
+        self.assertEqual(rescored, 1)
+        self.assertIn('New nearby', titles)
+
+    def test_far_job_keeps_cache(self, _geocode):
+        self._fetch()
+        self.client.post('/api/matching/jobs/create', {
+            'title': 'Far away',
+            'description': 'Desc',
+            'short_description': 'Short',
+            'latitude': 34.05,
+            'longitude': -118.24,
+        }, format='json')
+        self.assertEqual(self._fetch(), (['Existing'], 0))
+
+    def test_deleted_job_invalidates(self, _geocode):
+        self._fetch()
+        self.client.delete(f'/api/matching/jobs/{self.job.id}/delete')
+        self.assertEqual(self._fetch(), ([], 1))
+
+    def test_profile_update_invalidates(self, _geocode):
+        self._fetch()
+        self.client.patch('/api/matching/profile', {'skill_tags': ['Cooking']}, format='json')
+        self.assertEqual(self._fetch()[1], 1)
+
+    def test_swiped_job_hidden_without_rescoring(self, _geocode):
+        self._make_job(title='Other')
+        self._fetch()
+        self.client.post('/api/matching/interest', {'job_id': str(self.job.id), 'interested': False}, format='json')
+        self.assertEqual(self._fetch(), (['Other'], 0))
+
+    def test_fully_swiped_cache_is_rebuilt(self, _geocode):
+        # Three-entry snapshots, so more eligible jobs exist than were cached
+        with patch('matching.feed_cache.FEED_CACHE_SIZE', 3):
+            for i in range(3):
+                self._make_job(title=f'Later {i}', shift_start=timezone.now() + timezone.timedelta(days=20))
+            titles, _ = self._fetch(limit=3)
+            self.assertEqual(len(titles), 3)
+            for job in Job.objects.filter(title__in=titles):
+                MatchingInterest.objects.create(user=self.user, job=job, interested=False)
+
+            titles, rescored = self._fetch()
+            self.assertEqual(rescored, 1)
+            self.assertEqual(len(titles), 1)
+            # The rebuilt ranking is the current feed, so the next open is served from cache
+            self.assertEqual(self._fetch(), (titles, 0))
+
+    def test_first_page_cost_does_not_grow_with_swipes(self, _geocode):
+        for i in range(40):
+            self._make_job(title=f'Job {i}')
+
+        def open_and_swipe():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/matching/jobs', {'limit': 5})
+            for job in response.data:
+                MatchingInterest.objects.create(user=self.user, job_id=job['id'], interested=False)
+            return len(queries)
+
+        open_and_swipe()  # Ranks and caches the feed
+        costs = [open_and_swipe() for _ in range(6)]
+        self.assertEqual(len(set(costs)), 1, costs)
+
+
+class FeedCursorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='vol@example.com', username='vol', password='StrongPass123!'
+        )
+        UserProfile.objects.create(user=self.user, latitude=42.73, longitude=-84.55)
+        self.client.force_authenticate(user=self.user)
+        for i in range(5):
+            Job.objects.create(
+                title=f'Job {i}',
+                description='Desc',
+                short_description='Short',
+                poster=self.user,
+                latitude=42.73 + i * 0.01,
+                longitude=-84.55,
+                shift_start=timezone.now() + timezone.timedelta(hours=48),
+                shift_end=timezone.now() + timezone.timedelta(hours=50),
+            )
+
+    def test_pages_through_snapshot_without_rescoring(self):
+        first = self.client.get('/api/matching/jobs', {'limit': 2})
+        seen = [job['id'] for job in first.data]
+        cursor = first['X-Next-Cursor']
+
+        with patch('matching.feed.rank_jobs') as ranker:
+            while cursor:
+                response = self.client.get('/api/matching/jobs', {'limit': 2, 'cursor': cursor})
+                seen.extend(job['id'] for job in response.data)
+                cursor = response.get('X-Next-Cursor')
+            ranker.assert_not_called()
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_cursor_keeps_snapshot_after_invalidation(self):
+        first = self.client.get('/api/matching/jobs', {'limit': 2})
+        Job.objects.create(
+            title='Newcomer', description='Desc', short_description='Short', poster=self.user,
+            latitude=42.73, longitude=-84.55,
+            shift_start=timezone.now() + timezone.timedelta(hours=1),
+            shift_end=timezone.now() + timezone.timedelta(hours=2),
+        )
+        self.client.patch('/api/matching/profile', {'skill_tags': ['Cooking']}, format='json')
+
+        response = self.client.get('/api/matching/jobs', {'limit': 10, 'cursor': first['X-Next-Cursor']})
+        self.assertEqual(len(response.data), 3)
+        self.assertNotIn('Newcomer', [job['title'] for job in response.data])
+        self.assertFalse(response.has_header('X-Next-Cursor'))
+
+    def test_pages_past_a_full_snapshot(self):
+        # Five jobs against three-entry snapshots: the feed must not stop at the cap
+        with patch('matching.feed_cache.FEED_CACHE_SIZE', 3):
+            seen, cursor = [], None
+            while True:
+                response = self.client.get('/api/matching/jobs', {'limit': 2, **({'cursor': cursor} if cursor else {})})
+                seen.extend(job['id'] for job in response.data)
+                cursor = response.get('X-Next-Cursor')
+                if not cursor:
+                    break
+            self.assertEqual(len(seen), 5)
+            self.assertEqual(len(set(seen)), 5)
+
+            cache.clear()
+            response = self.client.get('/api/matching/jobs', {'limit': 10})
+            self.assertEqual(len(response.data), 5)
+
+    def test_limit_is_validated(self):
+        for limit in ('0', '-5'):
+            first = self.client.get('/api/matching/jobs', {'limit': limit})
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(len(first.data), 1)  # Clamped to one job per page
+            second = self.client.get('/api/matching/jobs', {'limit': limit, 'cursor': first['X-Next-Cursor']})
+            self.assertEqual(len(second.data), 1)
+            self.assertNotEqual(second.data[0]['id'], first.data[0]['id'])  # The cursor moves forward
+
+        self.assertEqual(self.client.get('/api/matching/jobs', {'limit': 'ten'}).status_code, 400)
+
+    def test_invalid_cursor_rejected(self):
+        response = self.client.get('/api/matching/jobs', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,112 @@
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from matching import leaderboard
+from matching.badges import record_completion
+from matching.models import Job, LeaderboardEntry, UserProfile
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.poster = User.objects.create_user(email='poster@example.com', username='poster', password='pass123')
+        self.users = []
+        for i in range(5):
+            user = User.objects.create_user(email=f'u{i}@example.com', username=f'u{i}', password='pass123')
+            # East Lansing and, for the last two, Seattle
+            lat, lng = (42.73, -84.55) if i < 3 else (47.61, -122.33)
+            UserProfile.objects.create(user=user, latitude=lat, longitude=lng)
+            for j in range(i):
+                record_completion(user, self._make_job(f'Urgent {i}-{j}'), completed=True)
+            self.users.append(user)
+        self.client.force_authenticate(user=self.users[0])
+
+    def _make_job(self, title):
+        return Job.objects.create(
+            title=title,
+            description='Desc',
+            short_description='Short',
+            poster=self.poster,
+            latitude=42.73,
+            longitude=-84.55,
+            shift_start=timezone.now() + timezone.timedelta(hours=2),
+            shift_end=timezone.now() + timezone.timedelta(hours=4),
+        )
+
+    def _region(self, user):
+        return leaderboard.region_for(UserProfile.objects.get(user=user).geohash)
+
+    def test_completions_fill_global_and_regional_boards(self):
+        entries = LeaderboardEntry.objects.filter(user=self.users[4], track='firefighter')
+        self.assertEqual(sorted(entries.values_list('region', flat=True)), ['', self._region(self.users[4])])
+        # No progress, no row
+        self.assertFalse(LeaderboardEntry.objects.filter(user=self.users[0]).exists())
+
+    def test_keyset_pages_in_rank_order(self):
+        response = self.client.get('/api/matching/leaderboard', {'track': 'firefighter', 'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['username'] for row in response.data], ['u4', 'u3'])
+        self.assertEqual([row['rank'] for row in response.data], [1, 2])
+
+        response = self.client.get('/api/matching/leaderboard', {
+            'track': 'firefighter', 'limit': 2, 'cursor': response['X-Next-Cursor'],
+        })
+        self.assertEqual([row['username'] for row in response.data], ['u2', 'u1'])
+        self.assertEqual([row['rank'] for row in response.data], [3, 4])
+        self.assertNotIn('X-Next-Cursor', response)
+
+    def test_following_cursors_reaches_every_entry(self):
+        for limit in ('0', '1', '3'):
+            seen, cursor = [], None
+            while True:
+                params = {'track': 'firefighter', 'limit': limit, **({'cursor': cursor} if cursor else {})}
+                response = self.client.get('/api/matching/leaderboard', params)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.data)  # limit=0 is clamped to one entry per page
+                seen += [(row['rank'], row['username']) for row in response.data]
+                cursor = response.get('X-Next-Cursor')
+                if not cursor:
+                    break
+            self.assertEqual(seen, [(1, 'u4'), (2, 'u3'), (3, 'u2'), (4, 'u1')])
+
+    def test_rejects_non_numeric_limit(self):
+        response = self.client.get('/api/matching/leaderboard', {'track': 'firefighter', 'limit': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_regional_board(self):
+        response = self.client.get('/api/matching/leaderboard', {'track': 'firefighter', 'region': 'mine'})
+        self.assertEqual([row['username'] for row in response.data], ['u2', 'u1'])
+
+    def test_my_rank(self):
+        self.client.force_authenticate(user=self.users[2])
+        response = self.client.get('/api/matching/leaderboard/me', {'track': 'firefighter'})
+        self.assertEqual(response.data['rank'], 3)
+        self.assertEqual(response.data['progress'], 2)
+
+        response = self.client.get('/api/matching/leaderboard/me', {'track': 'firefighter', 'region': 'mine'})
+        self.assertEqual(response.data['rank'], 1)
+
+        self.client.force_authenticate(user=self.users[0])
+        response = self.client.get('/api/matching/leaderboard/me', {'track': 'firefighter'})
+        self.assertIsNone(response.data['rank'])
+
+    def test_drop_and_move_update_boards(self):
+        job = self._make_job('Once')
+        record_completion(self.users[0], job, completed=True)
+        self.assertTrue(LeaderboardEntry.objects.filter(user=self.users[0], track='firefighter').exists())
+        record_completion(self.users[0], job, completed=False)
+        self.assertFalse(LeaderboardEntry.objects.filter(user=self.users[0], track='firefighter').exists())
+
+        profile = UserProfile.objects.get(user=self.users[1])
+        profile.latitude, profile.longitude = 47.61, -122.33
+        profile.save()
+        leaderboard.sync_user(self.users[1].id, profile.geohash)
+        regions = LeaderboardEntry.objects.filter(user=self.users[1]).values_list('region', flat=True)
+        self.assertEqual(set(regions), {'', self._region(self.users[4])})
+
+    def test_rejects_bad_parameters(self):
+        self.assertEqual(self.client.get('/api/matching/leaderboard', {'track': 'nope'}).status_code, 400)
+        response = self.client.get('/api/matching/leaderboard', {'track': 'anchor', 'cursor': 'forged'})
+        self.assertEqual(response.status_code, 400)
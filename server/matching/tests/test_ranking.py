@@ -0,0 +1,133 @@
+import random
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from authentication.models import User
+from matching.models import Job, SkillTag, UserProfile
+from matching.batch_scoring import CandidateBlock, score_block, top_indices
+from matching.ranking import top_k
+
+TAGS = ['Teaching', 'Cooking', 'Driving', 'Gardening', 'First Aid', 'Programming']
+REQUIREMENTS = ['heavy_lifting', 'standing_long', 'driving_required', 'outdoor_work']
+
+
+class TopKTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        rng = random.Random(7)
+        self.user = User.objects.create_user(
+            email='test@example.com', username='testuser', password='pass123'
+        )
+        self.profile = UserProfile.objects.create(
+            user=self.user,
+            latitude=42.73,
+            longitude=-84.55,
+            skill_tags=['Teaching', 'Driving'],
+            limitations=['heavy_lifting'],
+            jobs_completed=4,
+            jobs_dropped=1,
+        )
+        now = timezone.now()
+        tag_lists = [rng.sample(TAGS, rng.randint(0, 3)) for _ in range(80)]
+        Job.objects.bulk_create([
+            Job(
+                title=f'Job {i}',
+                description='Desc',
+                short_description='Short',
+                poster=self.user,
+                latitude=42.73 + rng.uniform(-0.4, 0.4),
+                longitude=-84.55 + rng.uniform(-0.4, 0.4),
+                shift_start=now + timezone.timedelta(hours=rng.uniform(-5, 200)),
+                shift_end=now + timezone.timedelta(hours=210),
+                skill_tags=tags,
+                skill_tag_ids=SkillTag.ids_for(tags),
+                accessibility_requirements=rng.sample(REQUIREMENTS, rng.randint(0, 1)),
+            )
+            for i, tags in enumerate(tag_lists)
+        ])
+        self.now = now
+
+    def _full_ranking(self, k, radius):
+        jobs = list(Job.objects.all())
+        block = CandidateBlock.from_jobs(jobs)
+        scores, distances = score_block(self.profile, block, radius=radius, now=self.now)
+        return [(block.ids[i], float(scores[i]), float(distances[i]) or 0) for i in top_indices(scores, k)]
+
+    def test_matches_full_ranking(self):
+        for k in (1, 5, 20, 200):
+            for radius in (10, 25):
+                with patch('matching.ranking.MIN_CHUNK_SIZE', 4):
+                    result = top_k(self.profile, Job.objects.all(), k, radius=radius, now=self.now)
+                self.assertEqual(result, self._full_ranking(k, radius))
+
+    def test_matches_full_ranking_without_location(self):
+        self.profile.latitude = None
+        self.profile.longitude = None
+        with patch('matching.ranking.MIN_CHUNK_SIZE', 4):
+            result = top_k(self.profile, Job.objects.all(), 10, now=self.now)
+        self.assertEqual(result, self._full_ranking(10, 25))
+
+    def test_prunes_candidates_that_cannot_win(self):
+        scored_rows = []
+        original = CandidateBlock.from_rows.__func__
+
+        def counting_from_rows(cls, rows):
+            block = original(cls, rows)
+            scored_rows.append(len(block))
+            return block
+
+        with patch('matching.ranking.MIN_CHUNK_SIZE', 4), \
+                patch.object(CandidateBlock, 'from_rows', classmethod(counting_from_rows)):
+            top_k(self.profile, Job.objects.all(), 4, radius=50, now=self.now)
+        self.assertLess(sum(scored_rows), 80)
+
+    def _count_scored_rows(self, **kwargs):
+        scored_rows = []
+        original = CandidateBlock.from_rows.__func__
+
+        def counting_from_rows(cls, rows):
+            block = original(cls, rows)
+            scored_rows.append(len(block))
+            return block
+
+        with patch('matching.ranking.MIN_CHUNK_SIZE', 4), \
+                patch.object(CandidateBlock, 'from_rows', classmethod(counting_from_rows)):
+            result = top_k(self.profile, Job.objects.all(), **kwargs)
+        return result, sum(scored_rows)
+
+    def test_repeat_ranking_reuses_cached_pairs(self):
+        _, first = self._count_scored_rows(k=20, now=self.now)
+        self.assertGreater(first, 0)
+
+        # Urgency is added at read time, so a later clock needs no rescoring
+        later = self.now + timezone.timedelta(hours=30)
+        result, second = self._count_scored_rows(k=20, now=later)
+        self.assertEqual(second, 0)
+        self.now = later
+        self.assertEqual(result, self._full_ranking(20, 25))
+
+    def test_changed_job_is_rescored(self):
+        result, _ = self._count_scored_rows(k=20, now=self.now)
+        job = Job.objects.get(id=result[0][0])
+        job.accessibility_requirements = ['heavy_lifting']
+        job.save()
+
+        result, rescored = self._count_scored_rows(k=20, now=self.now)
+        self.assertEqual(rescored, 1)
+        self.assertNotIn(job.id, [job_id for job_id, _, _ in result])
+        self.assertEqual(result, self._full_ranking(20, 25))
+
+    def test_profile_change_drops_cached_pairs(self):
+        self._count_scored_rows(k=20, now=self.now)
+        self.profile.skill_tags = ['Cooking']
+        self.profile.save()
+
+        result, rescored = self._count_scored_rows(k=20, now=self.now)
+        self.assertGreater(rescored, 0)
+        self.assertEqual(result, self._full_ranking(20, 25))
+
+    def test_empty_queryset(self):
+        self.assertEqual(top_k(self.profile, Job.objects.none(), 5), [])
@@ -0,0 +1,143 @@
+import random
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from matching.models import Job, MatchingInterest, UserProfile
+from matching.recommend import recommend_volunteers, score_profiles
+from matching.scoring import calculate_score
+
+TAGS = ['Teaching', 'Cooking', 'Driving', 'Gardening', 'First Aid', 'Programming']
+REQUIREMENTS = ['heavy_lifting', 'standing_long', 'driving_required', 'outdoor_work']
+
+
+class RecommendVolunteersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(11)
+        cls.now = timezone.now()
+        cls.poster = User.objects.create_user(
+            email='poster@example.com', username='poster', password='pass123'
+        )
+        cls.job = Job.objects.create(
+            title='Food drive',
+            description='Desc',
+            short_description='Short',
+            poster=cls.poster,
+            latitude=42.73,
+            longitude=-84.55,
+            shift_start=cls.now + timezone.timedelta(hours=30),
+            shift_end=cls.now + timezone.timedelta(hours=34),
+            skill_tags=['Cooking', 'Driving'],
+            accessibility_requirements=['heavy_lifting'],
+        )
+        for i in range(60):
+            user = User.objects.create_user(
+                email=f'v{i}@example.com', username=f'volunteer{i}', password='pass123'
+            )
+            UserProfile.objects.create(
+                user=user,
+                latitude=42.73 + rng.uniform(-0.5, 0.5),
+                longitude=-84.55 + rng.uniform(-0.5, 0.5),
+                max_distance_miles=rng.choice([5, 10, 25, 50]),
+                skill_tags=rng.sample(TAGS, rng.randint(0, 3)),
+                limitations=rng.sample(REQUIREMENTS, rng.randint(0, 1)),
+                jobs_completed=rng.randint(0, 5),
+                jobs_dropped=rng.randint(0, 2),
+            )
+        # Swiped and unlocated volunteers are never recommended
+        MatchingInterest.objects.create(user_id=User.objects.get(username='volunteer0').id, job=cls.job, interested=True)
+        UserProfile.objects.filter(user__username='volunteer1').update(latitude=None, longitude=None)
+
+    def _full_ranking(self, limit):
+        ranked = []
+        profiles = UserProfile.objects.exclude(latitude=None).exclude(user__username='volunteer0')
+        for profile in profiles:
+            with patch('matching.models.timezone.now', return_value=self.now):
+                score, distance = calculate_score(profile, self.job, radius=profile.max_distance_miles)
+            if score > 0:
+                ranked.append((profile.user_id, score, distance))
+        ranked.sort(key=lambda entry: (-entry[1], entry[0]))
+        return ranked[:limit]
+
+    def test_matches_scoring_every_profile(self):
+        for limit in (1, 5, 20, 100):
+            self.assertEqual(
+                recommend_volunteers(self.job, limit=limit, now=self.now),
+                self._full_ranking(limit),
+            )
+
+    def test_matches_scoring_every_profile_without_job_tags(self):
+        Job.objects.filter(id=self.job.id).update(skill_tags=[], skill_tag_ids=[])
+        self.job.refresh_from_db()
+        self.assertEqual(recommend_volunteers(self.job, limit=10, now=self.now), self._full_ranking(10))
+
+    def test_skips_profiles_without_shared_tags_when_they_cannot_win(self):
+        scored_rows = []
+
+        def counting_score_profiles(job, rows, now=None):
+            scored_rows.append(len(rows))
+            return score_profiles(job, rows, now=now)
+
+        with patch('matching.recommend.score_profiles', counting_score_profiles):
+            result = recommend_volunteers(self.job, limit=1, now=self.now)
+        self.assertEqual(result, self._full_ranking(1))
+        self.assertEqual(len(scored_rows), 1)
+
+    def test_non_positive_limit_returns_nothing(self):
+        self.assertEqual(recommend_volunteers(self.job, limit=0, now=self.now), [])
+        self.assertEqual(recommend_volunteers(self.job, limit=-1, now=self.now), [])
+
+
+class RecommendedVolunteersViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.poster = User.objects.create_user(
+            email='poster@example.com', username='poster', password='pass123'
+        )
+        self.volunteer = User.objects.create_user(
+            email='vol@example.com', username='volunteer', password='pass123'
+        )
+        UserProfile.objects.create(
+            user=self.volunteer, latitude=42.74, longitude=-84.55, skill_tags=['Cooking'],
+        )
+        now = timezone.now()
+        self.job = Job.objects.create(
+            title='Food drive',
+            description='Desc',
+            short_description='Short',
+            poster=self.poster,
+            latitude=42.73,
+            longitude=-84.55,
+            shift_start=now + timezone.timedelta(hours=30),
+            shift_end=now + timezone.timedelta(hours=34),
+            skill_tags=['Cooking'],
+        )
+
+    def test_poster_sees_recommendations(self):
+        self.client.force_authenticate(user=self.poster)
+        response = self.client.get(f'/api/matching/jobs/{self.job.id}/recommended-volunteers')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['user_id'], self.volunteer.id)
+        self.assertGreater(response.data[0]['score'], 0)
+        self.assertNotIn('latitude', response.data[0])
+
+    def test_only_poster_can_view(self):
+        self.client.force_authenticate(user=self.volunteer)
+        response = self.client.get(f'/api/matching/jobs/{self.job.id}/recommended-volunteers')
+        self.assertEqual(response.status_code, 403)
+
+    def test_limit_is_validated(self):
+        self.client.force_authenticate(user=self.poster)
+        url = f'/api/matching/jobs/{self.job.id}/recommended-volunteers'
+        for limit in ('0', '-1'):
+            response = self.client.get(url, {'limit': limit})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([row['user_id'] for row in response.data], [self.volunteer.id])  # Clamped to 1
+        self.assertEqual(self.client.get(url, {'limit': 'abc'}).status_code, 400)
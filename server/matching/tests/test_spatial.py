@@ -0,0 +1,69 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from authentication.models import User
+from matching.models import Job
+from matching.scoring import haversine_distance
+from matching.spatial import MAX_COVER_CELLS, covering_cells, encode_geohash, near
+
+
+class GeohashTests(TestCase):
+    def test_known_encoding(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744, precision=11), 'u4pruydqqvj')
+
+    def test_missing_coordinates(self):
+        self.assertEqual(encode_geohash(None, -84.55), '')
+
+    def test_covering_cells_are_bounded(self):
+        for radius in (1, 5, 25, 100):
+            cells = covering_cells(42.73, -84.55, radius)
+            self.assertLessEqual(len(cells), MAX_COVER_CELLS)
+            self.assertTrue(any(encode_geohash(42.73, -84.55).startswith(c) for c in cells))
+
+    def test_covering_cells_include_points_within_radius(self):
+        cells = covering_cells(42.73, -84.55, 10)
+        for lat, lng in [(42.86, -84.55), (42.73, -84.38), (42.64, -84.66)]:
+            self.assertLessEqual(haversine_distance(42.73, -84.55, lat, lng), 10)
+            geohash = encode_geohash(lat, lng)
+            self.assertTrue(any(geohash.startswith(c) for c in cells))
+
+
+class JobGeohashTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='poster@example.com', username='poster', password='pass123'
+        )
+
+    def _make_job(self, **kwargs):
+        defaults = {
+            'title': 'Test',
+            'description': 'Desc',
+            'short_description': 'Short',
+            'poster': self.user,
+            'latitude': 42.73,
+            'longitude': -84.55,
+            'shift_start': timezone.now() + timezone.timedelta(hours=2),
+            'shift_end': timezone.now() + timezone.timedelta(hours=4),
+        }
+        defaults.update(kwargs)
+        return Job.objects.create(**defaults)
+
+    def test_geohash_set_on_save(self):
+        job = self._make_job()
+        self.assertEqual(job.geohash, encode_geohash(42.73, -84.55))
+
+    def test_geohash_follows_update_fields(self):
+        job = self._make_job()
+        job.latitude = 42.33
+        job.longitude = -83.05
+        job.save(update_fields=['latitude', 'longitude'])
+        job.refresh_from_db()
+        self.assertEqual(job.geohash, encode_geohash(42.33, -83.05))
+
+    def test_near_returns_only_jobs_in_range(self):
+        close = self._make_job(latitude=42.75, longitude=-84.50)
+        self._make_job(latitude=42.33, longitude=-83.05)  # Detroit
+        self._make_job(latitude=None, longitude=None)
+
+        found = near(Job.objects.all(), 42.73, -84.55, 25)
+        self.assertEqual(list(found), [close])
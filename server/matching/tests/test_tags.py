@@ -0,0 +1,58 @@
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from matching.models import Job, SkillTag, UserProfile
+from matching.tags import clean_tags, normalize_tag
+
+
+class TagNormalizationTests(TestCase):
+    def test_normalize_tag(self):
+        self.assertEqual(normalize_tag('  First   Aid '), 'first aid')
+
+    def test_clean_tags_drops_blanks_and_duplicates(self):
+        self.assertEqual(
+            clean_tags(['First  Aid', 'first aid', '', '  ', 'Cooking ']),
+            ['First Aid', 'Cooking'],
+        )
+
+
+class SkillTagIdTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com', username='testuser', password='pass123'
+        )
+
+    def test_ids_are_shared_across_spellings(self):
+        first = SkillTag.ids_for(['Teaching', 'Cooking'])
+        second = SkillTag.ids_for(['cooking', ' TEACHING '])
+        self.assertEqual(first, second)
+        self.assertEqual(SkillTag.objects.count(), 2)
+
+    def test_job_and_profile_store_ids_on_save(self):
+        job = Job.objects.create(
+            title='Test',
+            description='Desc',
+            short_description='Short',
+            poster=self.user,
+            shift_start=timezone.now(),
+            shift_end=timezone.now(),
+            skill_tags=['Teaching', 'First Aid'],
+        )
+        profile = UserProfile.objects.create(user=self.user, skill_tags=['first aid'])
+        self.assertEqual(job.skill_tag_ids, SkillTag.ids_for(['teaching', 'first aid']))
+        self.assertEqual(profile.skill_tag_ids, SkillTag.ids_for(['First Aid']))
+
+        job.skill_tags = ['Cooking']
+        job.save(update_fields=['skill_tags'])
+        job.refresh_from_db()
+        self.assertEqual(job.skill_tag_ids, SkillTag.ids_for(['Cooking']))
+
+    def test_profile_update_cleans_tags(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        client.patch('/api/matching/profile', {'skill_tags': [' Teaching', 'teaching', 'Cooking']}, format='json')
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual(profile.skill_tags, ['Teaching', 'Cooking'])
+        self.assertEqual(profile.skill_tag_ids, SkillTag.ids_for(['teaching', 'cooking']))
@@ -8,6 +8,8 @@ urlpatterns = [
     path('interest', views.swipe_interest, name='matching-interest'),
     path('complete', views.complete_job, name='matching-complete'),
     path('users/<int:user_id>/badges', views.user_badges, name='user-badges'),
+    path('leaderboard', views.badge_leaderboard, name='badge-leaderboard'),
+    path('leaderboard/me', views.my_leaderboard_rank, name='my-leaderboard-rank'),
 
     # Job CRUD
     path('jobs/create', views.create_job, name='job-create'),
@@ -22,6 +24,7 @@ urlpatterns = [
     path('jobs/<uuid:job_id>/confirm', views.confirm_volunteer, name='confirm-volunteer'),
     path('jobs/<uuid:job_id>/retract', views.retract_application, name='retract-application'),
     path('jobs/<uuid:job_id>/interested', views.job_interested_users, name='job-interested-users'),
+    path('jobs/<uuid:job_id>/recommended-volunteers', views.recommended_volunteers, name='recommended-volunteers'),
 
     # Profile
     path('profile', views.get_or_update_profile, name='profile'),
@@ -6,63 +6,55 @@ from rest_framework.response import Response
 from django.utils import timezone
 
 from authentication.models import User
+from core.http import conditional_response
 from .models import Job, UserProfile, MatchingInterest, JobAcceptance
 from .serializers import (
     JobMatchSerializer, JobDetailSerializer, MatchingInterestSerializer,
     JobCompletionSerializer, JobCreateSerializer, UserProfileSerializer,
     UserProfileFullSerializer, LocationUpdateSerializer, BadgeSerializer,
     JobAcceptanceSerializer, AcceptVolunteerSerializer, InterestedUserSerializer,
+    RecommendedVolunteerSerializer, LeaderboardEntrySerializer,
 )
-from .scoring import calculate_score
-from .badges import compute_badges, record_completion
+from .badges import TRACKS, compute_badges, record_completion
 from .geocoding import reverse_geocode, forward_geocode
+from .tags import clean_tags
+from .feed import FEED_MAX_PAGE_SIZE, FEED_PAGE_SIZE, feed_page
+from .recommend import MAX_PAGE_SIZE as RECOMMEND_MAX_PAGE_SIZE, PAGE_SIZE as RECOMMEND_PAGE_SIZE, recommend_volunteers
+from . import feed_cache, leaderboard
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def matched_jobs(request):
-    limit = int(request.query_params.get('limit', 20))
+    try:
+        limit = min(max(int(request.query_params.get('limit', FEED_PAGE_SIZE)), 1), FEED_MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
 
     profile, _ = UserProfile.objects.get_or_create(user=request.user)
 
     # Use user's max_distance preference, or default to 25
     radius = profile.max_distance_miles or 25
 
-    # Pre-filter: open, active jobs
-    jobs = Job.objects.filter(status='open', is_active=True).select_related('poster')
-
-    # Bounding box pre-filter if user has location
-    if profile.latitude is not None and profile.longitude is not None:
-        import math
-        lat_delta = radius / 69.0  # ~69 miles per degree latitude
-        lon_delta = radius / (69.0 * max(0.1, abs(math.cos(math.radians(profile.latitude)))))
-        jobs = jobs.filter(
-            latitude__gte=profile.latitude - lat_delta,
-            latitude__lte=profile.latitude + lat_delta,
-            longitude__gte=profile.longitude - lon_delta,
-            longitude__lte=profile.longitude + lon_delta,
-        )
-
-    # Score and rank
-    scored = []
-    for job in jobs:
-        score, distance = calculate_score(profile, job, radius=radius)
-        if score > 0:
-            scored.append((job, score, distance))
-
-    scored.sort(key=lambda x: x[1], reverse=True)
-    scored = scored[:limit]
+    # Ranked once per user, then served from the feed cache
+    try:
+        page, next_cursor = feed_page(profile, radius, limit, request.query_params.get('cursor'))
+    except ValueError:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
 
     # Serialize with injected score/distance (privacy-safe: no raw coords)
     results = []
-    for job, score, distance in scored:
+    for job, score, distance in page:
         job._distance = distance  # Attach for serializer
         data = JobMatchSerializer(job).data
         data['score'] = score
         data['distance'] = round(distance, 1) if distance else None
         results.append(data)
 
-    return Response(results)
+    response = Response(results)
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+    return response
 
 
 @api_view(['POST'])
@@ -108,14 +100,75 @@ def user_badges(request, user_id):
     except User.DoesNotExist:
         return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    badges = compute_badges(user)
-    return Response({
+    # Read-only path: counters on the profile, nothing written
+    profile = UserProfile.objects.filter(user=user).first() or UserProfile(user=user)
+    badges = compute_badges(user, profile)
+    # No Last-Modified: a rename changes the payload without touching the profile, so the ETag decides
+    return conditional_response(request, {
         'user_id': str(user.id),
         'username': user.username,
         'badges': badges,
     })
 
 
+def _leaderboard_board(request):
+    """Return (track, region) from the query string, or raise ValueError with the message for a 400."""
+    track = request.query_params.get('track', '')
+    if track not in TRACKS:
+        raise ValueError(f"track must be one of: {', '.join(TRACKS)}")
+    region = request.query_params.get('region', '')
+    if region == 'mine':
+        profile = UserProfile.objects.filter(user=request.user).only('geohash').first()
+        region = leaderboard.region_for(profile.geohash if profile else '')
+    elif region and len(region) != leaderboard.REGION_PRECISION:
+        raise ValueError('Invalid region')
+    return track, region
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def badge_leaderboard(request):
+    """One page of a track's leaderboard, global or for a region ('mine' for the caller's)."""
+    try:
+        limit = min(max(int(request.query_params.get('limit', leaderboard.PAGE_SIZE)), 1), leaderboard.MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        track, region = _leaderboard_board(request)
+        page, next_cursor = leaderboard.load_page(track, region, limit, request.query_params.get('cursor'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = []
+    for rank, entry in page:
+        data = LeaderboardEntrySerializer(entry).data
+        data['rank'] = rank
+        results.append(data)
+
+    response = Response(results)
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def my_leaderboard_rank(request):
+    try:
+        track, region = _leaderboard_board(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    rank, entry = leaderboard.rank_of(request.user.id, track, region)
+    return Response({
+        'track': track,
+        'region': region,
+        'rank': rank,  # None until the user has progress on this track
+        'level': entry.level if entry else 0,
+        'progress': entry.progress if entry else 0,
+    })
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def complete_job(request):
@@ -147,8 +200,10 @@ def complete_job(request):
     if job.poster == request.user:
         job.status = 'completed'
         job.save(update_fields=['status'])
+        feed_cache.invalidate_job(job)
 
     badges = record_completion(request.user, job, completed=completed)
+    feed_cache.invalidate_user(request.user.id)  # reliability term changed
     return Response({
         'status': new_status,
         'job': job.title,
@@ -204,6 +259,7 @@ def create_job(request):
         defaults['shift_end'] = defaults['shift_start'] + timezone.timedelta(hours=2)
 
     job = Job.objects.create(**defaults)
+    feed_cache.invalidate_job(job)
     return Response(JobDetailSerializer(job).data, status=status.HTTP_201_CREATED)
 
 
@@ -231,10 +287,15 @@ def update_job(request, job_id):
         if field in request.data:
             setattr(job, field, request.data[field])
 
+    if 'skill_tags' in request.data:
+        job.skill_tags = clean_tags(job.skill_tags)
+
     if 'accessibility_flags' in request.data:
         job.accessibility_requirements = _accessibility_flags_to_requirements(request.data['accessibility_flags'])
 
+    previous_geohash = job.geohash
     job.save()
+    feed_cache.invalidate_job(job, previous_geohash=previous_geohash)
     return Response(JobMatchSerializer(job).data)
 
 
@@ -251,6 +312,7 @@ def delete_job(request, job_id):
 
     job.is_active = False
     job.save()
+    feed_cache.invalidate_job(job)
     return Response({'status': 'Job deleted.'}, status=status.HTTP_200_OK)
 
 
@@ -259,17 +321,20 @@ def delete_job(request, job_id):
 @api_view(['GET', 'PUT', 'PATCH'])
 @permission_classes([IsAuthenticated])
 def get_or_update_profile(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
-
     if request.method == 'GET':
+        # Zero-write page load; the profile row is created on first update
+        profile = UserProfile.objects.filter(user=request.user).first() or UserProfile(user=request.user)
         from authentication.serializers import UserSerializer
-        badges = compute_badges(request.user)
-        return Response({
+        badges = compute_badges(request.user, profile)
+        # No Last-Modified: user fields (name, avatar) carry no timestamp, so the ETag decides
+        return conditional_response(request, {
             'user': UserSerializer(request.user, context={'request': request}).data,
             'profile': UserProfileFullSerializer(profile).data,
             'badges': badges,
         })
 
+    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+
     # PUT / PATCH - update skills, limitations, max_distance
     allowed_fields = ['skill_tags', 'limitations', 'max_distance_miles']
     update_data = {k: v for k, v in request.data.items() if k in allowed_fields}
@@ -277,9 +342,10 @@ def get_or_update_profile(request):
     serializer = UserProfileFullSerializer(profile, data=update_data, partial=True)
     serializer.is_valid(raise_exception=True)
     serializer.save()
+    feed_cache.invalidate_user(request.user.id)
 
     from authentication.serializers import UserSerializer
-    badges = compute_badges(request.user)
+    badges = compute_badges(request.user, profile)
     return Response({
         'user': UserSerializer(request.user, context={'request': request}).data,
         'profile': UserProfileFullSerializer(profile).data,
@@ -295,6 +361,7 @@ def update_location(request):
     PUT: Update location (GPS or manual)
     """
     profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    region = leaderboard.region_for(profile.geohash)
 
     if request.method == 'GET':
         return Response({
@@ -340,6 +407,9 @@ def update_location(request):
 
     profile.last_location_update = timezone.now()
     profile.save()
+    feed_cache.invalidate_user(request.user.id)
+    if leaderboard.region_for(profile.geohash) != region:
+        leaderboard.sync_user(request.user.id, profile.geohash)
 
     return Response({
         'location_source': profile.location_source,
@@ -363,6 +433,8 @@ def revoke_location(request):
     profile.location_source = 'manual'
     profile.last_location_update = None
     profile.save()
+    feed_cache.invalidate_user(request.user.id)
+    leaderboard.sync_user(request.user.id, profile.geohash)  # Off every regional board
 
     return Response({
         'message': 'Location data removed',
@@ -458,6 +530,35 @@ def job_interested_users(request, job_id):
     return Response(data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def recommended_volunteers(request, job_id):
+    """Best-matching volunteers for a job, scored the way their own feed would score it."""
+    try:
+        limit = min(max(int(request.query_params.get('limit', RECOMMEND_PAGE_SIZE)), 1), RECOMMEND_MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        job = Job.objects.get(id=job_id, is_active=True)
+    except Job.DoesNotExist:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    if job.poster != request.user:
+        return Response({'error': 'Only the poster can view recommended volunteers.'}, status=status.HTTP_403_FORBIDDEN)
+
+    ranked = recommend_volunteers(job, limit=limit)
+    profiles = UserProfile.objects.select_related('user').in_bulk(
+        [user_id for user_id, _, _ in ranked], field_name='user_id'
+    )
+    results = []
+    for user_id, score, distance in ranked:
+        data = RecommendedVolunteerSerializer(profiles[user_id]).data
+        data['score'] = score
+        data['distance'] = round(distance, 1)
+        results.append(data)
+    return Response(results)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def my_interested_jobs(request):